@@ -0,0 +1,156 @@
+from collections import OrderedDict
+from difflib import SequenceMatcher
+from typing import Dict, Optional
+import logging
+import re
+import threading
+import numpy as np
+from config.settings import Settings
+from database.embeddings import EmbeddingGenerator
+
+class AnswerCache:
+    """Cache of answered queries, matched exactly or by embedding similarity.
+
+    Entries hold the intent, the retrieved product ids and the final
+    response. They are only valid for the catalog version they were
+    computed against, so the whole cache is dropped when the version moves.
+    """
+
+    NUMBER_PATTERN = re.compile(r"\d+(?:\.\d+)?")
+    SPELLING_RATIO = 0.8
+    STOPWORDS = {
+        "a", "an", "the", "me", "show", "find", "what", "which", "are", "is",
+        "for", "of", "some", "any", "please", "i", "want", "with", "in", "to"
+    }
+
+    def __init__(self,
+                 embedding_generator: EmbeddingGenerator,
+                 max_entries: int = Settings.ANSWER_CACHE_MAX_ENTRIES,
+                 similarity_threshold: float = Settings.ANSWER_CACHE_SIMILARITY):
+        self.embedding_generator = embedding_generator
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.logger = logging.getLogger(__name__)
+
+        self.entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self.catalog_version = None
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_keys = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Lowercase, drop punctuation other than prices, and collapse whitespace."""
+        query = re.sub(r"[^\w\s$.]", " ", str(query).lower())
+        return " ".join(query.replace("$ ", "$").split()).strip(" .")
+
+    def _embed(self, normalized: str) -> np.ndarray:
+        vector = np.asarray(self.embedding_generator.generate(normalized), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _check_version(self, catalog_version) -> None:
+        if catalog_version != self.catalog_version:
+            if self.entries:
+                self.invalidations += 1
+                self.logger.info(f"Catalog version changed to {catalog_version}, dropping {len(self.entries)} cached answers")
+            self.entries.clear()
+            self._matrix = None
+            self.catalog_version = catalog_version
+
+    def _find_similar(self, normalized: str, vector: np.ndarray) -> Optional[str]:
+        """Return the key of the most similar cached query above the threshold."""
+        if not self.entries or not np.any(vector):
+            return None
+        if self._matrix is None:
+            self._matrix_keys = list(self.entries)
+            self._matrix = np.vstack([self.entries[key]['embedding'] for key in self._matrix_keys])
+
+        similarities = self._matrix @ vector
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.similarity_threshold:
+            return None
+
+        key = self._matrix_keys[best]
+        return key if self._is_near_duplicate(key, normalized) else None
+
+    def _is_near_duplicate(self, first: str, second: str) -> bool:
+        """Guard similarity matches against queries that differ in meaning.
+
+        Numbers must agree exactly ("under $20" vs "under $30") and every
+        differing content word must be a spelling variant of one on the other
+        side ("earings" vs "earrings", but not "red" vs "blue").
+        """
+        if self.NUMBER_PATTERN.findall(first) != self.NUMBER_PATTERN.findall(second):
+            return False
+        first_words = set(first.split()) - self.STOPWORDS
+        second_words = set(second.split()) - self.STOPWORDS
+        for words, others in ((first_words - second_words, second_words - first_words),
+                              (second_words - first_words, first_words - second_words)):
+            for word in words:
+                if not any(SequenceMatcher(None, word, other).ratio() >= self.SPELLING_RATIO
+                           for other in others):
+                    return False
+        return True
+
+    def get(self, query: str, catalog_version) -> Optional[Dict]:
+        """Look up a cached answer for the query under the given catalog version."""
+        normalized = self.normalize_query(query)
+        with self._lock:
+            self._check_version(catalog_version)
+
+            entry = self.entries.get(normalized)
+            if entry is not None:
+                self.entries.move_to_end(normalized)
+                self.exact_hits += 1
+                return entry
+
+            key = self._find_similar(normalized, self._embed(normalized))
+            if key is not None:
+                self.entries.move_to_end(key)
+                self.similar_hits += 1
+                return self.entries[key]
+
+            self.misses += 1
+            return None
+
+    def put(self, query: str, catalog_version, intent: Dict, product_ids: list, response: str) -> None:
+        """Store an answer computed against the given catalog version."""
+        normalized = self.normalize_query(query)
+        embedding = self._embed(normalized)
+        with self._lock:
+            self._check_version(catalog_version)
+            self.entries[normalized] = {
+                "intent": intent,
+                "product_ids": list(product_ids),
+                "response": response,
+                "embedding": embedding
+            }
+            self.entries.move_to_end(normalized)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            self._matrix = None
+
+    def clear(self) -> None:
+        with self._lock:
+            self.entries.clear()
+            self._matrix = None
+
+    def get_stats(self) -> Dict:
+        """Return hit ratios and occupancy."""
+        lookups = self.exact_hits + self.similar_hits + self.misses
+        hits = self.exact_hits + self.similar_hits
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "exact_hits": self.exact_hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "catalog_version": self.catalog_version
+        }
@@ -1,18 +1,39 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 from pathlib import Path
 import logging
-from database.vector_store import VectorStore
-from database.embeddings import EmbeddingGenerator
-from concurrent.futures import ThreadPoolExecutor
-from tqdm import tqdm
+import hashlib
+import json
+import multiprocessing
+import queue
+import threading
+import time
+from config.settings import Settings
+from api.metrics import INGEST_ROWS, INGEST_STAGE_SECONDS
+from database.job_store import IngestionJobStore
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+if TYPE_CHECKING:
+    # Process-pool workers import this module, so keep Chroma out of their startup
+    from database.vector_store import VectorStore
+    from database.embeddings import EmbeddingGenerator
 
 class DataProcessor:
-    def __init__(self, vector_store: VectorStore, embedding_generator: EmbeddingGenerator):
+    def __init__(self, vector_store: "VectorStore", embedding_generator: "EmbeddingGenerator",
+                 job_store: Optional[IngestionJobStore] = None):
         self.vector_store = vector_store
         self.embedding_generator = embedding_generator
         self.logger = logging.getLogger(__name__)
+        self.pipeline_stats: Dict = {}
+        self._job_store = job_store
+
+    @property
+    def job_store(self) -> Optional[IngestionJobStore]:
+        """The checkpoint store, opened on first use so document-only users never touch it."""
+        if self._job_store is None and Settings.INGEST_CHECKPOINTS_ENABLED:
+            self._job_store = IngestionJobStore()
+        return self._job_store
 
     def clean_text(self, text: str) -> str:
         """Clean and normalize text data."""
@@ -43,52 +64,383 @@ class DataProcessor:
         # Create metadata
         metadata = {
             'id': str(row.get('id', '')),
+            'name': str(row.get('name', '')),
             'category': str(row.get('category', '')),
+            'subcategory': str(row.get('subcategory', '')),
             'price': self.normalize_prices(row.get('current_price', 0)),
+            'raw_price': self.normalize_prices(row.get('raw_price', 0)),
+            'discount': self.normalize_prices(row.get('discount', 0)),
             'brand': str(row.get('brand', '')),
+            'model': str(row.get('model', '')),
             'likes_count': int(row.get('likes_count', 0)),
             'is_new': bool(row.get('is_new', False))
         }
         
         return combined_text, metadata
 
-    def process_csv(self, file_path: Path) -> Dict:
-        """Process a single CSV file."""
-        try:
-            self.logger.info(f"Processing {file_path}")
-            df = pd.read_csv(file_path)
-            
-            # Process rows
-            documents = []
-            metadatas = []
-            ids = []
-            
-            for idx, row in tqdm(df.iterrows(), total=len(df)):
-                document, metadata = self.process_row(row)
-                documents.append(document)
-                metadatas.append(metadata)
-                ids.append(f"{file_path.stem}_{idx}")
-            
-            # Generate embeddings and store in vector database
-            self.vector_store.add_documents(
-                documents=documents,
-                metadatas=metadatas,
-                ids=ids
+    @staticmethod
+    def _as_text(df: pd.DataFrame, column: str) -> pd.Series:
+        """Stringify a column the way str() does for each value, NaN included."""
+        if column not in df.columns:
+            return pd.Series('', index=df.index, dtype=object)
+        series = df[column]
+        return series.astype(str).where(series.notna(), 'nan').astype(object)
+
+    @staticmethod
+    def _as_price(df: pd.DataFrame, column: str) -> pd.Series:
+        """Convert a column the way normalize_prices does for each value."""
+        if column not in df.columns:
+            return pd.Series(0.0, index=df.index)
+        raw = df[column]
+        price = pd.to_numeric(raw, errors='coerce')
+        return price.where(price.notna() | raw.isna(), 0.0).astype(float)
+
+    @staticmethod
+    def build_documents(df: pd.DataFrame) -> Tuple[List[str], List[Dict]]:
+        """Build documents and metadata for a whole frame with columnar operations.
+
+        Produces exactly what process_row returns for each row.
+        """
+        # Combine relevant fields for embedding, skipping empty fields
+        documents = pd.Series('', index=df.index, dtype=object)
+        started = np.zeros(len(df), dtype=bool)
+        for column in ('name', 'description', 'category', 'brand'):
+            raw = DataProcessor._as_text(df, column)
+            present = (raw != '').to_numpy()
+            cleaned = raw.str.lower().str.strip()
+            separator = np.where(started & present, ' ', '')
+            documents = documents + separator + cleaned.where(present, '')
+            started |= present
+
+        # Create metadata
+        metadata = pd.DataFrame({
+            'id': DataProcessor._as_text(df, 'id'),
+            'name': DataProcessor._as_text(df, 'name'),
+            'category': DataProcessor._as_text(df, 'category'),
+            'subcategory': DataProcessor._as_text(df, 'subcategory'),
+            'price': DataProcessor._as_price(df, 'current_price'),
+            'raw_price': DataProcessor._as_price(df, 'raw_price'),
+            'discount': DataProcessor._as_price(df, 'discount'),
+            'brand': DataProcessor._as_text(df, 'brand'),
+            'model': DataProcessor._as_text(df, 'model'),
+            'likes_count': df['likes_count'].astype('int64') if 'likes_count' in df.columns else 0,
+            'is_new': df['is_new'].astype(bool) if 'is_new' in df.columns else False
+        }, index=df.index)
+
+        return documents.tolist(), metadata.to_dict('records')
+
+    @staticmethod
+    def _id_part(df: pd.DataFrame, column: str) -> pd.Series:
+        """Stringify an identifier column, restoring integers parsed as floats."""
+        if column not in df.columns:
+            return pd.Series('', index=df.index, dtype=object)
+        series = df[column]
+        if pd.api.types.is_float_dtype(series):
+            integral = series.notna() & (series % 1 == 0)
+            text = series.astype(str).astype(object)
+            text[integral] = series[integral].astype('int64').astype(str)
+        else:
+            text = series.astype(str).astype(object)
+        return text.where(series.notna(), '')
+
+    @staticmethod
+    def build_product_ids(df: pd.DataFrame, documents: List[str]) -> List[str]:
+        """Columnar equivalent of build_product_id for a whole frame."""
+        product_id = DataProcessor._id_part(df, 'id')
+        model = DataProcessor._id_part(df, 'model')
+        separator = np.where((product_id != '') & (model != ''), '_', '')
+        ids = (product_id + separator + model).tolist()
+        return [
+            product_id or "doc_" + hashlib.sha256(document.encode("utf-8")).hexdigest()[:16]
+            for product_id, document in zip(ids, documents)
+        ]
+
+    def build_product_id(self, row: pd.Series, document: str) -> str:
+        """Build a stable product id from the CSV's own id/model columns."""
+        product_id = row.get('id')
+        model = row.get('model')
+        parts = []
+        for value in (product_id, model):
+            if pd.isna(value) or str(value) == '':
+                continue
+            # Columns with missing values are parsed as floats
+            if isinstance(value, float) and value.is_integer():
+                value = int(value)
+            parts.append(str(value))
+        if parts:
+            return "_".join(parts)
+        # Rows without identifiers are keyed by their content
+        return "doc_" + hashlib.sha256(document.encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def content_hash(document: str, metadata: Dict) -> str:
+        """Hash a row's document and metadata to detect changes between ingests."""
+        payload = document + "\x00" + json.dumps(metadata, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def observe_stage(stage: str, seconds: float, rows: int) -> None:
+        """Record one ingestion stage's time and row count in the metrics."""
+        INGEST_STAGE_SECONDS.labels(stage).observe(seconds)
+        INGEST_ROWS.labels(stage).inc(rows)
+
+    @staticmethod
+    def timed_prepare_chunk(df: pd.DataFrame, source: str) -> Tuple[List[str], List[str], List[Dict]]:
+        """prepare_chunk, recorded as the build_documents stage."""
+        start = time.perf_counter()
+        prepared = DataProcessor.prepare_chunk(df, source)
+        DataProcessor.observe_stage("build_documents", time.perf_counter() - start, len(df))
+        return prepared
+
+    @staticmethod
+    def prepare_chunk(df: pd.DataFrame, source: str) -> Tuple[List[str], List[str], List[Dict]]:
+        """Turn a frame into (ids, documents, metadatas), keeping the last duplicate of each product."""
+        documents, metadatas = DataProcessor.build_documents(df)
+        products = {}
+        for product_id, document, metadata in zip(DataProcessor.build_product_ids(df, documents), documents, metadatas):
+            metadata['source'] = source
+            metadata['content_hash'] = DataProcessor.content_hash(document, metadata)
+            products[product_id] = (document, metadata)
+
+        ids = list(products)
+        return ids, [products[i][0] for i in ids], [products[i][1] for i in ids]
+
+    def _diff_chunk(self, ids: List[str], documents: List[str], metadatas: List[Dict],
+                    incremental: bool) -> Tuple[Tuple[List[str], List[str], List[Dict]], Dict[str, int]]:
+        """Select the new or changed products of one prepared chunk."""
+        existing = self.vector_store.get_metadatas(ids=ids) if incremental else {}
+        changed = [
+            i for i, (product_id, metadata) in enumerate(zip(ids, metadatas))
+            if existing.get(product_id, {}).get('content_hash') != metadata['content_hash']
+        ]
+
+        added = sum(1 for i in changed if ids[i] not in existing)
+        counts = {
+            "embeddings_generated": len(changed),
+            "rows_added": added,
+            "rows_updated": len(changed) - added,
+            "rows_unchanged": len(ids) - len(changed)
+        }
+        subset = (
+            [ids[i] for i in changed],
+            [documents[i] for i in changed],
+            [metadatas[i] for i in changed]
+        )
+        return subset, counts
+
+    def _ingest_chunk(self, ids: List[str], documents: List[str], metadatas: List[Dict],
+                      incremental: bool,
+                      checkpoint: Optional[Callable[[str, int], None]] = None) -> Dict[str, int]:
+        """Embed and upsert the new or changed products of one prepared chunk."""
+        (ids, documents, metadatas), counts = self._diff_chunk(ids, documents, metadatas, incremental)
+
+        # Generate embeddings and store in vector database
+        if ids:
+            start = time.perf_counter()
+            embeddings = self.embedding_generator.batch_generate(documents)
+            self.observe_stage("embed", time.perf_counter() - start, len(ids))
+            if checkpoint is not None:
+                checkpoint("embedded", len(ids))
+            start = time.perf_counter()
+            self.vector_store.upsert_documents(
+                documents=documents, metadatas=metadatas, ids=ids, embeddings=embeddings
             )
-            
-            return {
-                "file_name": file_path.name,
-                "rows_processed": len(df),
-                "embeddings_generated": len(documents)
-            }
+            self.observe_stage("write", time.perf_counter() - start, len(ids))
+
+        return counts
+
+    def _delete_missing(self, source: str, seen_ids: set) -> int:
+        """Delete products of a source that were not seen in the latest file."""
+        removed_ids = [
+            product_id for product_id in self.vector_store.get_ids(where={'source': source})
+            if product_id not in seen_ids
+        ]
+        self.vector_store.delete_documents(removed_ids)
+        return len(removed_ids)
+
+    def _stream_chunks(self, file_path: Path, source: str, chunk_size: int) -> Iterator[Tuple[int, Tuple]]:
+        """Parse and prepare chunks on a background thread, bounded by INGEST_QUEUE_SIZE."""
+        chunks: queue.Queue = queue.Queue(maxsize=Settings.INGEST_QUEUE_SIZE)
+        stop = threading.Event()
+        done = object()
+
+        def put(item) -> bool:
+            # Block while the consumer is behind, but give up if it stopped
+            while not stop.is_set():
+                try:
+                    chunks.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce():
+            try:
+                reader = iter(pd.read_csv(file_path, chunksize=chunk_size))
+                while True:
+                    start = time.perf_counter()
+                    chunk = next(reader, None)
+                    if chunk is None:
+                        break
+                    self.observe_stage("parse", time.perf_counter() - start, len(chunk))
+                    if not put((len(chunk), self.timed_prepare_chunk(chunk, source))):
+                        return
+                put(done)
+            except Exception as e:
+                put(e)
+
+        producer = threading.Thread(target=produce, name=f"csv-reader-{source}", daemon=True)
+        producer.start()
+        try:
+            while True:
+                item = chunks.get()
+                if item is done:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            producer.join()
+
+    def process_csv(self, file_path: Path, source: Optional[str] = None,
+                    incremental: bool = Settings.INCREMENTAL_INGESTION,
+                    streaming: Optional[bool] = None,
+                    chunk_size: int = Settings.INGEST_CHUNK_SIZE,
+                    progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """Process a single CSV file.
+
+        Products are keyed on their CSV id/model, so re-ingesting a file
+        upserts instead of colliding. In incremental mode only new or changed
+        rows are embedded, and products of the same source that disappeared
+        from the file are deleted.
+
+        In streaming mode (the default for files above
+        STREAMING_THRESHOLD_BYTES) the file is read in chunks of chunk_size
+        rows on a background thread while the previous chunk is embedded and
+        written, so memory stays bounded and early products become
+        searchable before the run finishes.
+        """
+        try:
+            file_path = Path(file_path)
+            source = source or file_path.name
+            if streaming is None:
+                streaming = file_path.stat().st_size > Settings.STREAMING_THRESHOLD_BYTES
+            self.logger.info(f"Processing {file_path}" + (" in streaming mode" if streaming else ""))
+
+            run = self._begin_run(source, file_path, chunk_size if streaming else 0, incremental)
+            if streaming:
+                chunks = self._stream_chunks(file_path, source, chunk_size)
+            else:
+                start = time.perf_counter()
+                df = pd.read_csv(file_path)
+                self.observe_stage("parse", time.perf_counter() - start, len(df))
+                chunks = iter([(len(df), self.timed_prepare_chunk(df, source))])
+
+            return self._ingest_chunks(chunks, file_path.name, source, incremental, progress, run)
             
         except Exception as e:
             self.logger.error(f"Error processing {file_path}: {str(e)}")
             raise
 
-    def process_directory(self, directory_path: str, max_workers: int = 4) -> List[Dict]:
+    def process_frames(self, frames: Iterable[pd.DataFrame], source: str, file_name: Optional[str] = None,
+                       incremental: bool = Settings.INCREMENTAL_INGESTION,
+                       progress: Optional[Callable[[Dict], None]] = None,
+                       file_path: Optional[Path] = None, chunk_size: int = 0) -> Dict:
+        """Ingest already parsed frames of one source, e.g. a CSV parsed for other uses as well.
+
+        When the frames come from file_path, read whole (chunk_size 0) or in
+        chunks of chunk_size rows, the run is checkpointed like process_csv.
+        """
+        try:
+            self.logger.info(f"Processing parsed frames of {source}")
+            run = self._begin_run(source, file_path, chunk_size, incremental) if file_path else None
+            chunks = ((len(frame), self.timed_prepare_chunk(frame, source)) for frame in frames)
+            return self._ingest_chunks(chunks, file_name or source, source, incremental, progress, run)
+        except Exception as e:
+            self.logger.error(f"Error processing {source}: {str(e)}")
+            raise
+
+    def _begin_run(self, source: str, file_path: Path, chunk_size: int,
+                   incremental: bool) -> Optional[Tuple[str, Dict[int, Dict]]]:
+        """Start or resume a checkpointed run, if checkpoints are enabled."""
+        if self.job_store is None:
+            return None
+        return self.job_store.begin(source, Path(file_path), chunk_size, incremental)
+
+    def _ingest_chunks(self, chunks: Iterator[Tuple[int, Tuple]], file_name: str, source: str,
+                       incremental: bool, progress: Optional[Callable[[Dict], None]] = None,
+                       run: Optional[Tuple[str, Dict[int, Dict]]] = None) -> Dict:
+        """Embed and write prepared chunks, then delete products of the source that disappeared.
+
+        progress, if given, receives a copy of the running counts after every
+        chunk. With a checkpointed run, chunks it already committed are only
+        parsed, for the deletion pass, and each new chunk is checkpointed as
+        parsed, embedded and committed.
+        """
+        run_id, committed = run if run is not None else (None, {})
+        try:
+            # Other processes pick up the run's changes once, not after every chunk
+            with self.vector_store.publish_batch():
+                result = self._ingest_checkpointed_chunks(chunks, file_name, source, incremental, progress,
+                                                          run_id, committed)
+        except BaseException as e:
+            if run_id is not None:
+                self.job_store.fail(run_id, str(e) or type(e).__name__)
+            raise
+        if run_id is not None:
+            self.job_store.finish(run_id, result)
+        return result
+
+    def _ingest_checkpointed_chunks(self, chunks: Iterator[Tuple[int, Tuple]], file_name: str, source: str,
+                                    incremental: bool, progress: Optional[Callable[[Dict], None]],
+                                    run_id: Optional[str], committed: Dict[int, Dict]) -> Dict:
+        result = {
+            "file_name": file_name,
+            "source": source,
+            "rows_processed": 0,
+            "chunks_processed": 0,
+            "embeddings_generated": 0,
+            "rows_added": 0,
+            "rows_updated": 0,
+            "rows_unchanged": 0,
+            "rows_deleted": 0,
+            "chunks_resumed": 0
+        }
+        seen_ids = set()
+        for index, (rows, (ids, documents, metadatas)) in enumerate(chunks):
+            if index in committed:
+                counts = committed[index]
+                result["chunks_resumed"] += 1
+            elif run_id is not None:
+                self.job_store.checkpoint(run_id, index, "parsed", rows)
+                counts = self._ingest_chunk(
+                    ids, documents, metadatas, incremental,
+                    checkpoint=lambda stage, count, index=index: self.job_store.checkpoint(run_id, index, stage, count)
+                )
+                self.job_store.checkpoint(run_id, index, "committed", rows, counts)
+            else:
+                counts = self._ingest_chunk(ids, documents, metadatas, incremental)
+            for key, value in counts.items():
+                result[key] += value
+            result["rows_processed"] += rows
+            result["chunks_processed"] += 1
+            seen_ids.update(ids)
+            if progress is not None:
+                progress(dict(result))
+
+        if incremental:
+            result["rows_deleted"] = self._delete_missing(source, seen_ids)
+
+        return result
+
+    def process_directory(self, directory_path: str, max_workers: int = Settings.MAX_WORKERS,
+                          use_processes: bool = Settings.INGEST_USE_PROCESSES) -> List[Dict]:
         """Process all CSV files in a directory."""
         directory = Path(directory_path)
+        if use_processes:
+            return self._process_directory_pipeline(sorted(directory.glob("*.csv")), max_workers)
+
         results = []
         
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
@@ -106,6 +458,243 @@ class DataProcessor:
         
         return results
 
+    @staticmethod
+    def _is_upload(file_path: Path) -> bool:
+        return Settings.UPLOAD_DIR in Path(file_path).parents
+
+    def discard_upload(self, file_path: Path) -> bool:
+        """Delete an uploaded file unless an unfinished ingestion run still needs it to resume."""
+        if self.job_store is not None and self.job_store.has_unfinished_run(file_path):
+            self.logger.info(f"Keeping {file_path} to resume its unfinished ingestion run")
+            return False
+        Path(file_path).unlink(missing_ok=True)
+        return True
+
+    def last_run(self, file_path: Path) -> Optional[Dict]:
+        """The latest checkpointed ingestion run over a file, if checkpoints are enabled."""
+        if self.job_store is None:
+            return None
+        return self.job_store.latest_run(file_path)
+
+    def resume_pending_runs(self) -> List[Dict]:
+        """Finish ingestion runs that a crash or failure left incomplete.
+
+        Each run is restarted with its original chunking and skips the chunks
+        it already committed. Runs whose file is gone or changed since are
+        marked abandoned. Uploaded files are removed once their run completes.
+        """
+        if self.job_store is None:
+            return []
+
+        results = []
+        for run in self.job_store.unfinished_runs():
+            file_path = Path(run["file_path"])
+            try:
+                fingerprint = self.job_store.file_fingerprint(file_path) if file_path.exists() else None
+            except OSError:
+                fingerprint = None
+            if fingerprint != run["fingerprint"]:
+                self.logger.warning(f"Abandoning ingestion run {run['run_id']}: {file_path} is missing or changed")
+                self.job_store.fail(run["run_id"], "Source file is missing or changed", status="abandoned")
+                if self._is_upload(file_path):
+                    file_path.unlink(missing_ok=True)
+                continue
+
+            self.logger.info(f"Resuming ingestion of {file_path} ({run['checkpoints']['chunks_committed']} "
+                             f"chunks already committed)")
+            try:
+                results.append(self.process_csv(
+                    file_path, source=run["source"], incremental=run["incremental"],
+                    streaming=run["chunk_size"] > 0,
+                    chunk_size=run["chunk_size"] or Settings.INGEST_CHUNK_SIZE
+                ))
+            except Exception as e:
+                self.logger.error(f"Failed to resume ingestion of {file_path}: {str(e)}")
+                continue
+            if self._is_upload(file_path):
+                file_path.unlink(missing_ok=True)
+        return results
+
+    def _process_directory_pipeline(self, files: List[Path], max_workers: int,
+                                    incremental: bool = Settings.INCREMENTAL_INGESTION,
+                                    chunk_size: int = Settings.INGEST_CHUNK_SIZE) -> List[Dict]:
+        """Parse and prepare files in a process pool, embed here, and commit from one writer thread.
+
+        Chroma's PersistentClient is not meant for concurrent writers, so
+        every upsert and delete goes through a single writer thread while
+        parsing and document building scale across processes. Each file is a
+        checkpointed run; the writer checkpoints a chunk as committed once its
+        upsert returns.
+        """
+        stages = {stage: {"rows": 0, "seconds": 0.0} for stage in ("prepare", "embed", "write")}
+        results = {
+            file_path.name: {
+                "file_name": file_path.name,
+                "source": file_path.name,
+                "rows_processed": 0,
+                "chunks_processed": 0,
+                "embeddings_generated": 0,
+                "rows_added": 0,
+                "rows_updated": 0,
+                "rows_unchanged": 0,
+                "rows_deleted": 0,
+                "chunks_resumed": 0
+            }
+            for file_path in files
+        }
+        seen_ids = {source: set() for source in results}
+        failed = {}
+        writer_errors = []
+        writes: queue.Queue = queue.Queue(maxsize=Settings.INGEST_QUEUE_SIZE)
+        runs = {file_path.name: self._begin_run(file_path.name, file_path, chunk_size, incremental)
+                for file_path in files}
+        runs = {source: run for source, run in runs.items() if run is not None}
+        chunk_indexes = {source: 0 for source in results}
+
+        def write():
+            # Other processes pick up the run's changes once, when the writer stops
+            with self.vector_store.publish_batch():
+                while True:
+                    item = writes.get()
+                    if item is None:
+                        return
+                    if writer_errors:
+                        continue
+                    try:
+                        start = time.perf_counter()
+                        if item[0] == "chunk":
+                            _, source, index, rows, counts, ids, documents, metadatas, embeddings = item
+                            if ids:
+                                self.vector_store.upsert_documents(
+                                    documents=documents, metadatas=metadatas, ids=ids, embeddings=embeddings
+                                )
+                                stages["write"]["rows"] += len(ids)
+                                self.observe_stage("write", time.perf_counter() - start, len(ids))
+                            if source in runs:
+                                self.job_store.checkpoint(runs[source][0], index, "committed", rows, counts)
+                        else:
+                            _, source = item
+                            if incremental:
+                                results[source]["rows_deleted"] = self._delete_missing(source, seen_ids.pop(source))
+                            if source in runs:
+                                self.job_store.finish(runs.pop(source)[0], results[source])
+                        stages["write"]["seconds"] += time.perf_counter() - start
+                    except Exception as e:
+                        writer_errors.append(e)
+
+        writer = threading.Thread(target=write, name="vector-store-writer", daemon=True)
+        writer.start()
+        wall_start = time.perf_counter()
+
+        # Spawned workers do not inherit the parent's threads or Chroma handles
+        context = multiprocessing.get_context("spawn")
+        prepared = context.Queue(maxsize=max(2, max_workers) * Settings.INGEST_QUEUE_SIZE)
+        stop = context.Event()
+        executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=context,
+                                       initializer=_init_prepare_worker, initargs=(prepared, stop))
+        futures = {}
+        try:
+            futures = {
+                executor.submit(_prepare_file_chunks, str(file_path), file_path.name, chunk_size):
+                    file_path.name
+                for file_path in files
+            }
+
+            pending = set(results)
+            while pending and not writer_errors:
+                try:
+                    kind, source, payload = prepared.get(timeout=1.0)
+                except queue.Empty:
+                    # A worker that died without reporting leaves its file pending forever
+                    for future, source in futures.items():
+                        if source in pending and future.done() and future.exception() is not None:
+                            kind, payload = "error", str(future.exception())
+                            break
+                    else:
+                        continue
+                if kind == "error":
+                    self.logger.error(f"Failed to process file {source}: {payload}")
+                    failed[source] = payload
+                    pending.discard(source)
+                    if source in runs:
+                        self.job_store.fail(runs.pop(source)[0], payload)
+                    continue
+                if kind == "done":
+                    pending.discard(source)
+                    writes.put(("finish", source))
+                    continue
+
+                rows, (ids, documents, metadatas), parse_seconds, build_seconds = payload
+                stages["prepare"]["rows"] += rows
+                stages["prepare"]["seconds"] += parse_seconds + build_seconds
+                self.observe_stage("parse", parse_seconds, rows)
+                self.observe_stage("build_documents", build_seconds, rows)
+                result = results[source]
+                result["rows_processed"] += rows
+                result["chunks_processed"] += 1
+                seen_ids[source].update(ids)
+                # Each worker sends a file's chunks in order, so arrival order is the chunk index
+                index = chunk_indexes[source]
+                chunk_indexes[source] += 1
+
+                run_id, committed = runs.get(source, (None, {}))
+                if index in committed:
+                    for key, value in committed[index].items():
+                        result[key] += value
+                    result["chunks_resumed"] += 1
+                    continue
+                if run_id is not None:
+                    self.job_store.checkpoint(run_id, index, "parsed", rows)
+
+                start = time.perf_counter()
+                (ids, documents, metadatas), counts = self._diff_chunk(ids, documents, metadatas, incremental)
+                embeddings = self.embedding_generator.batch_generate(documents) if ids else []
+                stages["embed"]["rows"] += len(ids)
+                stages["embed"]["seconds"] += time.perf_counter() - start
+                self.observe_stage("embed", time.perf_counter() - start, len(ids))
+                if run_id is not None and ids:
+                    self.job_store.checkpoint(run_id, index, "embedded", len(ids))
+
+                for key, value in counts.items():
+                    result[key] += value
+                writes.put(("chunk", source, index, rows, counts, ids, documents, metadatas, embeddings))
+        finally:
+            # After an error nothing reads prepared, so stop the workers and drain it until they exit
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+            while not all(future.done() for future in futures):
+                try:
+                    prepared.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            executor.shutdown(wait=True)
+            writes.put(None)
+            writer.join()
+            # Runs the writer did not finish stay resumable from their last committed chunk
+            for source, (run_id, _) in runs.items():
+                self.job_store.fail(run_id, str(writer_errors[0]) if writer_errors else "Interrupted")
+
+        if writer_errors:
+            self.logger.error(f"Vector store writer failed: {str(writer_errors[0])}")
+            raise writer_errors[0]
+
+        wall_seconds = time.perf_counter() - wall_start
+        self.pipeline_stats = {
+            "files": len(files),
+            "workers": max_workers,
+            "wall_seconds": wall_seconds,
+            **{
+                f"{stage}_rows_per_sec": (totals["rows"] / totals["seconds"]) if totals["seconds"] else 0.0
+                for stage, totals in stages.items()
+            },
+            "stages": stages
+        }
+        self.logger.info(
+            f"Ingested {len(files) - len(failed)} files in {wall_seconds:.1f}s: "
+            + ", ".join(f"{stage} {self.pipeline_stats[f'{stage}_rows_per_sec']:.0f} rows/s" for stage in stages)
+        )
+        return [result for source, result in results.items() if source not in failed]
+
     def generate_statistics(self, processing_results: List[Dict]) -> Dict:
         """Generate statistics about the processed data."""
         total_rows = sum(result['rows_processed'] for result in processing_results)
@@ -116,4 +705,42 @@ class DataProcessor:
             "total_rows_processed": total_rows,
             "total_embeddings_generated": total_embeddings,
             "files_summary": processing_results
-        }
\ No newline at end of file
+        }
+
+_prepared_queue = None
+_stop_event = None
+
+def _init_prepare_worker(prepared_queue, stop_event) -> None:
+    """Process-pool initializer: keep the shared queue prepared chunks are sent to, and the stop signal."""
+    global _prepared_queue, _stop_event
+    _prepared_queue = prepared_queue
+    _stop_event = stop_event
+
+def _send_prepared(item) -> bool:
+    """Put item on the shared queue, giving up once the parent signals stop."""
+    while not _stop_event.is_set():
+        try:
+            _prepared_queue.put(item, timeout=1.0)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _prepare_file_chunks(file_path: str, source: str, chunk_size: int) -> None:
+    """Process-pool task: parse a CSV in chunks and send prepared chunks to the parent."""
+    try:
+        reader = iter(pd.read_csv(file_path, chunksize=chunk_size))
+        while True:
+            start = time.perf_counter()
+            chunk = next(reader, None)
+            if chunk is None:
+                break
+            parsed = time.perf_counter()
+            prepared = DataProcessor.prepare_chunk(chunk, source)
+            # Worker metrics are not exported, so stage times travel back with the chunk
+            if not _send_prepared(("chunk", source, (len(chunk), prepared, parsed - start,
+                                                     time.perf_counter() - parsed))):
+                return
+        _send_prepared(("done", source, None))
+    except Exception as e:
+        _send_prepared(("error", source, str(e)))
@@ -0,0 +1,284 @@
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+import logging
+import re
+import threading
+from config.settings import Settings
+from database.vector_store import CatalogListener
+
+class IntentParser(CatalogListener):
+    """Rule and lexicon based query intent parser built from the catalog vocabulary.
+
+    Produces the same intent dict as the LLM prompt plus a 'confidence'
+    score. The vocabulary of categories, subcategories and brands follows
+    ingestion through the CatalogListener hooks.
+    """
+
+    NUMBER = r"\$?\s*(\d+(?:\.\d+)?)\s*(?:\$|usd|dollars?|bucks)?"
+    PRICE_PATTERNS = [
+        # (pattern, groups mapped to (min, max))
+        (re.compile(rf"\bbetween\s+{NUMBER}\s*(?:and|-|to)\s*{NUMBER}"), ("min", "max")),
+        (re.compile(rf"\bfrom\s+{NUMBER}\s*(?:-|to)\s*{NUMBER}"), ("min", "max")),
+        (re.compile(rf"{NUMBER}\s*(?:-|to)\s*{NUMBER}"), ("min", "max")),
+        (re.compile(rf"(?:\bunder|\bbelow|\bless than|\bcheaper than|\bat most|\bup to|\bno more than|"
+                    rf"\bmax(?:imum)?|\bwithin|<=?)\s*{NUMBER}"), ("max",)),
+        (re.compile(rf"{NUMBER}\s*(?:or less|or under|or cheaper|max)\b"), ("max",)),
+        (re.compile(rf"(?:\bover|\babove|\bmore than|\bat least|\bmin(?:imum)?|\bstarting at|>=?)\s*{NUMBER}"), ("min",)),
+        (re.compile(rf"{NUMBER}\s*(?:or more|and up|and above|\+)"), ("min",)),
+    ]
+    SORT_CUES = [
+        (re.compile(r"\b(?:cheapest|lowest price[sd]?|least expensive|lowest cost|most affordable)\b"), "price_asc"),
+        (re.compile(r"\b(?:most expensive|priciest|highest price[sd]?|most premium)\b"), "price_desc"),
+        (re.compile(r"\b(?:most liked|most popular|best selling|best-selling|bestsellers?|top rated|"
+                    r"most loved|popular|trending)\b"), "likes_desc"),
+        (re.compile(r"\b(?:biggest discounts?|best deals?|on sale|most discounted|highest discounts?)\b"), "discount_desc"),
+        (re.compile(r"\b(?:newest|latest|new arrivals?|just arrived|recently added)\b"), "newest"),
+    ]
+    TYPE_CUES = [
+        (re.compile(r"\b(?:compare|comparison|versus|vs\.?|difference between|better than)\b"), "compare"),
+        (re.compile(r"\b(?:average|how many|count|number of|distribution|statistics|stats|total|"
+                    r"breakdown|median|range of prices)\b"), "analyze"),
+    ]
+    NEGATION = re.compile(r"\b(?:not|no|without|except|excluding|exclude|other than|but not)\b")
+    CATEGORY_SYNONYMS = {
+        "jewelry": ["jewellery", "jewel", "jewels"],
+        "kids": ["kid", "children", "child", "baby", "babies", "toddler", "toddlers"],
+        "beauty": ["makeup", "make-up", "cosmetics", "cosmetic", "skincare"],
+    }
+    STOPWORDS = {
+        "a", "an", "the", "me", "show", "find", "what", "which", "are", "is", "for", "of", "some",
+        "any", "please", "i", "want", "with", "in", "to", "and", "or", "my", "you", "do", "have",
+        "get", "list", "give", "need", "looking", "buy", "that", "items", "products", "product",
+        "price", "prices", "priced", "cheap", "affordable", "best", "good", "by", "from", "on", "at",
+        "can", "could", "would", "should", "there", "it", "this", "these", "those", "all", "your",
+        "most", "new", "top", "$", "usd", "dollars", "dollar", "bucks",
+    }
+    TOKEN = re.compile(r"[\w$]+(?:[.'-][\w]+)*")
+
+    def __init__(self, confidence_threshold: float = Settings.INTENT_FAST_PATH_CONFIDENCE):
+        self.confidence_threshold = confidence_threshold
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+        self.categories: Counter = Counter()
+        self.subcategories: Counter = Counter()
+        self.brands: Counter = Counter()
+        self.words = set()
+        self._products: Dict[str, Tuple[str, str, str]] = {}
+        self._lexicon = None
+
+        self.fast_path_count = 0
+        self.fallback_count = 0
+
+    # Vocabulary maintenance
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return " ".join(str(text).lower().split())
+
+    @staticmethod
+    def _is_value(value) -> bool:
+        return bool(value) and str(value).strip().lower() not in ("nan", "none")
+
+    def on_upsert(self, ids: List[str], documents: List[str], metadatas: List[Dict]) -> None:
+        with self._lock:
+            for product_id, document, metadata in zip(ids, documents, metadatas):
+                self._forget(product_id)
+                terms = (
+                    str(metadata.get('category', '')),
+                    str(metadata.get('subcategory', '')),
+                    str(metadata.get('brand', ''))
+                )
+                self._products[product_id] = terms
+                for counter, term in zip((self.categories, self.subcategories, self.brands), terms):
+                    if self._is_value(term):
+                        counter[term] += 1
+                # Catalog words only grow; they just tell known words from unknown ones
+                self.words.update(self.TOKEN.findall(self._normalize(document)))
+            self._lexicon = None
+
+    def on_delete(self, ids: List[str]) -> None:
+        with self._lock:
+            for product_id in ids:
+                self._forget(product_id)
+            self._lexicon = None
+
+    def on_clear(self) -> None:
+        with self._lock:
+            self.categories.clear()
+            self.subcategories.clear()
+            self.brands.clear()
+            self._products.clear()
+            self._lexicon = None
+
+    def on_refresh(self, records) -> None:
+        """Collect the vocabulary aside, then swap it in for parsing."""
+        fresh = type(self)(self.confidence_threshold)
+        for ids, documents, metadatas in records:
+            fresh.on_upsert(ids, documents, metadatas)
+        with self._lock:
+            self.categories = fresh.categories
+            self.subcategories = fresh.subcategories
+            self.brands = fresh.brands
+            self.words = fresh.words
+            self._products = fresh._products
+            self._lexicon = None
+
+    def _forget(self, product_id: str) -> None:
+        terms = self._products.pop(product_id, None)
+        if terms is None:
+            return
+        for counter, term in zip((self.categories, self.subcategories, self.brands), terms):
+            if counter[term] > 1:
+                counter[term] -= 1
+            else:
+                counter.pop(term, None)
+
+    @staticmethod
+    def _alternation(phrases: Dict[str, str]) -> Optional[re.Pattern]:
+        """Compile phrases into one whole-word regex, longest first."""
+        if not phrases:
+            return None
+        ordered = sorted(phrases, key=len, reverse=True)
+        return re.compile(r"(?<![\w])(" + "|".join(re.escape(p) for p in ordered) + r")(?![\w])")
+
+    def _build_lexicon(self) -> Dict:
+        """Map normalized phrases to the stored category/subcategory/brand values."""
+        categories, subcategories, brands = {}, {}, {}
+        # The most frequent spelling wins when several normalize the same way
+        for value, _ in reversed(self.categories.most_common()):
+            normalized = self._normalize(value)
+            for phrase in {normalized, normalized.rstrip("s"), normalized + "s"} | set(self.CATEGORY_SYNONYMS.get(normalized, [])):
+                categories[phrase] = value
+        for value, _ in reversed(self.subcategories.most_common()):
+            subcategories[self._normalize(value)] = value
+        for value, _ in reversed(self.brands.most_common()):
+            brands[self._normalize(value)] = value
+
+        return {
+            "categories": (categories, self._alternation(categories)),
+            "subcategories": (subcategories, self._alternation(subcategories)),
+            "brands": (brands, self._alternation(brands)),
+        }
+
+    # Parsing
+
+    def _extract_price(self, text: str) -> Tuple[Optional[Tuple], str]:
+        """Find a price range and blank out the consumed text."""
+        minimum = maximum = None
+        for pattern, roles in self.PRICE_PATTERNS:
+            for match in list(pattern.finditer(text)):
+                values = [float(group) for group in match.groups()]
+                for role, value in zip(roles, values):
+                    if role == "min" and minimum is None:
+                        minimum = value
+                    elif role == "max" and maximum is None:
+                        maximum = value
+                text = text[:match.start()] + " " * (match.end() - match.start()) + text[match.end():]
+        if minimum is None and maximum is None:
+            return None, text
+        if minimum is not None and maximum is not None and minimum > maximum:
+            minimum, maximum = maximum, minimum
+        return (minimum, maximum), text
+
+    @staticmethod
+    def _match_values(pattern: Optional[re.Pattern], lookup: Dict[str, str], text: str) -> Tuple[List[str], str]:
+        """Return the distinct stored values mentioned in text, blanking the matches."""
+        if pattern is None:
+            return [], text
+        values = []
+        for match in pattern.finditer(text):
+            value = lookup[match.group(1)]
+            if value not in values:
+                values.append(value)
+        return values, pattern.sub(lambda m: " " * len(m.group(0)), text)
+
+    def parse(self, query: str) -> Dict:
+        """Parse a query into the intent dict, including a 'confidence' score."""
+        with self._lock:
+            if self._lexicon is None:
+                self._lexicon = self._build_lexicon()
+            lexicon = self._lexicon
+            words = self.words
+
+        text = self._normalize(query)
+        confidence = 1.0
+        filters: Dict = {}
+
+        price_range, text = self._extract_price(text)
+        if price_range is not None:
+            filters['price_range'] = price_range
+
+        sort = None
+        for pattern, value in self.SORT_CUES:
+            if pattern.search(text):
+                sort = value
+                text = pattern.sub(" ", text)
+                break
+
+        intent_type = "search"
+        for pattern, value in self.TYPE_CUES:
+            if pattern.search(text):
+                intent_type = value
+                text = pattern.sub(" ", text)
+                break
+
+        brands, text = self._match_values(lexicon["brands"][1], lexicon["brands"][0], text)
+        subcategories, text = self._match_values(lexicon["subcategories"][1], lexicon["subcategories"][0], text)
+        categories, text = self._match_values(lexicon["categories"][1], lexicon["categories"][0], text)
+
+        if len(categories) == 1:
+            filters['category'] = categories[0]
+        elif len(categories) > 1 and intent_type != "compare":
+            confidence -= 0.3
+        if len(subcategories) == 1:
+            filters['subcategory'] = subcategories[0]
+        elif len(subcategories) > 1 and intent_type != "compare":
+            confidence -= 0.3
+        if len(brands) == 1:
+            filters['brand'] = brands[0]
+        elif len(brands) > 1 and intent_type != "compare":
+            confidence -= 0.3
+
+        # Penalize what the rules cannot account for
+        if re.search(r"\d", text):
+            confidence -= 0.5
+        if self.NEGATION.search(text):
+            confidence -= 0.5
+        remaining = [token for token in self.TOKEN.findall(text) if token not in self.STOPWORDS]
+        if remaining:
+            unknown = sum(1 for token in remaining if token not in words and token.rstrip("s") not in words)
+            confidence -= 0.4 * unknown / len(remaining)
+        if len(remaining) > 12:
+            confidence -= 0.2
+        if intent_type == "compare" and len(brands) + len(categories) + len(subcategories) < 2:
+            confidence -= 0.3
+
+        return {
+            "type": intent_type,
+            "filters": filters,
+            "sort": sort,
+            "confidence": round(max(confidence, 0.0), 3)
+        }
+
+    def try_parse(self, query: str) -> Optional[Dict]:
+        """Return the parsed intent if confident enough, counting fast-path usage."""
+        intent = self.parse(query)
+        with self._lock:
+            if intent["confidence"] >= self.confidence_threshold:
+                self.fast_path_count += 1
+                return intent
+            self.fallback_count += 1
+        return None
+
+    def get_stats(self) -> Dict:
+        """Return the share of queries served on the fast path."""
+        total = self.fast_path_count + self.fallback_count
+        return {
+            "fast_path": self.fast_path_count,
+            "llm_fallback": self.fallback_count,
+            "fast_path_ratio": self.fast_path_count / total if total else 0.0,
+            "categories": len(self.categories),
+            "subcategories": len(self.subcategories),
+            "brands": len(self.brands)
+        }
@@ -1,63 +1,305 @@
-from typing import Dict, List, Optional
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+import ast
+import json
 import logging
-from database.vector_store import VectorStore
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from database.vector_store import VectorStore, matches_where
 from api.groq_client import GroqClient
+from agents.answer_cache import AnswerCache
+from agents.intent_parser import IntentParser
+from agents.query_history import QueryHistory
+from api.metrics import QUERY_STAGE_SECONDS
+from database.columnar_index import ColumnarIndex
 from config.prompts import QUERY_PROMPTS
+from config.settings import Settings
+
+@dataclass
+class Retrieval:
+    """A query's intent and the products retrieved for it."""
+    intent: Dict
+    products: List[Dict]
+    # Aggregates over the matching products, for analytic intents
+    statistics: Optional[Dict] = None
+    # The intent or products are a fallback after a failure, so answers from them are not cached
+    degraded: bool = False
 
 class QueryAgent:
-    def __init__(self, vector_store: VectorStore, groq_client: GroqClient):
+    ERROR_RESPONSE = "I apologize, but I encountered an error while generating the response."
+    # Intent sort values answered exactly from the columnar index: (column, descending, extra filter)
+    SORT_ORDERS = {
+        'price_asc': ('price', False, None),
+        'price_desc': ('price', True, None),
+        'likes_desc': ('likes_count', True, None),
+        'discount_desc': ('discount', True, None),
+        'newest': ('likes_count', True, {'is_new': True}),
+    }
+
+    def __init__(self, vector_store: VectorStore, groq_client: GroqClient,
+                 answer_cache: Optional[AnswerCache] = None,
+                 intent_parser: Optional[IntentParser] = None,
+                 columnar_index: Optional[ColumnarIndex] = None,
+                 query_history: Optional[QueryHistory] = None):
         self.vector_store = vector_store
         self.groq_client = groq_client
         self.logger = logging.getLogger(__name__)
-        self.query_history = []
+        if query_history is None:
+            query_history = QueryHistory(log_path=Settings.QUERY_LOG_PATH if Settings.QUERY_LOG_ENABLED else None)
+        self.query_history = query_history
+        if answer_cache is None and Settings.ANSWER_CACHE_ENABLED:
+            answer_cache = AnswerCache(vector_store.embedding_generator)
+        self.answer_cache = answer_cache
+        if intent_parser is None and Settings.INTENT_FAST_PATH_ENABLED:
+            intent_parser = IntentParser()
+            vector_store.add_listener(intent_parser)
+        self.intent_parser = intent_parser
+        if columnar_index is None and Settings.COLUMNAR_INDEX_ENABLED:
+            columnar_index = ColumnarIndex()
+            vector_store.add_listener(columnar_index)
+        self.columnar_index = columnar_index
+        self.n_results = 5
+        self.executor = ThreadPoolExecutor(max_workers=Settings.QUERY_WORKERS, thread_name_prefix="query")
+        self.speculation_hits = 0
+        self.speculation_misses = 0
+        self._stats_lock = threading.Lock()
+
+    @staticmethod
+    def _parse_intent_response(response: str) -> Dict:
+        """Parse the dict literal out of the LLM's intent response."""
+        match = re.search(r"\{.*\}", response, re.DOTALL)
+        if match is None:
+            raise ValueError(f"No intent dictionary in response: {response[:100]}")
+        literal = match.group(0)
+        try:
+            intent = ast.literal_eval(literal)
+        except (ValueError, SyntaxError):
+            intent = json.loads(literal)
+        if not isinstance(intent, dict):
+            raise ValueError("Intent response is not a dictionary")
+        intent.setdefault("type", "general")
+        intent["filters"] = intent.get("filters") or {}
+        intent.setdefault("sort", None)
+        return intent
+
+    @classmethod
+    def _is_intent_response(cls, response: str) -> bool:
+        try:
+            cls._parse_intent_response(response)
+        except Exception:
+            return False
+        return True
 
     def analyze_query_intent(self, query: str) -> Dict:
-        """Analyze the user's query intent using LLM."""
+        """Analyze the user's query intent, using the LLM only when the rule-based parser is unsure."""
+        return self._resolve_intent(query)[0]
+
+    def _resolve_intent(self, query: str) -> Tuple[Dict, bool]:
+        """The query's intent, and whether it is only the general fallback for a failed LLM call."""
+        intent = self._try_fast_intent(query)
+        if intent is not None:
+            return intent, False
+        return self._llm_intent(query)
+
+    def _llm_intent(self, query: str) -> Tuple[Dict, bool]:
+        intent = self._analyze_intent_with_llm(query)
+        if intent is None:
+            return {"type": "general", "filters": {}, "sort": None}, True
+        return intent, False
+
+    def _try_fast_intent(self, query: str) -> Optional[Dict]:
+        """Parse the intent with the rule-based parser, if it is enabled and sure."""
+        if self.intent_parser is None:
+            return None
+        with QUERY_STAGE_SECONDS.labels("intent_fast_path").time():
+            return self.intent_parser.try_parse(query)
+
+    def _analyze_intent_with_llm(self, query: str) -> Optional[Dict]:
+        """Analyze the user's query intent using LLM, or None if the call or its reply failed."""
         try:
             prompt = QUERY_PROMPTS['intent_analysis'].format(query=query)
-            response = self.groq_client.generate_response(prompt)
+            with QUERY_STAGE_SECONDS.labels("intent").time():
+                response = self.groq_client.generate_response(
+                    prompt, temperature=0, cache=True, accept=self._is_intent_response
+                )
             
             # Parse the structured response
-            intent = eval(response)  # Safe since we control the LLM prompt
-            return intent
+            return self._parse_intent_response(response)
         except Exception as e:
             self.logger.error(f"Error analyzing query intent: {str(e)}")
-            return {
-                "type": "general",
-                "filters": {},
-                "sort": None
-            }
+            return None
 
     def apply_filters(self, intent: Dict) -> Dict:
         """Convert intent into vector store filters."""
-        filters = {}
+        intent_filters = intent.get('filters') or {}
+        conditions = []
         
-        if 'category' in intent['filters']:
-            filters['category'] = intent['filters']['category']
+        if intent_filters.get('category'):
+            conditions.append({'category': intent_filters['category']})
+
+        if intent_filters.get('subcategory'):
+            conditions.append({'subcategory': intent_filters['subcategory']})
             
-        if 'price_range' in intent['filters']:
-            min_price, max_price = intent['filters']['price_range']
-            filters['price'] = {'$gte': min_price, '$lte': max_price}
+        if intent_filters.get('price_range'):
+            min_price, max_price = intent_filters['price_range']
+            if min_price is not None:
+                conditions.append({'price': {'$gte': float(min_price)}})
+            if max_price is not None:
+                conditions.append({'price': {'$lte': float(max_price)}})
             
-        if 'brand' in intent['filters']:
-            filters['brand'] = intent['filters']['brand']
+        if intent_filters.get('brand'):
+            conditions.append({'brand': intent_filters['brand']})
         
-        return filters
+        # Chroma expects a single condition or an explicit $and
+        if not conditions:
+            return {}
+        return conditions[0] if len(conditions) == 1 else {'$and': conditions}
+
+    def _is_structured(self, intent: Dict) -> bool:
+        """Whether the intent is a ranking or analytic one the columnar index can answer."""
+        if self.columnar_index is None:
+            return False
+        if intent.get('sort') not in self.SORT_ORDERS and intent.get('type') != 'analyze':
+            return False
+        return self.columnar_index.supports(self.apply_filters(intent))
+
+    def _lexical_candidates(self, query: str, where: Dict, limit: int) -> Optional[List[str]]:
+        """Ids of up to limit products whose text matches the query's content words.
+
+        Keeps "cheapest necklaces" about necklaces; sort and analysis cues,
+        category names and generic words are dropped first since the intent
+        already covers them. None when no content words are left, so the
+        filters alone decide; an empty list when nothing matches them.
+        """
+        lexical_index = self.vector_store.lexical_index
+        if lexical_index is None:
+            return None
+        text = query.lower()
+        for pattern, _ in IntentParser.SORT_CUES + IntentParser.TYPE_CUES:
+            text = pattern.sub(" ", text)
+        ignored = set(IntentParser.STOPWORDS)
+        for category in self.columnar_index.values['category']:
+            ignored.update({category.lower(), category.lower().rstrip('s')})
+        terms = [term for term in lexical_index.tokenize(text)
+                 if term not in ignored and term.rstrip('s') not in ignored and not term.isdigit()]
+        if not terms:
+            return None
+        # The index does not stem, so "necklaces" also looks for "necklace"
+        terms += [term.rstrip('s') for term in terms if term.endswith('s')]
+        return [product_id for product_id, _ in lexical_index.search(" ".join(terms), limit, where)]
+
+    def get_structured_products(self, query: str, intent: Dict) -> Tuple[List[Dict], Optional[Dict]]:
+        """Answer ranking and analytic intents exactly from the columnar index, without vector search.
+
+        Analytic intents also get price, discount and likes aggregates over
+        the matching products for the response prompt; otherwise the
+        statistics are None.
+        """
+        start = time.perf_counter()
+        where = self.apply_filters(intent)
+        column, descending, extra = self.SORT_ORDERS.get(intent.get('sort'), ('likes_count', True, None))
+        if extra:
+            where = {'$and': [where, extra]} if where else extra
 
-    def get_relevant_products(self, query: str, intent: Dict) -> List[Dict]:
+        analyze = intent.get('type') == 'analyze'
+        # Aggregates need every matching product, a ranking only the best lexical matches
+        candidates = self._lexical_candidates(
+            query, where, self.columnar_index.size if analyze else Settings.RANKING_LEXICAL_CANDIDATES
+        )
+        ids = self.columnar_index.top_k(column, self.n_results, descending=descending, where=where, ids=candidates)
+        statistics = None
+        if analyze:
+            group_by = 'brand' if intent.get('filters', {}).get('category') else 'category'
+            statistics = {
+                "matching_products": self.columnar_index.count(where, ids=candidates),
+                "price": self.columnar_index.aggregate('price', where=where, ids=candidates),
+                "discount": self.columnar_index.aggregate('discount', where=where, ids=candidates),
+                "likes_count": self.columnar_index.aggregate('likes_count', where=where, ids=candidates),
+                f"price_by_{group_by}": self.columnar_index.aggregate(
+                    'price', group_by=group_by, where=where, ids=candidates
+                )
+            }
+        products = self.vector_store.get_records(ids)
+        QUERY_STAGE_SECONDS.labels("retrieve").observe(time.perf_counter() - start)
+        return products, statistics
+
+    def get_relevant_products(self, query: str, intent: Dict) -> Retrieval:
         """Get relevant products based on query and intent."""
         filters = self.apply_filters(intent)
         
         try:
+            if self._is_structured(intent):
+                products, statistics = self.get_structured_products(query, intent)
+                return Retrieval(intent, products, statistics)
+
             results = self.vector_store.query_similar(
                 query_text=query,
                 filters=filters,
-                n_results=5
+                n_results=self.n_results
             )
-            return results
+            return Retrieval(intent, results)
         except Exception as e:
             self.logger.error(f"Error retrieving products: {str(e)}")
-            return []
+            return Retrieval(intent, [], degraded=True)
+
+    def retrieve(self, query: str) -> Retrieval:
+        """Analyze intent and retrieve products.
+
+        When the intent needs the LLM and speculative retrieval is enabled,
+        an unfiltered, over-fetched search runs while the intent call is in
+        flight. The intent's filters are then applied to those candidates in
+        memory, and a filtered search only runs if too few survive.
+        """
+        intent = self._try_fast_intent(query)
+        if intent is not None:
+            return self.get_relevant_products(query, intent)
+
+        if not Settings.SPECULATIVE_RETRIEVAL:
+            intent, degraded = self._llm_intent(query)
+            return self._mark_degraded(self.get_relevant_products(query, intent), degraded)
+
+        intent_future = self.executor.submit(self._llm_intent, query)
+        try:
+            candidates = self.vector_store.query_similar(
+                query_text=query,
+                n_results=Settings.SPECULATIVE_OVERFETCH
+            )
+        except Exception as e:
+            self.logger.error(f"Error in speculative retrieval: {str(e)}")
+            candidates = None
+        intent, degraded = intent_future.result()
+
+        if candidates is not None and not self._is_structured(intent):
+            filters = self.apply_filters(intent)
+            survivors = [c for c in candidates if matches_where(c['metadata'], filters)][:self.n_results]
+            # A short candidate list already covers every matching product
+            exhaustive = len(candidates) < Settings.SPECULATIVE_OVERFETCH
+            if len(survivors) >= self.n_results or exhaustive:
+                self._record_speculation(True)
+                return Retrieval(intent, survivors, degraded=degraded)
+
+        self._record_speculation(False)
+        return self._mark_degraded(self.get_relevant_products(query, intent), degraded)
+
+    @staticmethod
+    def _mark_degraded(retrieval: Retrieval, degraded: bool) -> Retrieval:
+        retrieval.degraded = retrieval.degraded or degraded
+        return retrieval
+
+    def _record_speculation(self, sufficient: bool) -> None:
+        with self._stats_lock:
+            if sufficient:
+                self.speculation_hits += 1
+            else:
+                self.speculation_misses += 1
+            total = self.speculation_hits + self.speculation_misses
+            ratio = self.speculation_hits / total
+        self.logger.info(
+            f"Speculative retrieval {'sufficient' if sufficient else 'insufficient, re-queried'} "
+            f"({ratio:.0%} sufficient over {total} queries)"
+        )
 
     def format_product_context(self, products: List[Dict]) -> str:
         """Format product information for LLM context."""
@@ -73,52 +315,244 @@ Likes: {product['metadata'].get('likes_count', 0)}
         
         return "\n\n".join(context)
 
-    def generate_response(self, query: str, products: List[Dict]) -> str:
-        """Generate a response using the LLM."""
+    def build_response_prompt(self, query: str, products: List[Dict], statistics: Optional[Dict] = None) -> str:
+        """Build the response-generation prompt for a query and its products."""
         context = self.format_product_context(products)
-        prompt = QUERY_PROMPTS['response_generation'].format(
+        if statistics:
+            context = f"Catalog statistics for the matching products:\n{json.dumps(statistics, indent=2)}\n\n{context}"
+        return QUERY_PROMPTS['response_generation'].format(
             context=context,
             query=query
         )
+
+    def generate_response(self, query: str, products: List[Dict], statistics: Optional[Dict] = None) -> str:
+        """Generate a response using the LLM."""
+        prompt = self.build_response_prompt(query, products, statistics)
         
         try:
-            response = self.groq_client.generate_response(prompt)
+            with QUERY_STAGE_SECONDS.labels("generate").time():
+                response = self.groq_client.generate_response(prompt)
             return response
         except Exception as e:
             self.logger.error(f"Error generating response: {str(e)}")
-            return "I apologize, but I encountered an error while generating the response."
+            return self.ERROR_RESPONSE
+
+    def _get_cached_answer(self, query: str) -> Optional[Dict]:
+        """Return a history record for a cached answer, if any."""
+        if self.answer_cache is None:
+            return None
+        cached = self.answer_cache.get(query, self.vector_store.catalog_version)
+        if cached is None:
+            return None
+        return {
+            "query": query,
+            "intent": cached["intent"],
+            "products_found": len(cached["product_ids"]),
+            "response": cached["response"],
+            "cached": True
+        }
+
+    def _cache_answer(self, query: str, catalog_version, retrieval: Retrieval, response: str) -> None:
+        """Cache a successfully generated answer from a retrieval that did not fall back."""
+        if self.answer_cache is not None and response != self.ERROR_RESPONSE and not retrieval.degraded:
+            self.answer_cache.put(
+                query, catalog_version, retrieval.intent, [product['id'] for product in retrieval.products], response
+            )
 
     def process_query(self, query: str) -> Dict:
         """Process a user query and return a response."""
+        start = time.perf_counter()
         try:
-            # Analyze intent
-            intent = self.analyze_query_intent(query)
-            
-            # Get relevant products
-            products = self.get_relevant_products(query, intent)
+            cached = self._get_cached_answer(query)
+            if cached is not None:
+                self.query_history.record(cached, time.perf_counter() - start)
+                return cached
+
+            catalog_version = self.vector_store.catalog_version
+
+            # Analyze intent and get relevant products
+            retrieval = self.retrieve(query)
             
             # Generate response
-            response = self.generate_response(query, products)
+            response = self.generate_response(query, retrieval.products, retrieval.statistics)
+            self._cache_answer(query, catalog_version, retrieval, response)
             
             # Store in history
             query_result = {
                 "query": query,
-                "intent": intent,
-                "products_found": len(products),
+                "intent": retrieval.intent,
+                "products_found": len(retrieval.products),
                 "response": response
             }
-            self.query_history.append(query_result)
+            self.query_history.record(query_result, time.perf_counter() - start)
             
             return query_result
             
         except Exception as e:
             self.logger.error(f"Error processing query: {str(e)}")
-            return {
+            query_result = {
                 "query": query,
                 "error": str(e),
                 "response": "I apologize, but I encountered an error while processing your query."
             }
+            self.query_history.record(query_result, time.perf_counter() - start)
+            return query_result
+
+    def process_query_stream(self, query: str) -> Iterator[str]:
+        """Process a user query, yielding the response text as it is generated."""
+        response = ""
+        start = time.perf_counter()
+        try:
+            cached = self._get_cached_answer(query)
+            if cached is not None:
+                self.query_history.record(cached, time.perf_counter() - start)
+                yield cached["response"]
+                return
+
+            catalog_version = self.vector_store.catalog_version
+            retrieval = self.retrieve(query)
+            prompt = self.build_response_prompt(query, retrieval.products, retrieval.statistics)
+
+            generate_start = time.perf_counter()
+            for fragment in self.groq_client.generate_response_stream(prompt):
+                response += fragment
+                yield fragment
+            QUERY_STAGE_SECONDS.labels("generate").observe(time.perf_counter() - generate_start)
+
+            self._cache_answer(query, catalog_version, retrieval, response)
+            self.query_history.record({
+                "query": query,
+                "intent": retrieval.intent,
+                "products_found": len(retrieval.products),
+                "response": response
+            }, time.perf_counter() - start)
+
+        except Exception as e:
+            self.logger.error(f"Error streaming query response: {str(e)}")
+            error_response = "I apologize, but I encountered an error while processing your query."
+            self.query_history.record(
+                {"query": query, "error": str(e), "response": response + error_response},
+                time.perf_counter() - start
+            )
+            yield error_response
+
+    def process_queries(self, queries: List[str],
+                        max_concurrency: int = Settings.QUERY_BATCH_CONCURRENCY) -> Iterator[Dict]:
+        """Process many queries, yielding each result as soon as its response is ready.
+
+        Results carry the query's position in "index" and arrive in completion
+        order. Vector retrieval for the whole batch uses one embedding batch
+        and one multi-embedding Chroma query per distinct filter; responses
+        are generated concurrently, at most max_concurrency at a time.
+        """
+        # Latencies are measured from the start of the batch
+        start = time.perf_counter()
+        # Identical queries in the batch are answered once
+        duplicates: Dict[str, List[int]] = {}
+        pending = []
+        for index, query in enumerate(queries):
+            if query in duplicates:
+                duplicates[query].append(index)
+                continue
+            cached = self._get_cached_answer(query)
+            if cached is not None:
+                self.query_history.record(cached, time.perf_counter() - start)
+                yield {"index": index, **cached}
+            else:
+                duplicates[query] = []
+                pending.append(index)
+        if not pending:
+            return
+
+        catalog_version = self.vector_store.catalog_version
+        resolved = dict(zip(pending, self.executor.map(self._resolve_intent, [queries[i] for i in pending])))
+        intents = {index: intent for index, (intent, _) in resolved.items()}
+
+        retrievals: Dict[int, Retrieval] = {}
+        vector_pending = []
+        for index in pending:
+            if self._is_structured(intents[index]):
+                retrievals[index] = self._mark_degraded(
+                    self.get_relevant_products(queries[index], intents[index]), resolved[index][1]
+                )
+            else:
+                vector_pending.append(index)
+        if vector_pending:
+            try:
+                results = self.vector_store.query_similar_batch(
+                    [queries[i] for i in vector_pending],
+                    [self.apply_filters(intents[i]) for i in vector_pending],
+                    n_results=self.n_results
+                )
+            except Exception as e:
+                self.logger.error(f"Error retrieving products for query batch: {str(e)}")
+                results = None
+            for position, index in enumerate(vector_pending):
+                if results is None:
+                    retrievals[index] = Retrieval(intents[index], [], degraded=True)
+                else:
+                    retrievals[index] = Retrieval(intents[index], results[position], degraded=resolved[index][1])
+
+        pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="query-batch")
+        try:
+            futures = {
+                pool.submit(self.generate_response, queries[i], retrievals[i].products, retrievals[i].statistics): i
+                for i in pending
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                query = queries[index]
+                response = future.result()
+                self._cache_answer(query, catalog_version, retrievals[index], response)
+                query_result = {
+                    "query": query,
+                    "intent": intents[index],
+                    "products_found": len(retrievals[index].products),
+                    "response": response
+                }
+                self.query_history.record(query_result, time.perf_counter() - start)
+                for position in [index] + duplicates[query]:
+                    yield {"index": position, **query_result}
+        finally:
+            # Stop queued generations if the consumer goes away
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def get_query_history(self, limit: Optional[int] = None) -> List[Dict]:
+        """Return the most recent queries, oldest first."""
+        return self.query_history.recent(limit)
+
+    def close(self) -> None:
+        """Flush the query log; call once queries have stopped."""
+        self.query_history.close()
+
+    def get_query_stats(self) -> Dict:
+        """Return running query totals, latency percentiles and top queries."""
+        return self.query_history.get_stats()
+
+    def get_intent_stats(self) -> Dict:
+        """Return how many intents were served by the rule-based fast path."""
+        if self.intent_parser is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.intent_parser.get_stats()}
+
+    def get_speculation_stats(self) -> Dict:
+        """Return how often speculative candidates were enough to answer."""
+        total = self.speculation_hits + self.speculation_misses
+        return {
+            "enabled": Settings.SPECULATIVE_RETRIEVAL,
+            "sufficient": self.speculation_hits,
+            "requeried": self.speculation_misses,
+            "sufficient_ratio": self.speculation_hits / total if total else 0.0
+        }
+
+    def get_columnar_stats(self) -> Dict:
+        """Return columnar index occupancy."""
+        if self.columnar_index is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.columnar_index.get_stats()}
 
-    def get_query_history(self) -> List[Dict]:
-        """Return the query history."""
-        return self.query_history
\ No newline at end of file
+    def get_cache_stats(self) -> Dict:
+        """Return answer cache statistics."""
+        if self.answer_cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.answer_cache.get_stats()}
\ No newline at end of file
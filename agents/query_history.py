@@ -0,0 +1,171 @@
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional
+import json
+import logging
+import math
+import os
+import queue
+import threading
+import time
+from api.metrics import QUERY_SECONDS
+from config.settings import Settings
+
+class QueryHistory:
+    """Recent queries in a fixed-size ring buffer, with running aggregates and an append-only log.
+
+    Records are appended to a JSONL log by a background writer so the
+    request path never waits on disk; if the writer falls behind, records
+    beyond QUERY_LOG_QUEUE_SIZE are dropped from the log and counted. Each
+    line is a single append, so API worker processes can share the log.
+    Latency percentiles come from a fixed log-scale histogram and top
+    queries from a Space-Saving counter, so statistics take constant
+    memory and time however many queries have been served.
+    """
+
+    # Latency histogram buckets grow by 10% from 1ms, covering about 20 minutes
+    BUCKET_BASE = 0.001
+    BUCKET_GROWTH = 1.1
+    BUCKET_COUNT = 150
+
+    def __init__(self, max_entries: int = Settings.QUERY_HISTORY_SIZE,
+                 log_path: Optional[Path] = Settings.QUERY_LOG_PATH,
+                 top_capacity: int = Settings.QUERY_TOP_CAPACITY):
+        self.logger = logging.getLogger(__name__)
+        self.recent_queries: deque = deque(maxlen=max_entries)
+        self.top_capacity = top_capacity
+        self._lock = threading.Lock()
+
+        self.total = 0
+        self.errors = 0
+        self.cached = 0
+        self.latency_sum = 0.0
+        self.latency_buckets = [0] * self.BUCKET_COUNT
+        self.top_counts: Dict[str, int] = {}
+        self.top_errors: Dict[str, int] = {}
+
+        self.log_path = Path(log_path) if log_path else None
+        self.logged = 0
+        self.log_dropped = 0
+        self._log_queue: Optional[queue.Queue] = None
+        self._writer: Optional[threading.Thread] = None
+        if self.log_path is not None:
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            self._log_queue = queue.Queue(maxsize=Settings.QUERY_LOG_QUEUE_SIZE)
+            self._writer = threading.Thread(target=self._write_log, name="query-log-writer", daemon=True)
+            self._writer.start()
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        return " ".join(str(query).lower().split())
+
+    def _bucket(self, seconds: float) -> int:
+        if seconds <= self.BUCKET_BASE:
+            return 0
+        index = int(math.log(seconds / self.BUCKET_BASE, self.BUCKET_GROWTH)) + 1
+        return min(index, self.BUCKET_COUNT - 1)
+
+    def _bucket_upper(self, index: int) -> float:
+        return self.BUCKET_BASE * self.BUCKET_GROWTH ** index
+
+    def _count_query(self, key: str) -> None:
+        """Space-Saving: a new query beyond capacity replaces the least counted one and inherits its count."""
+        if key in self.top_counts:
+            self.top_counts[key] += 1
+        elif len(self.top_counts) < self.top_capacity:
+            self.top_counts[key] = 1
+            self.top_errors[key] = 0
+        else:
+            evicted = min(self.top_counts, key=self.top_counts.get)
+            count = self.top_counts.pop(evicted)
+            self.top_errors.pop(evicted)
+            self.top_counts[key] = count + 1
+            self.top_errors[key] = count
+
+    def record(self, result: Dict, latency: float) -> None:
+        """Add a processed query's result, as returned to the caller, and its latency in seconds."""
+        record = {"timestamp": time.time(), "latency": latency, **result}
+        outcome = "error" if "error" in result else "cached" if result.get("cached") else "answered"
+        QUERY_SECONDS.labels(outcome).observe(latency)
+        with self._lock:
+            self.recent_queries.append(record)
+            self.total += 1
+            self.errors += "error" in result
+            self.cached += bool(result.get("cached"))
+            self.latency_sum += latency
+            self.latency_buckets[self._bucket(latency)] += 1
+            self._count_query(self.normalize_query(result.get("query", "")))
+
+        if self._log_queue is not None:
+            try:
+                self._log_queue.put_nowait(record)
+            except queue.Full:
+                self.log_dropped += 1
+
+    def _write_log(self) -> None:
+        # One O_APPEND write per line keeps lines whole when several processes append
+        log = os.open(self.log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            while True:
+                record = self._log_queue.get()
+                if record is None:
+                    return
+                try:
+                    os.write(log, (json.dumps(record, default=str) + "\n").encode("utf-8"))
+                    self.logged += 1
+                except Exception as e:
+                    self.logger.error(f"Error writing query log: {str(e)}")
+        finally:
+            os.close(log)
+
+    def recent(self, limit: Optional[int] = None) -> List[Dict]:
+        """The most recent queries, oldest first."""
+        with self._lock:
+            records = list(self.recent_queries)
+        return records[-limit:] if limit else records
+
+    def _percentile(self, fraction: float) -> Optional[float]:
+        if not self.total:
+            return None
+        rank = fraction * self.total
+        seen = 0
+        for index, count in enumerate(self.latency_buckets):
+            seen += count
+            if seen >= rank:
+                return round(self._bucket_upper(index), 4)
+        return round(self._bucket_upper(self.BUCKET_COUNT - 1), 4)
+
+    def get_stats(self, top_n: int = 10) -> Dict:
+        """Running totals, latency percentiles (within 10%) and the most frequent queries."""
+        with self._lock:
+            top = sorted(self.top_counts.items(), key=lambda item: item[1], reverse=True)[:top_n]
+            return {
+                "total_queries": self.total,
+                "errors": self.errors,
+                "cached": self.cached,
+                "cache_hit_ratio": self.cached / self.total if self.total else 0.0,
+                "latency": {
+                    "mean": round(self.latency_sum / self.total, 4) if self.total else None,
+                    "p50": self._percentile(0.5),
+                    "p90": self._percentile(0.9),
+                    "p99": self._percentile(0.99)
+                },
+                # Counts may overstate a query by up to its max_error
+                "top_queries": [
+                    {"query": query, "count": count, "max_error": self.top_errors[query]}
+                    for query, count in top
+                ],
+                "recent_entries": len(self.recent_queries),
+                "log": {
+                    "path": str(self.log_path) if self.log_path else None,
+                    "written": self.logged,
+                    "dropped": self.log_dropped
+                }
+            }
+
+    def close(self) -> None:
+        """Flush queued log records and stop the writer."""
+        if self._writer is not None:
+            self._log_queue.put(None)
+            self._writer.join()
+            self._writer = None
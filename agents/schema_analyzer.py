@@ -1,11 +1,16 @@
 import pandas as pd
-from typing import Dict, List, Optional
+import numpy as np
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
+import hashlib
 import logging
+import re
 from dataclasses import dataclass
 import json
 from api.groq_client import GroqClient
-from config.prompts import SCHEMA_ANALYSIS_PROMPT
+from agents.schema_cache import SchemaCache
+from config.prompts import SCHEMA_ANALYSIS_PROMPT, SCHEMA_PROFILE_PROMPT
+from config.settings import Settings
 
 @dataclass
 class ColumnInfo:
@@ -16,12 +21,49 @@ class ColumnInfo:
     unique_values: int
     description: str
 
+class ReservoirSampler:
+    """Uniform sample of at most `size` rows over a stream of DataFrame chunks."""
+
+    def __init__(self, size: int, seed: int = 0):
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+        self.sample: Optional[pd.DataFrame] = None
+        self.seen = 0
+
+    def add(self, chunk: pd.DataFrame) -> None:
+        chunk = chunk.reset_index(drop=True)
+        if self.sample is None:
+            self.sample = chunk.iloc[:0]
+        # Fill the reservoir first
+        room = max(self.size - len(self.sample), 0)
+        if room:
+            self.sample = pd.concat([self.sample, chunk.iloc[:room]], ignore_index=True)
+        rest = chunk.iloc[room:]
+        if len(rest):
+            # Row number t (1-based) replaces a random slot with probability size / t
+            positions = np.arange(self.seen + room + 1, self.seen + len(chunk) + 1)
+            slots = self.rng.integers(0, positions)
+            accepted = slots < self.size
+            # A later row replacing the same slot wins, as in the sequential algorithm
+            replacements = pd.Series(np.flatnonzero(accepted), index=slots[accepted])
+            replacements = replacements.groupby(level=0).last()
+            if len(replacements):
+                kept = self.sample.drop(index=replacements.index)
+                self.sample = pd.concat([kept, rest.iloc[replacements.to_numpy()]], ignore_index=True)
+        self.seen += len(chunk)
+
 class SchemaAnalyzer:
-    def __init__(self, groq_client: GroqClient):
+    def __init__(self, groq_client: GroqClient,
+                 cache: Optional[SchemaCache] = None,
+                 sample_rows: int = Settings.SCHEMA_SAMPLE_ROWS):
         self.groq_client = groq_client
         self.logger = logging.getLogger(__name__)
+        if cache is None and Settings.SCHEMA_CACHE_ENABLED:
+            cache = SchemaCache()
+        self.cache = cache
+        self.sample_rows = sample_rows
 
-    def analyze_column(self, df: pd.DataFrame, column: str) -> ColumnInfo:
+    def analyze_column(self, df: pd.DataFrame, column: str, description: Optional[str] = None) -> ColumnInfo:
         """Analyze a single column from the DataFrame."""
         series = df[column]
         return ColumnInfo(
@@ -30,26 +72,192 @@ class SchemaAnalyzer:
             sample_values=series.head(3).tolist(),
             null_percentage=(series.isna().sum() / len(series)) * 100,
             unique_values=series.nunique(),
-            description=self._generate_column_description(series)
+            description=description if description is not None else self._generate_column_description(series)
         )
 
+    def _column_description_prompt(self, series: pd.Series) -> str:
+        sample_data = series.head(5).tolist()
+        return f"Describe this data column with samples: {sample_data}"
+
     def _generate_column_description(self, series: pd.Series) -> str:
         """Generate a description for a column using LLM."""
-        sample_data = series.head(5).tolist()
-        prompt = f"Describe this data column with samples: {sample_data}"
-        response = self.groq_client.generate_response(prompt)
+        prompt = self._column_description_prompt(series)
+        response = self.groq_client.generate_response(prompt, temperature=0, cache=True)
         return response
 
-    def analyze_csv(self, file_path: Path) -> Dict:
+    def _generate_column_descriptions(self, df: pd.DataFrame) -> Dict[str, str]:
+        """Describe every column with concurrent LLM calls."""
+        prompts = [self._column_description_prompt(df[column]) for column in df.columns]
+        return dict(zip(df.columns, self.groq_client.batch_generate(prompts, temperature=0, cache=True)))
+
+    @staticmethod
+    def file_fingerprint(file_path: Path, block_size: int = 1 << 20) -> str:
+        """Hash the file's bytes."""
+        digest = hashlib.blake2b(digest_size=20)
+        with open(file_path, "rb") as handle:
+            for block in iter(lambda: handle.read(block_size), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def column_signature(df: pd.DataFrame) -> str:
+        """Hash the column names and dtype kinds, identifying a feed layout."""
+        layout = [(str(column), df[column].dtype.kind) for column in df.columns]
+        return hashlib.sha256(json.dumps(layout).encode("utf-8")).hexdigest()
+
+    def sample_csv(self, file_path: Path, chunk_size: int = Settings.INGEST_CHUNK_SIZE,
+                   seed: int = 0) -> Tuple[pd.DataFrame, int]:
+        """Read the CSV in chunks, keeping a uniform reservoir sample of at most sample_rows rows.
+
+        Returns the sample and the total row count.
+        """
+        sampler = ReservoirSampler(self.sample_rows, seed)
+        for chunk in pd.read_csv(file_path, chunksize=chunk_size):
+            sampler.add(chunk)
+        if sampler.sample is None:
+            return pd.read_csv(file_path, nrows=0), 0
+        return sampler.sample, sampler.seen
+
+    @staticmethod
+    def _to_builtin(value):
+        """Convert NumPy scalars and NaN into JSON-friendly values."""
+        if isinstance(value, np.generic):
+            value = value.item()
+        if isinstance(value, float) and np.isnan(value):
+            return None
+        return value
+
+    def profile_column(self, sample: pd.DataFrame, column: str) -> Dict:
+        """Null percentage, distinct count and example values of a sampled column."""
+        series = sample[column]
+        examples = series.dropna().drop_duplicates().head(3).tolist()
+        return {
+            "type": str(series.dtype),
+            "samples": [self._to_builtin(value) for value in examples],
+            "null_percentage": float(series.isna().mean() * 100) if len(series) else 0.0,
+            "unique_values": int(series.nunique())
+        }
+
+    @staticmethod
+    def _parse_profile_response(response: str, profiles: Dict[str, Dict]) -> Optional[Dict]:
+        """Column and schema descriptions from the LLM's JSON reply, or None if it does not parse."""
+        match = re.search(r"\{.*\}", response or "", re.DOTALL)
+        try:
+            parsed = json.loads(match.group(0)) if match else None
+        except json.JSONDecodeError:
+            parsed = None
+        if not isinstance(parsed, dict) or not parsed:
+            return None
+        descriptions = parsed.get("columns") if isinstance(parsed.get("columns"), dict) else {}
+        return {
+            "columns": {column: str(descriptions.get(column, "")) for column in profiles},
+            "schema_description": str(parsed.get("schema_description") or response)
+        }
+
+    def _describe_profiles(self, profiles: Dict[str, Dict], sample_rows: int,
+                           total_rows: int) -> Tuple[Dict, bool]:
+        """Describe every column and the whole schema with one structured LLM request.
+
+        Returns the descriptions and whether the reply parsed; an unparsed
+        reply is kept whole as the schema description but must not be cached.
+        """
+        prompt = SCHEMA_PROFILE_PROMPT.format(
+            sample_rows=sample_rows,
+            total_rows=total_rows,
+            profile=json.dumps(profiles, indent=2, default=str)
+        )
+        response = self.groq_client.generate_response(
+            prompt, temperature=0, cache=True,
+            accept=lambda reply: self._parse_profile_response(reply, profiles) is not None
+        )
+
+        described = self._parse_profile_response(response, profiles)
+        if described is not None:
+            return described, True
+        self.logger.warning("Schema profile response was not valid JSON, keeping it as the schema description")
+        return {"columns": {column: "" for column in profiles}, "schema_description": str(response)}, False
+
+    def _cached_analysis(self, fingerprint: str, file_name: str) -> Optional[Dict]:
+        if self.cache is None:
+            return None
+        cached = self.cache.get("file", fingerprint)
+        if cached is None:
+            return None
+        return {**cached, "file_name": file_name, "llm_calls": 0, "cache": "file"}
+
+    def profile_csv(self, file_path: Path) -> Dict:
+        """Analyze a CSV from a bounded sample with at most one LLM call.
+
+        Results are cached by file fingerprint, and the LLM descriptions by
+        column signature, so re-uploading the same file or another file with
+        the same layout makes no LLM call.
+        """
+        self.logger.info(f"Profiling schema for {file_path}")
+        fingerprint = self.file_fingerprint(file_path)
+        cached = self._cached_analysis(fingerprint, file_path.name)
+        if cached is not None:
+            return cached
+
+        sample, total_rows = self.sample_csv(file_path)
+        return self.profile_sample(sample, total_rows, file_path.name, fingerprint)
+
+    def profile_frame(self, df: pd.DataFrame, file_name: str, fingerprint: Optional[str] = None) -> Dict:
+        """Profile an already parsed frame, sampling it down to sample_rows rows."""
+        if fingerprint is not None:
+            cached = self._cached_analysis(fingerprint, file_name)
+            if cached is not None:
+                return cached
+        sample = df.sample(n=self.sample_rows, random_state=0) if len(df) > self.sample_rows else df
+        return self.profile_sample(sample, len(df), file_name, fingerprint)
+
+    def profile_sample(self, sample: pd.DataFrame, total_rows: int, file_name: str,
+                       fingerprint: Optional[str] = None) -> Dict:
+        """Profile columns from a sample and describe them, reusing descriptions of a known layout."""
+        profiles = {column: self.profile_column(sample, column) for column in sample.columns}
+
+        signature = self.column_signature(sample)
+        described = self.cache.get("layout", signature) if self.cache is not None else None
+        cache_hit = described is not None
+        parsed_ok = True
+        if not cache_hit:
+            described, parsed_ok = self._describe_profiles(profiles, len(sample), total_rows)
+            if self.cache is not None and parsed_ok:
+                self.cache.put("layout", signature, described)
+
+        result = {
+            "file_name": file_name,
+            "total_rows": total_rows,
+            "total_columns": len(sample.columns),
+            "sampled_rows": len(sample),
+            "columns": {
+                column: {**profile, "description": described["columns"].get(column, "")}
+                for column, profile in profiles.items()
+            },
+            "schema_description": described["schema_description"]
+        }
+        # A reply that did not parse is not cached, so the next upload asks again
+        if self.cache is not None and fingerprint is not None and parsed_ok:
+            self.cache.put("file", fingerprint, result)
+        return {**result, "llm_calls": 0 if cache_hit else 1, "cache": "layout" if cache_hit else None}
+
+    def analyze_csv(self, file_path: Path, profile: bool = Settings.SCHEMA_PROFILING_ENABLED) -> Dict:
         """Analyze the schema of a CSV file."""
+        if profile:
+            try:
+                return self.profile_csv(file_path)
+            except Exception as e:
+                self.logger.error(f"Error profiling {file_path}: {str(e)}")
+                raise
+
         try:
             self.logger.info(f"Analyzing schema for {file_path}")
             df = pd.read_csv(file_path)
             
-            # Analyze each column
+            # Analyze each column, describing all of them concurrently
+            descriptions = self._generate_column_descriptions(df)
             columns = {}
             for column in df.columns:
-                columns[column] = self.analyze_column(df, column)
+                columns[column] = self.analyze_column(df, column, descriptions[column])
             
             # Generate overall schema description
             schema_description = self._generate_schema_description(columns)
@@ -87,7 +295,7 @@ class SchemaAnalyzer:
         }
         
         prompt = SCHEMA_ANALYSIS_PROMPT.format(schema=json.dumps(schema_info, indent=2))
-        response = self.groq_client.generate_response(prompt)
+        response = self.groq_client.generate_response(prompt, temperature=0, cache=True)
         return response
 
     def analyze_directory(self, directory_path: str) -> Dict[str, Dict]:
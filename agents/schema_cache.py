@@ -0,0 +1,63 @@
+from typing import Dict, Optional
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from config.settings import Settings
+
+class SchemaCache:
+    """SQLite cache of schema analyses.
+
+    Two kinds of entries are kept: whole analyses keyed by the file's
+    content fingerprint, and LLM column/schema descriptions keyed by the
+    column signature so a new file with a known layout skips the LLM.
+    """
+
+    KINDS = ("file", "layout")
+
+    def __init__(self, path: Optional[Path] = None):
+        self.logger = logging.getLogger(__name__)
+        self.path = Path(path or Settings.SCHEMA_CACHE_PATH)
+        self.hits = {kind: 0 for kind in self.KINDS}
+        self.misses = {kind: 0 for kind in self.KINDS}
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS schema_cache ("
+            "kind TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, created REAL NOT NULL, "
+            "PRIMARY KEY (kind, key))"
+        )
+        self.conn.commit()
+
+    def get(self, kind: str, key: str) -> Optional[Dict]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT value FROM schema_cache WHERE kind = ? AND key = ?", (kind, key)
+            ).fetchone()
+            if row is None:
+                self.misses[kind] += 1
+                return None
+            self.hits[kind] += 1
+        return json.loads(row[0])
+
+    def put(self, kind: str, key: str, value: Dict) -> None:
+        payload = json.dumps(value, default=str)
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO schema_cache (kind, key, value, created) VALUES (?, ?, ?, ?)",
+                (kind, key, payload, time.time())
+            )
+            self.conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self.conn.execute("DELETE FROM schema_cache")
+            self.conn.commit()
+
+    def get_stats(self) -> Dict:
+        return {"hits": dict(self.hits), "misses": dict(self.misses)}
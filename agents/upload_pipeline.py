@@ -0,0 +1,133 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Optional
+import logging
+import time
+import pandas as pd
+from agents.data_processor import DataProcessor
+from agents.schema_analyzer import ReservoirSampler, SchemaAnalyzer
+from config.settings import Settings
+
+class UploadPipeline:
+    """Parse an uploaded CSV once and feed the parsed data to both schema analysis and ingestion.
+
+    Files up to STREAMING_THRESHOLD_BYTES are parsed into one frame, and
+    profiling and ingestion run on it concurrently, so an upload takes about
+    as long as the slower of the two. Larger files are parsed chunk by chunk
+    for ingestion while a second reader samples and profiles the file on its
+    own thread, so the schema LLM call overlaps ingestion instead of waiting
+    for it.
+    """
+
+    def __init__(self, schema_analyzer: SchemaAnalyzer, data_processor: DataProcessor):
+        self.schema_analyzer = schema_analyzer
+        self.data_processor = data_processor
+        self.logger = logging.getLogger(__name__)
+        self._executor = ThreadPoolExecutor(max_workers=Settings.MAX_WORKERS, thread_name_prefix="upload")
+
+    @staticmethod
+    def _timed(fn, *args, **kwargs):
+        start = time.perf_counter()
+        return fn(*args, **kwargs), time.perf_counter() - start
+
+    def process(self, file_path: Path, source: Optional[str] = None,
+                streaming: Optional[bool] = None,
+                progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """Analyze and ingest one CSV, returning the schema analysis, ingestion result and stage timings.
+
+        progress, if given, receives {"stage", "schema", "ingestion"} updates.
+        """
+        file_path = Path(file_path)
+        source = source or file_path.name
+        if streaming is None:
+            streaming = file_path.stat().st_size > Settings.STREAMING_THRESHOLD_BYTES
+        start = time.perf_counter()
+
+        state = {"stage": "parsing", "schema": "pending", "ingestion": {}}
+
+        def report(**changes) -> None:
+            state.update(changes)
+            if progress is not None:
+                progress(dict(state))
+
+        report()
+        if streaming:
+            result = self._process_streaming(file_path, source, report)
+        else:
+            result = self._process_frame(file_path, source, report)
+        report(stage="done")
+
+        result["timings"]["total_seconds"] = time.perf_counter() - start
+        self.logger.info(
+            f"Uploaded {file_path.name} in {result['timings']['total_seconds']:.2f}s "
+            f"(schema {result['timings']['schema_seconds']:.2f}s, "
+            f"ingestion {result['timings']['ingestion_seconds']:.2f}s)"
+        )
+        return result
+
+    def _profile_frame(self, df: pd.DataFrame, file_name: str, fingerprint: str, report) -> Dict:
+        analysis = self.schema_analyzer.profile_frame(df, file_name, fingerprint)
+        report(schema="done")
+        return analysis
+
+    def _process_frame(self, file_path: Path, source: str, report) -> Dict:
+        fingerprint = self.schema_analyzer.file_fingerprint(file_path)
+        df, parse_seconds = self._timed(pd.read_csv, file_path)
+        report(stage="analyzing and ingesting", schema="running")
+
+        schema_future = self._executor.submit(
+            self._timed, self._profile_frame, df, file_path.name, fingerprint, report
+        )
+        ingestion_future = self._executor.submit(
+            self._timed, self.data_processor.process_frames, [df], source, file_path.name,
+            progress=lambda counts: report(ingestion=counts), file_path=file_path
+        )
+        processing_result, ingestion_seconds = ingestion_future.result()
+        schema_analysis, schema_seconds = schema_future.result()
+
+        return {
+            "schema_analysis": schema_analysis,
+            "processing_result": processing_result,
+            "timings": {
+                "parse_seconds": parse_seconds,
+                "schema_seconds": schema_seconds,
+                "ingestion_seconds": ingestion_seconds
+            }
+        }
+
+    def _profile_stream(self, file_path: Path, fingerprint: str, report) -> Dict:
+        # Parsing is cheap next to embedding, so reading the file twice beats
+        # holding the schema call until ingestion has consumed the last chunk
+        sampler = ReservoirSampler(self.schema_analyzer.sample_rows)
+        for chunk in pd.read_csv(file_path, chunksize=Settings.INGEST_CHUNK_SIZE):
+            sampler.add(chunk)
+        analysis = self.schema_analyzer.profile_sample(
+            sampler.sample if sampler.sample is not None else pd.DataFrame(),
+            sampler.seen, file_path.name, fingerprint
+        )
+        report(schema="done")
+        return analysis
+
+    def _process_streaming(self, file_path: Path, source: str, report) -> Dict:
+        fingerprint = self.schema_analyzer.file_fingerprint(file_path)
+        report(stage="analyzing and ingesting", schema="running")
+
+        schema_future = self._executor.submit(
+            self._timed, self._profile_stream, file_path, fingerprint, report
+        )
+        processing_result, ingestion_seconds = self._timed(
+            self.data_processor.process_frames,
+            pd.read_csv(file_path, chunksize=Settings.INGEST_CHUNK_SIZE), source, file_path.name,
+            progress=lambda counts: report(ingestion=counts),
+            file_path=file_path, chunk_size=Settings.INGEST_CHUNK_SIZE
+        )
+        schema_analysis, schema_seconds = schema_future.result()
+        return {
+            "schema_analysis": schema_analysis,
+            "processing_result": processing_result,
+            "timings": {
+                "parse_seconds": None,
+                "schema_seconds": schema_seconds,
+                "ingestion_seconds": ingestion_seconds
+            }
+        }
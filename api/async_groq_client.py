@@ -0,0 +1,283 @@
+from typing import AsyncIterator, Dict, List, Optional
+import asyncio
+import email.utils
+import logging
+import os
+import random
+import time
+import httpx
+from groq import (
+    APIConnectionError,
+    APITimeoutError,
+    AsyncGroq,
+    DefaultAsyncHttpxClient,
+    InternalServerError,
+    RateLimitError,
+)
+from api.metrics import GROQ_RATE_LIMIT_WAIT_SECONDS, GROQ_REQUEST_SECONDS, GROQ_REQUESTS, GROQ_TOKENS
+from config.settings import Settings
+
+SYSTEM_PROMPT = "You are a helpful assistant that provides accurate information about products."
+
+def estimate_tokens(messages: List[Dict]) -> int:
+    """Rough prompt size estimate (about four characters per token)."""
+    return sum(len(message.get("content") or "") // 4 + 4 for message in messages)
+
+class TokenBucketLimiter:
+    """Token buckets enforcing requests/minute and tokens/minute limits.
+
+    Token usage is reserved from the prompt estimate before a call and
+    corrected with the reported usage afterwards, so the token bucket may
+    go negative and make later callers wait. A limit of 0 disables it.
+    """
+
+    def __init__(self,
+                 requests_per_minute: int = Settings.GROQ_REQUESTS_PER_MINUTE,
+                 tokens_per_minute: int = Settings.GROQ_TOKENS_PER_MINUTE):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        if self.requests_per_minute:
+            self._requests = min(self.requests_per_minute,
+                                 self._requests + elapsed * self.requests_per_minute / 60)
+        if self.tokens_per_minute:
+            self._tokens = min(self.tokens_per_minute,
+                               self._tokens + elapsed * self.tokens_per_minute / 60)
+
+    def _wait_time(self, tokens: int) -> float:
+        waits = [self._paused_until - time.monotonic()]
+        if self.requests_per_minute and self._requests < 1:
+            waits.append((1 - self._requests) * 60 / self.requests_per_minute)
+        if self.tokens_per_minute:
+            # Requests larger than the whole bucket only wait for a full bucket
+            needed = min(tokens, self.tokens_per_minute)
+            if self._tokens < needed:
+                waits.append((needed - self._tokens) * 60 / self.tokens_per_minute)
+        return max(waits)
+
+    async def acquire(self, tokens: int) -> None:
+        """Wait until one request and the estimated tokens fit in the buckets."""
+        async with self._lock:
+            while True:
+                self._refill()
+                wait = self._wait_time(tokens)
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            if self.requests_per_minute:
+                self._requests -= 1
+            if self.tokens_per_minute:
+                self._tokens -= tokens
+
+    def record_usage(self, estimated: int, actual: int) -> None:
+        """Correct the token bucket once the real usage is known."""
+        if self.tokens_per_minute:
+            self._tokens -= actual - estimated
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller, e.g. after a 429 with Retry-After."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+class AsyncGroqClient:
+    """Asyncio Groq client with a shared connection pool, concurrency and rate limits, and retries."""
+
+    RETRYABLE_ERRORS = (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError)
+
+    def __init__(self,
+                 api_key: Optional[str] = None,
+                 client: Optional[AsyncGroq] = None,
+                 max_concurrency: int = Settings.GROQ_MAX_CONCURRENCY,
+                 max_retries: int = Settings.GROQ_MAX_RETRIES,
+                 timeout: float = Settings.GROQ_TIMEOUT,
+                 limiter: Optional[TokenBucketLimiter] = None):
+        self.logger = logging.getLogger(__name__)
+        self.model = Settings.MODEL_NAME
+        self.max_retries = max_retries
+
+        if client is None:
+            api_key = api_key or os.getenv("GROQ_API_KEY") or Settings.GROQ_API_KEY
+            if not api_key:
+                raise ValueError("Groq API key not found")
+            # Retries are handled here so they can honor the shared rate limiter
+            client = AsyncGroq(
+                api_key=api_key,
+                max_retries=0,
+                timeout=timeout,
+                http_client=DefaultAsyncHttpxClient(
+                    limits=httpx.Limits(
+                        max_connections=max_concurrency,
+                        max_keepalive_connections=max_concurrency
+                    )
+                )
+            )
+        self.client = client
+        self.limiter = limiter or TokenBucketLimiter()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    @staticmethod
+    def resolve_max_tokens(max_tokens: Optional[int]) -> int:
+        """Use default max_tokens if not specified, capped at the API limit."""
+        return min(max_tokens or Settings.MAX_TOKENS, 8000)
+
+    @staticmethod
+    def build_messages(prompt: str) -> List[Dict]:
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        """Read the server's requested delay from Retry-After headers, if any."""
+        response = getattr(error, "response", None)
+        if response is None:
+            return None
+        headers = response.headers
+        if headers.get("retry-after-ms"):
+            try:
+                return float(headers["retry-after-ms"]) / 1000
+            except ValueError:
+                pass
+        retry_after = headers.get("retry-after")
+        if not retry_after:
+            return None
+        try:
+            return float(retry_after)
+        except ValueError:
+            parsed = email.utils.parsedate_to_datetime(retry_after)
+            return max(0.0, parsed.timestamp() - time.time()) if parsed else None
+
+    def _backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter."""
+        ceiling = min(Settings.GROQ_BACKOFF_MAX, Settings.GROQ_BACKOFF_BASE * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    async def create_chat_completion(self, messages: List[Dict], max_tokens: int,
+                                     temperature: float, **kwargs):
+        """Call chat.completions.create under the concurrency and rate limits, retrying transient errors.
+
+        A streamed call (stream=True) keeps its concurrency slot when it
+        returns; the caller must call _release_stream once the stream is
+        exhausted or closed.
+        """
+        streamed = bool(kwargs.get("stream"))
+        estimated = estimate_tokens(messages)
+        attempt = 0
+        start = time.perf_counter()
+        while True:
+            wait_start = time.perf_counter()
+            await self.limiter.acquire(estimated)
+            GROQ_RATE_LIMIT_WAIT_SECONDS.observe(time.perf_counter() - wait_start)
+            try:
+                await self._semaphore.acquire()
+                try:
+                    response = await self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        temperature=temperature,
+                        **kwargs
+                    )
+                except BaseException:
+                    self._semaphore.release()
+                    raise
+                GROQ_REQUESTS.labels("success").inc()
+                if streamed:
+                    # The stream is read under the slot, and timed by _release_stream
+                    return response
+                self._semaphore.release()
+                GROQ_REQUEST_SECONDS.observe(time.perf_counter() - start)
+                usage = getattr(response, "usage", None)
+                if usage is not None and getattr(usage, "total_tokens", None):
+                    self.limiter.record_usage(estimated, usage.total_tokens)
+                    for kind in ("prompt", "completion", "total"):
+                        GROQ_TOKENS.labels(kind).inc(getattr(usage, f"{kind}_tokens", None) or 0)
+                return response
+
+            except self.RETRYABLE_ERRORS as e:
+                if attempt >= self.max_retries:
+                    GROQ_REQUESTS.labels("error").inc()
+                    raise
+                GROQ_REQUESTS.labels("retry").inc()
+                delay = self._retry_after(e)
+                if delay is None:
+                    delay = self._backoff(attempt)
+                elif isinstance(e, RateLimitError):
+                    self.limiter.pause(delay)
+                self.logger.warning(f"Groq request failed ({type(e).__name__}), retrying in {delay:.1f}s")
+                attempt += 1
+                await asyncio.sleep(delay)
+
+            except Exception:
+                GROQ_REQUESTS.labels("error").inc()
+                raise
+
+    async def generate_response(self,
+                                prompt: str,
+                                max_tokens: Optional[int] = None,
+                                temperature: float = Settings.TEMPERATURE) -> str:
+        """Generate a response using the Groq API."""
+        max_tokens = self.resolve_max_tokens(max_tokens)
+        response = await self.create_chat_completion(
+            self.build_messages(prompt), max_tokens=max_tokens, temperature=temperature
+        )
+        return response.choices[0].message.content
+
+    async def stream_response(self,
+                              prompt: str,
+                              max_tokens: Optional[int] = None,
+                              temperature: float = Settings.TEMPERATURE) -> AsyncIterator[str]:
+        """Yield response text fragments as Groq streams them."""
+        max_tokens = self.resolve_max_tokens(max_tokens)
+        start = time.perf_counter()
+        stream = await self.create_chat_completion(
+            self.build_messages(prompt), max_tokens=max_tokens, temperature=temperature, stream=True
+        )
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            await self._release_stream(stream, start)
+
+    async def _release_stream(self, stream, start: float) -> None:
+        """Close a streamed completion and give back its concurrency slot."""
+        try:
+            await stream.close()
+        finally:
+            self._semaphore.release()
+            GROQ_REQUEST_SECONDS.observe(time.perf_counter() - start)
+
+    async def batch_generate(self, prompts: List[str], max_tokens: Optional[int] = None,
+                             temperature: float = Settings.TEMPERATURE,
+                             return_exceptions: bool = False) -> List:
+        """Generate responses for multiple prompts concurrently, in input order.
+
+        Failed prompts yield their error message, or the exception itself
+        with return_exceptions.
+        """
+        responses = await asyncio.gather(
+            *(self.generate_response(prompt, max_tokens=max_tokens, temperature=temperature) for prompt in prompts),
+            return_exceptions=True
+        )
+        results = []
+        for prompt, response in zip(prompts, responses):
+            if isinstance(response, BaseException):
+                self.logger.error(f"Error in batch generation for prompt: {prompt[:50]}...")
+                results.append(response if return_exceptions else str(response))
+            else:
+                results.append(response)
+        return results
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP connections."""
+        await self.client.close()
@@ -1,50 +1,131 @@
-from typing import Dict, Optional, List
+from typing import Callable, Dict, Iterator, Optional, List
+import asyncio
 import os
 import logging
-from groq import Groq
+import queue
+import threading
 from config.settings import Settings
+from api.async_groq_client import AsyncGroqClient
+from api.llm_cache import LLMResponseCache
 
 class GroqClient:
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, async_client: Optional[AsyncGroqClient] = None,
+                 cache: Optional[LLMResponseCache] = None):
         self.logger = logging.getLogger(__name__)
         
         # Get API key from environment or parameter
         self.api_key = api_key or os.getenv("GROQ_API_KEY") or Settings.GROQ_API_KEY
-        if not self.api_key:
+        if not self.api_key and async_client is None:
             raise ValueError("Groq API key not found")
         
-        self.client = Groq(api_key=self.api_key)
-        self.model = Settings.MODEL_NAME
+        # All calls share one pooled, rate-limited async client
+        self.async_client = async_client or AsyncGroqClient(api_key=self.api_key)
+        self.model = self.async_client.model
+        if cache is None and Settings.LLM_CACHE_ENABLED:
+            cache = LLMResponseCache()
+        self.cache = cache
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the background event loop that runs the async client, once."""
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="groq-client-loop", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def _run(self, coroutine):
+        """Run a coroutine on the background loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._get_loop()).result()
+
+    def _cache_key(self, prompt: str, max_tokens: Optional[int], temperature: float,
+                   cache: Optional[bool]) -> Optional[str]:
+        """The response cache key, or None when this call should not use the cache.
+
+        Only call sites that pass cache=True, which ask at temperature 0 and
+        check replies with accept, are cached unless LLM_CACHE_ALL_PROMPTS is set.
+        """
+        if self.cache is None or not (Settings.LLM_CACHE_ALL_PROMPTS if cache is None else cache):
+            return None
+        return LLMResponseCache.make_key(
+            self.model, AsyncGroqClient.build_messages(prompt),
+            temperature, AsyncGroqClient.resolve_max_tokens(max_tokens)
+        )
 
     def generate_response(self, 
                          prompt: str, 
                          max_tokens: Optional[int] = None,
-                         temperature: float = Settings.TEMPERATURE) -> str:
-        """Generate a response using the Groq API."""
-        try:
-            # Use default max_tokens if not specified
-            if max_tokens is None:
-                max_tokens = Settings.MAX_TOKENS
+                         temperature: float = Settings.TEMPERATURE,
+                         cache: Optional[bool] = None,
+                         accept: Optional[Callable[[str], bool]] = None) -> str:
+        """Generate a response using the Groq API, served from the response cache when allowed.
 
-            # Ensure max_tokens doesn't exceed limit
-            max_tokens = min(max_tokens, 8000)
-            
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that provides accurate information about products."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=max_tokens,
-                temperature=temperature
-            )
-            
-            return response.choices[0].message.content
+        A fresh reply is cached only if it is non-empty and accept, the
+        caller's parser check, returns True for it.
+        """
+        key = self._cache_key(prompt, max_tokens, temperature, cache)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        try:
+            response = self._run(self.async_client.generate_response(
+                prompt, max_tokens=max_tokens, temperature=temperature
+            ))
             
         except Exception as e:
             self.logger.error(f"Error generating response from Groq: {str(e)}")
             raise
 
+        if key is not None and self._acceptable(response, accept):
+            self.cache.put(key, response)
+        return response
+
+    def _acceptable(self, response: str, accept: Optional[Callable[[str], bool]]) -> bool:
+        if not response:
+            return False
+        if accept is None:
+            return True
+        try:
+            return bool(accept(response))
+        except Exception:
+            return False
+
+    def generate_response_stream(self,
+                                 prompt: str,
+                                 max_tokens: Optional[int] = None,
+                                 temperature: float = Settings.TEMPERATURE) -> Iterator[str]:
+        """Stream a response from the Groq API, yielding text fragments as they arrive."""
+        fragments: queue.Queue = queue.Queue()
+        done = object()
+
+        async def produce():
+            try:
+                async for fragment in self.async_client.stream_response(
+                    prompt, max_tokens=max_tokens, temperature=temperature
+                ):
+                    fragments.put(fragment)
+                fragments.put(done)
+            except Exception as e:
+                fragments.put(e)
+
+        future = asyncio.run_coroutine_threadsafe(produce(), self._get_loop())
+        try:
+            while True:
+                item = fragments.get()
+                if item is done:
+                    return
+                if isinstance(item, Exception):
+                    self.logger.error(f"Error streaming response from Groq: {str(item)}")
+                    raise item
+                yield item
+        finally:
+            # Stop the upstream stream if the consumer went away early
+            future.cancel()
+
     def generate_embedding(self, text: str) -> List[float]:
         """Generate embeddings using Groq API."""
         try:
@@ -66,23 +147,52 @@ class GroqClient:
             self.logger.error(f"Error generating embedding: {str(e)}")
             return [0.0] * 384
 
-    def batch_generate(self, prompts: List[str], max_tokens: Optional[int] = None) -> List[str]:
-        """Generate responses for multiple prompts."""
-        responses = []
-        for prompt in prompts:
-            try:
-                response = self.generate_response(prompt, max_tokens=max_tokens)
-                responses.append(response)
-            except Exception as e:
-                self.logger.error(f"Error in batch generation for prompt: {prompt[:50]}...")
-                responses.append(str(e))
-        
-        return responses
+    def batch_generate(self, prompts: List[str], max_tokens: Optional[int] = None,
+                       temperature: float = Settings.TEMPERATURE, cache: Optional[bool] = None,
+                       accept: Optional[Callable[[str], bool]] = None) -> List[str]:
+        """Generate responses for multiple prompts concurrently under the shared limits.
+
+        With the cache allowed, only prompts missing from it are sent, each
+        distinct prompt once, and replies are cached as in generate_response.
+        """
+        keys = [self._cache_key(prompt, max_tokens, temperature, cache) for prompt in prompts]
+        if all(key is None for key in keys):
+            return self._run(self.async_client.batch_generate(
+                prompts, max_tokens=max_tokens, temperature=temperature
+            ))
+
+        responses: Dict[str, str] = {}
+        for key in dict.fromkeys(keys):
+            cached = self.cache.get(key)
+            if cached is not None:
+                responses[key] = cached
+        missing = {key: prompt for key, prompt in zip(keys, prompts) if key not in responses}
+        if missing:
+            results = self._run(self.async_client.batch_generate(
+                list(missing.values()), max_tokens=max_tokens, temperature=temperature, return_exceptions=True
+            ))
+            for key, result in zip(missing, results):
+                if isinstance(result, BaseException):
+                    responses[key] = str(result)
+                else:
+                    responses[key] = result
+                    if self._acceptable(result, accept):
+                        self.cache.put(key, result)
+        return [responses[key] for key in keys]
+
+    def get_cache_stats(self) -> Dict:
+        """Return LLM response cache statistics."""
+        if self.cache is None:
+            return {"enabled": False}
+        return {"enabled": True, "all_prompts": Settings.LLM_CACHE_ALL_PROMPTS, **self.cache.get_stats()}
 
     def get_model_info(self) -> Dict:
         """Get information about the current model."""
         return {
             "model": self.model,
             "max_tokens": Settings.MAX_TOKENS,
-            "temperature": Settings.TEMPERATURE
-        }
\ No newline at end of file
+            "temperature": Settings.TEMPERATURE,
+            "max_concurrency": Settings.GROQ_MAX_CONCURRENCY,
+            "requests_per_minute": Settings.GROQ_REQUESTS_PER_MINUTE,
+            "tokens_per_minute": Settings.GROQ_TOKENS_PER_MINUTE
+        }
@@ -0,0 +1,253 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from config.settings import Settings
+
+ProgressCallback = Callable[[Dict], None]
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    status: str = "queued"  # queued, running, succeeded, failed
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    progress: Dict = field(default_factory=dict)
+    result: Optional[Dict] = None
+    error: Optional[str] = None
+
+    def to_dict(self, include_result: bool = False) -> Dict:
+        data = asdict(self)
+        if not include_result:
+            data.pop("result")
+        return data
+
+class JobManager:
+    """Runs long tasks such as uploads on a bounded background pool and tracks their status.
+
+    Task functions receive a progress callback as their first argument;
+    whatever dict they pass to it becomes the job's progress. Jobs
+    submitted with the same key run one after another, in order.
+    """
+
+    def __init__(self, max_workers: int = Settings.JOB_WORKERS, max_finished: int = Settings.JOB_HISTORY_SIZE):
+        self.logger = logging.getLogger(__name__)
+        self.max_finished = max_finished
+        self.jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        # Jobs waiting for an earlier job with the same key, by key
+        self._waiting: Dict[str, deque] = {}
+
+    def submit(self, kind: str, fn: Callable[..., Dict], *args, key: Optional[str] = None, **kwargs) -> Job:
+        """Queue fn(progress, *args, **kwargs) and return its job record.
+
+        A job with a key starts only once earlier jobs with that key finish.
+        """
+        job = Job(id=uuid.uuid4().hex, kind=kind)
+        with self._lock:
+            self.jobs[job.id] = job
+            self._prune()
+            if key is not None:
+                if key in self._waiting:
+                    self._waiting[key].append((job, fn, args, kwargs))
+                    return job
+                self._waiting[key] = deque()
+        self._executor.submit(self._run, job, fn, args, kwargs, key)
+        return job
+
+    def _start_next(self, key: str) -> None:
+        with self._lock:
+            waiting = self._waiting[key]
+            if not waiting:
+                del self._waiting[key]
+                return
+            job, fn, args, kwargs = waiting.popleft()
+        self._executor.submit(self._run, job, fn, args, kwargs, key)
+
+    def _run(self, job: Job, fn: Callable[..., Dict], args, kwargs, key: Optional[str] = None) -> None:
+        def progress(update: Dict) -> None:
+            job.progress = dict(update)
+
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            job.result = fn(progress, *args, **kwargs)
+            job.status = "succeeded"
+        except Exception as e:
+            self.logger.error(f"Job {job.id} ({job.kind}) failed: {str(e)}")
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
+            if key is not None:
+                self._start_next(key)
+
+    def _prune(self) -> None:
+        """Forget the oldest finished jobs beyond max_finished."""
+        finished = [job for job in self.jobs.values() if job.finished_at is not None]
+        for job in sorted(finished, key=lambda job: job.finished_at)[:max(0, len(finished) - self.max_finished)]:
+            del self.jobs[job.id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def list(self) -> List[Job]:
+        with self._lock:
+            return sorted(self.jobs.values(), key=lambda job: job.created_at, reverse=True)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+class UploadInbox:
+    """Upload jobs handed between processes through a directory.
+
+    API workers with a read-only catalog cannot ingest, so submit() moves
+    each upload into the inbox next to a JSON status file. The one process
+    that owns catalog writes calls serve() to process queued uploads in
+    order, recording progress, the result or the error in the status file.
+    Status files are replaced atomically, so any process can read them.
+    """
+
+    def __init__(self, directory: Optional[Path] = None, max_finished: int = Settings.JOB_HISTORY_SIZE,
+                 poll_interval: float = Settings.INGEST_INBOX_POLL_INTERVAL):
+        self.logger = logging.getLogger(__name__)
+        self.directory = Path(directory or Settings.INGEST_INBOX_DIR)
+        self.max_finished = max_finished
+        self.poll_interval = poll_interval
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._stop = threading.Event()
+        self._server: Optional[threading.Thread] = None
+
+    def _status_path(self, job_id: str) -> Path:
+        return self.directory / f"{job_id}.json"
+
+    def _data_path(self, job_id: str) -> Path:
+        return self.directory / f"{job_id}.csv"
+
+    def _save(self, job: Job, source: Optional[str]) -> None:
+        temp_path = self.directory / f".{job.id}.{os.getpid()}.tmp"
+        temp_path.write_text(json.dumps({**asdict(job), "source": source}, default=str))
+        os.replace(temp_path, self._status_path(job.id))
+
+    def _load(self, status_path: Path) -> Optional[Dict]:
+        try:
+            return json.loads(status_path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    @staticmethod
+    def _job(record: Dict) -> Job:
+        return Job(**{job_field.name: record.get(job_field.name) for job_field in fields(Job)})
+
+    def submit(self, file_path: Path, source: Optional[str] = None) -> Job:
+        """Move an uploaded file into the inbox and queue it."""
+        job = Job(id=uuid.uuid4().hex, kind="upload")
+        os.replace(file_path, self._data_path(job.id))
+        self._save(job, source)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        record = self._load(self._status_path(job_id))
+        return self._job(record) if record is not None else None
+
+    def list(self) -> List[Job]:
+        records = [self._load(path) for path in self.directory.glob("*.json")]
+        jobs = [self._job(record) for record in records if record is not None]
+        return sorted(jobs, key=lambda job: job.created_at, reverse=True)
+
+    def serve(self, handler: Callable[[ProgressCallback, Path, Optional[str]], Dict],
+              discard: Callable[[Path], object] = lambda file_path: file_path.unlink(missing_ok=True),
+              last_run: Callable[[Path], Optional[Dict]] = lambda file_path: None) -> None:
+        """Process queued uploads in a background thread with handler(progress, file_path, source).
+
+        Only the process that owns catalog writes may serve. Each processed
+        file is passed to discard, which may keep it for a resumable
+        ingestion run. Uploads left running by an earlier crash are settled
+        from last_run(file_path), the latest ingestion run over their file:
+        they take its outcome if it finished or the file is gone (a resumed
+        run may have completed it), and are queued again otherwise.
+        """
+        for path in self.directory.glob("*.json"):
+            record = self._load(path)
+            if record is not None and record["status"] == "running":
+                self._recover(self._job(record), record.get("source"), discard, last_run)
+        self._server = threading.Thread(target=self._serve, args=(handler, discard), name="upload-inbox",
+                                        daemon=True)
+        self._server.start()
+
+    def _recover(self, job: Job, source: Optional[str], discard: Callable[[Path], object],
+                 last_run: Callable[[Path], Optional[Dict]]) -> None:
+        data_path = self._data_path(job.id)
+        run = last_run(data_path)
+        if run is not None and run["status"] == "succeeded":
+            job.status = "succeeded"
+            job.result = {"processing_result": run["result"]}
+        elif not data_path.exists():
+            job.status = "failed"
+            job.error = (run or {}).get("error") or "Uploaded file is missing"
+        else:
+            job.status = "queued"
+            self._save(job, source)
+            return
+        self.logger.info(f"Upload job {job.id} was interrupted; its ingestion run {job.status}")
+        job.finished_at = time.time()
+        self._save(job, source)
+        discard(data_path)
+
+    def _serve(self, handler: Callable[[ProgressCallback, Path, Optional[str]], Dict],
+               discard: Callable[[Path], object]) -> None:
+        while not self._stop.is_set():
+            queued = [record for record in (self._load(path) for path in self.directory.glob("*.json"))
+                      if record is not None and record["status"] == "queued"]
+            if not queued:
+                self._stop.wait(self.poll_interval)
+                continue
+            record = min(queued, key=lambda record: record["created_at"])
+            self._run(self._job(record), record.get("source"), handler, discard)
+            self._prune()
+
+    def _run(self, job: Job, source: Optional[str],
+             handler: Callable[[ProgressCallback, Path, Optional[str]], Dict],
+             discard: Callable[[Path], object]) -> None:
+        def progress(update: Dict) -> None:
+            job.progress = dict(update)
+            self._save(job, source)
+
+        job.status = "running"
+        job.started_at = time.time()
+        self._save(job, source)
+        data_path = self._data_path(job.id)
+        try:
+            job.result = handler(progress, data_path, source)
+            job.status = "succeeded"
+        except Exception as e:
+            self.logger.error(f"Upload job {job.id} failed: {str(e)}")
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
+            self._save(job, source)
+            discard(data_path)
+
+    def _prune(self) -> None:
+        """Delete the status files of the oldest finished jobs beyond max_finished."""
+        finished = [job for job in self.list() if job.finished_at is not None]
+        for job in sorted(finished, key=lambda job: job.finished_at)[:max(0, len(finished) - self.max_finished)]:
+            self._status_path(job.id).unlink(missing_ok=True)
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._server is not None:
+            self._server.join()
+            self._server = None
@@ -0,0 +1,115 @@
+from typing import Dict, List, Optional
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from config.settings import Settings
+
+class LLMResponseCache:
+    """Disk-backed cache of chat completions keyed on the full request, with TTL and LRU eviction."""
+
+    def __init__(self,
+                 path: Optional[Path] = None,
+                 max_entries: int = Settings.LLM_CACHE_MAX_ENTRIES,
+                 ttl_seconds: float = Settings.LLM_CACHE_TTL_SECONDS):
+        self.logger = logging.getLogger(__name__)
+        self.path = Path(path or Settings.LLM_CACHE_PATH)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, created REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)")
+        self.conn.commit()
+        self._size = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def make_key(model: str, messages: List[Dict], temperature: float, max_tokens: int) -> str:
+        """Hash everything that determines a completion."""
+        payload = json.dumps(
+            {"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens},
+            sort_keys=True, ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return a cached response unless it is missing or older than the TTL."""
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl_seconds and now - row[1] > self.ttl_seconds:
+                self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.conn.commit()
+                self._size -= 1
+                self.expired += 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+            self.hits += 1
+        return row[0]
+
+    def put(self, key: str, response: str) -> None:
+        now = time.time()
+        with self._lock:
+            exists = self.conn.execute("SELECT 1 FROM responses WHERE key = ?", (key,)).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created, last_access) VALUES (?, ?, ?, ?)",
+                (key, response, now, now)
+            )
+            if exists is None:
+                self._size += 1
+            if self._size > self.max_entries:
+                self._evict()
+            self.conn.commit()
+
+    def _evict(self) -> None:
+        """Drop expired entries, then the least recently used beyond max_entries."""
+        if self.ttl_seconds:
+            self.conn.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl_seconds,))
+        # Other processes may share the file, so recount before deleting
+        self._size = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        overflow = self._size - self.max_entries
+        if overflow > 0:
+            self.conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)",
+                (overflow,)
+            )
+            self._size -= overflow
+            self.logger.info(f"Evicted {overflow} responses from LLM cache")
+
+    def clear(self) -> None:
+        """Remove every cached response."""
+        with self._lock:
+            self.conn.execute("DELETE FROM responses")
+            self.conn.commit()
+            self._size = 0
+
+    def get_stats(self) -> Dict:
+        """Return hit/miss counters and occupancy."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "entries": self._size,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds
+        }
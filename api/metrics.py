@@ -0,0 +1,56 @@
+import os
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+
+# Spans from sub-millisecond index lookups to slow LLM calls
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# Queries
+QUERY_SECONDS = Histogram(
+    "catalog_query_seconds", "End-to-end query latency by outcome (answered, cached, error)",
+    ["outcome"], buckets=LATENCY_BUCKETS
+)
+QUERY_STAGE_SECONDS = Histogram(
+    "catalog_query_stage_seconds",
+    "Query stage latency (intent_fast_path, intent, embed, retrieve, generate)",
+    ["stage"], buckets=LATENCY_BUCKETS
+)
+
+# Ingestion
+INGEST_STAGE_SECONDS = Histogram(
+    "catalog_ingest_stage_seconds", "Per-chunk ingestion stage latency (parse, build_documents, embed, write)",
+    ["stage"], buckets=LATENCY_BUCKETS
+)
+INGEST_ROWS = Counter("catalog_ingest_rows_total", "Rows through each ingestion stage", ["stage"])
+
+# Embeddings
+EMBEDDING_FAILURES = Counter(
+    "catalog_embedding_failures_total", "Texts whose embedding raised and fell back to a zero vector"
+)
+EMBEDDING_ZERO_VECTORS = Counter(
+    "catalog_embedding_zero_vectors_total", "Zero-vector embeddings written to the vector store"
+)
+
+# Groq
+GROQ_REQUEST_SECONDS = Histogram(
+    "catalog_groq_request_seconds", "Groq chat completion latency, retries included",
+    buckets=LATENCY_BUCKETS
+)
+GROQ_RATE_LIMIT_WAIT_SECONDS = Histogram(
+    "catalog_groq_rate_limit_wait_seconds", "Time spent waiting on the client-side rate limiter",
+    buckets=LATENCY_BUCKETS
+)
+GROQ_REQUESTS = Counter("catalog_groq_requests_total", "Groq request attempts by outcome", ["outcome"])
+GROQ_TOKENS = Counter("catalog_groq_tokens_total", "Groq tokens reported by the API", ["kind"])
+
+def render_metrics():
+    """Return the exposition payload and its content type.
+
+    Under several API workers (PROMETHEUS_MULTIPROC_DIR set before startup)
+    every process's samples are aggregated, whichever worker is scraped.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
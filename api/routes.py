@@ -1,70 +1,318 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
-from typing import Dict, List
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional
+import asyncio
+import json
 import logging
+import os
 from pathlib import Path
 import tempfile
-import shutil
+import threading
 from agents.schema_analyzer import SchemaAnalyzer
 from agents.data_processor import DataProcessor
 from agents.query_agent import QueryAgent
+from agents.upload_pipeline import UploadPipeline
+from api.jobs import JobManager, UploadInbox
+from api.metrics import render_metrics
+from api.uploads import MultipartFileReceiver
+from config.settings import Settings
 
 app = FastAPI(title="Product Catalog API")
 logger = logging.getLogger(__name__)
 
+# The upload body is parsed by hand, so describe it for the OpenAPI docs
+UPLOAD_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}}
+                }
+            }
+        }
+    }
+}
+
+class BatchQueryRequest(BaseModel):
+    queries: List[str]
+
 class ProductCatalogAPI:
     def __init__(self, schema_analyzer: SchemaAnalyzer, 
                  data_processor: DataProcessor, 
-                 query_agent: QueryAgent):
+                 query_agent: QueryAgent,
+                 inbox: Optional[UploadInbox] = None):
         self.schema_analyzer = schema_analyzer
         self.data_processor = data_processor
         self.query_agent = query_agent
+        self.upload_pipeline = UploadPipeline(schema_analyzer, data_processor)
+        # With an inbox, uploads are ingested by the process that owns catalog writes
+        self.inbox = inbox
+        self.jobs = inbox if inbox is not None else JobManager()
+        # Blocking query work runs here so the event loop stays free
+        self.query_executor = ThreadPoolExecutor(max_workers=Settings.API_QUERY_WORKERS, thread_name_prefix="api-query")
+        self._queries_in_flight = 0
+        self._queries_lock = threading.Lock()
+
+    def close(self) -> None:
+        """Finish in-flight queries and flush the query log."""
+        self.query_executor.shutdown(wait=True)
+        self.query_agent.close()
+
+    def _admit_query(self) -> None:
+        """Count a query in flight, refusing it beyond the queue limit."""
+        with self._queries_lock:
+            if self._queries_in_flight >= Settings.API_QUERY_WORKERS + Settings.API_QUERY_QUEUE_LIMIT:
+                raise HTTPException(status_code=503, detail="Too many queries in progress, retry later")
+            self._queries_in_flight += 1
+
+    def _release_query(self, *_) -> None:
+        with self._queries_lock:
+            self._queries_in_flight -= 1
+
+    async def _run_query_work(self, fn: Callable, *args):
+        """Run blocking query work on the bounded pool, refusing work beyond the queue limit."""
+        self._admit_query()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.query_executor, fn, *args)
+        finally:
+            self._release_query()
+
+    def _stream_query_work(self, items: Iterator[str]) -> AsyncIterator[str]:
+        """Admit a streamed query now and produce each of its items on the bounded pool.
+
+        The query counts as in flight until its generator is closed, also
+        when the client disconnects mid-stream.
+        """
+        self._admit_query()
+        done = object()
+        # A step may still be running on the pool when the stream is cancelled
+        lock = threading.Lock()
+
+        def step():
+            with lock:
+                return next(items, done)
+
+        def close():
+            with lock:
+                items.close()
+
+        async def stream() -> AsyncIterator[str]:
+            loop = asyncio.get_running_loop()
+            try:
+                while True:
+                    item = await loop.run_in_executor(self.query_executor, step)
+                    if item is done:
+                        return
+                    yield item
+            finally:
+                self.query_executor.submit(close).add_done_callback(self._release_query)
 
-    async def upload_file(self, file: UploadFile) -> Dict:
-        """Handle file upload and processing."""
+        return stream()
+
+    def _process_upload(self, progress, temp_path: Path, source: str) -> Dict:
+        try:
+            return self.upload_pipeline.process(temp_path, source=source, progress=progress)
+        finally:
+            # Clean up, unless a failed ingestion can resume from the file
+            self.data_processor.discard_upload(temp_path)
+
+    async def upload_file(self, request: Request) -> Dict:
+        """Save the upload's "file" field to disk and queue its analysis and ingestion as a background job.
+
+        The multipart body is parsed as it arrives, so the file is written
+        straight to the upload directory without being spooled first.
+        """
         try:
-            # Save uploaded file temporarily
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.csv') as temp_file:
-                shutil.copyfileobj(file.file, temp_file)
+            receiver = MultipartFileReceiver(request.headers.get("content-type", ""), "file")
+        except ValueError as e:
+            raise HTTPException(status_code=415, detail=str(e))
+
+        temp_path = None
+        try:
+            loop = asyncio.get_running_loop()
+            Settings.UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(delete=False, suffix='.csv', dir=Settings.UPLOAD_DIR) as temp_file:
                 temp_path = Path(temp_file.name)
+                async for chunk in request.stream():
+                    data = receiver.feed(chunk)
+                    if data:
+                        # Write without blocking the event loop
+                        await loop.run_in_executor(None, temp_file.write, data)
+                receiver.finish()
+            if not receiver.found:
+                raise HTTPException(status_code=422, detail="The upload has no file in its 'file' field")
+
+            if self.inbox is not None:
+                job = self.inbox.submit(temp_path, receiver.filename)
+            else:
+                # Concurrent runs of one source would delete each other's products
+                job = self.jobs.submit("upload", self._process_upload, temp_path, receiver.filename,
+                                       key=receiver.filename)
+            return {"job_id": job.id, "status": job.status, "status_url": f"/jobs/{job.id}"}
             
-            # Analyze schema
-            schema_analysis = self.schema_analyzer.analyze_csv(temp_path)
-            
-            # Process data
-            processing_result = self.data_processor.process_csv(temp_path)
-            
-            # Clean up
-            temp_path.unlink()
-            
-            return {
-                "schema_analysis": schema_analysis,
-                "processing_result": processing_result
-            }
-            
+        except HTTPException:
+            if temp_path is not None:
+                temp_path.unlink(missing_ok=True)
+            raise
         except Exception as e:
-            logger.error(f"Error processing uploaded file: {str(e)}")
+            logger.error(f"Error receiving uploaded file: {str(e)}")
+            if temp_path is not None:
+                temp_path.unlink(missing_ok=True)
             raise HTTPException(status_code=500, detail=str(e))
 
+    def get_job(self, job_id: str, include_result: bool = False) -> Dict:
+        """Return a job's status and progress, and optionally its result."""
+        job = self.jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+        return job.to_dict(include_result=include_result)
+
+    def get_job_result(self, job_id: str) -> Dict:
+        """Return a finished job's result, or 409 while it is still running."""
+        job = self.get_job(job_id, include_result=True)
+        if job["status"] in ("queued", "running"):
+            raise HTTPException(status_code=409, detail=f"Job {job_id} is still {job['status']}")
+        if job["status"] == "failed":
+            raise HTTPException(status_code=500, detail=job["error"])
+        return job["result"]
+
     async def query_products(self, query: str) -> Dict:
         """Handle product queries."""
         try:
-            result = self.query_agent.process_query(query)
+            result = await self._run_query_work(self.query_agent.process_query, query)
             return result
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error processing query: {str(e)}")
             raise HTTPException(status_code=500, detail=str(e))
 
+    def stream_query(self, query: str) -> StreamingResponse:
+        """Stream a query response as Server-Sent Events."""
+        def events() -> Iterator[str]:
+            for fragment in self.query_agent.process_query_stream(query):
+                yield f"data: {json.dumps({'token': fragment})}\n\n"
+            yield "event: done\ndata: {}\n\n"
+
+        return StreamingResponse(
+            self._stream_query_work(events()),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+
+    def batch_query(self, queries: List[str]) -> StreamingResponse:
+        """Stream batch query results as newline-delimited JSON, in completion order."""
+        if len(queries) > Settings.QUERY_BATCH_MAX_QUERIES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"At most {Settings.QUERY_BATCH_MAX_QUERIES} queries per batch"
+            )
+
+        def lines() -> Iterator[str]:
+            try:
+                for result in self.query_agent.process_queries(queries):
+                    yield json.dumps(result, default=str) + "\n"
+            except Exception as e:
+                logger.error(f"Error processing query batch: {str(e)}")
+                yield json.dumps({"error": str(e)}) + "\n"
+
+        return StreamingResponse(self._stream_query_work(lines()), media_type="application/x-ndjson")
+
+    def get_collection_stats(self) -> Dict:
+        return self.data_processor.vector_store.get_collection_stats()
+
+    def get_group_stats(self, dimension: str, offset: int, limit: int) -> Dict:
+        """One page of per-source, per-category or per-brand statistics."""
+        catalog_stats = self.data_processor.vector_store.catalog_stats
+        if catalog_stats is None:
+            raise HTTPException(status_code=404, detail="Collection statistics are disabled")
+        try:
+            return catalog_stats.get_groups(dimension, offset=offset, limit=limit)
+        except ValueError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+
+    def list_products(self, offset: int, limit: int) -> Dict:
+        return self.data_processor.vector_store.list_documents(offset=offset, limit=limit)
+
 def create_routes(api: ProductCatalogAPI) -> FastAPI:
     """Create FastAPI routes."""
     
-    @app.post("/upload")
-    async def upload_file(file: UploadFile = File(...)):
-        return await api.upload_file(file)
+    @asynccontextmanager
+    async def lifespan(_app: FastAPI):
+        yield
+        # Flush the query log before the process exits
+        api.close()
+
+    app.router.lifespan_context = lifespan
+
+    @app.post("/upload", status_code=202, openapi_extra=UPLOAD_REQUEST_BODY)
+    async def upload_file(request: Request):
+        return await api.upload_file(request)
+
+    @app.get("/jobs")
+    async def list_jobs():
+        return [job.to_dict() for job in api.jobs.list()]
+
+    @app.get("/jobs/{job_id}")
+    async def get_job(job_id: str):
+        return api.get_job(job_id)
+
+    @app.get("/jobs/{job_id}/result")
+    async def get_job_result(job_id: str):
+        return api.get_job_result(job_id)
 
     @app.post("/query")
     async def query_products(query: str):
         return await api.query_products(query)
 
+    @app.post("/query/stream")
+    async def stream_query(query: str):
+        return api.stream_query(query)
+
+    @app.post("/query/batch")
+    async def batch_query(request: BatchQueryRequest):
+        return api.batch_query(request.queries)
+
+    # Each API worker process keeps its own query statistics and history
+    scope = {"pid": os.getpid(), "api_workers": Settings.API_WORKERS}
+
+    @app.get("/query/stats")
+    async def query_stats(response: Response):
+        response.headers["X-Query-Stats-Scope"] = f"process {scope['pid']}"
+        return {**api.query_agent.get_query_stats(), "scope": scope}
+
+    @app.get("/llm/cache")
+    async def llm_cache_stats():
+        return api.query_agent.groq_client.get_cache_stats()
+
+    @app.get("/query/history")
+    async def query_history(response: Response, limit: int = 20):
+        response.headers["X-Query-Stats-Scope"] = f"process {scope['pid']}"
+        return api.query_agent.get_query_history(limit=max(1, limit))
+
+    @app.get("/stats")
+    async def collection_stats():
+        return await api._run_query_work(api.get_collection_stats)
+
+    @app.get("/stats/{dimension}")
+    async def group_stats(dimension: str, offset: int = 0, limit: int = Settings.STATS_PAGE_SIZE):
+        return await api._run_query_work(api.get_group_stats, dimension, offset, min(limit, 1000))
+
+    @app.get("/products")
+    async def list_products(offset: int = 0, limit: int = Settings.STATS_PAGE_SIZE):
+        return await api._run_query_work(api.list_products, offset, min(limit, 1000))
+
+    @app.get("/metrics")
+    async def metrics():
+        payload, content_type = render_metrics()
+        return Response(content=payload, media_type=content_type)
+
     @app.get("/health")
     async def health_check():
         return {"status": "healthy"}
@@ -0,0 +1,73 @@
+from typing import BinaryIO, Dict, List, Optional
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+class MultipartFileReceiver:
+    """Extracts one file field from a multipart/form-data body as the body arrives.
+
+    Declaring an UploadFile parameter makes Starlette parse the whole form,
+    spooling the file, before the handler runs. Feeding request.stream()
+    through this parser instead lets the handler write the file to its
+    destination once, chunk by chunk.
+    """
+
+    def __init__(self, content_type: str, field_name: str):
+        mime_type, params = parse_options_header(content_type)
+        boundary = params.get(b"boundary")
+        if mime_type != b"multipart/form-data" or not boundary:
+            raise ValueError("Expected a multipart/form-data request body")
+        self.field_name = field_name.encode()
+        self.filename: Optional[str] = None
+        self.found = False
+
+        self._headers: Dict[bytes, bytes] = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._in_field = False
+        self._data: List[bytes] = []
+        self._parser = MultipartParser(boundary, callbacks={
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    def _on_part_begin(self) -> None:
+        self._headers = {}
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition"))
+        # Only the first file sent under the field name is kept
+        if not self.found and options.get(b"name") == self.field_name and b"filename" in options:
+            self.found = self._in_field = True
+            self.filename = options[b"filename"].decode("utf-8", errors="replace")
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_field:
+            self._data.append(data[start:end])
+
+    def _on_part_end(self) -> None:
+        self._in_field = False
+
+    def feed(self, chunk: bytes) -> bytes:
+        """Parse the next chunk of the body, returning the file data it contained."""
+        self._parser.write(chunk)
+        data = b"".join(self._data)
+        self._data.clear()
+        return data
+
+    def finish(self) -> None:
+        self._parser.finalize()
@@ -0,0 +1,216 @@
+"""Benchmark ingestion, embedding, retrieval, schema analysis and querying offline.
+
+Groq is replaced by the local stub in benchmarks.groq_stub, so no API key or
+network is needed. Results are printed, and optionally written, as JSON
+tagged with the current commit. Run from the repository root:
+
+    python -m benchmarks.bench_components --output bench_output.json
+"""
+import argparse
+import json
+import platform
+import random
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import pandas as pd
+from agents.data_processor import DataProcessor
+from agents.query_agent import QueryAgent
+from agents.query_history import QueryHistory
+from agents.schema_analyzer import SchemaAnalyzer
+from agents.schema_cache import SchemaCache
+from api.llm_cache import LLMResponseCache
+from benchmarks.groq_stub import make_groq_client
+from config.settings import Settings
+from database.embeddings import EmbeddingGenerator
+from database.job_store import IngestionJobStore
+from database.lexical_index import LexicalIndex
+from database.vector_store import VectorStore
+
+def percentiles(latencies: List[float]) -> Dict:
+    """Mean and p50/p95/p99 of latencies in seconds, reported in milliseconds."""
+    ordered = sorted(latencies)
+    pick = lambda fraction: round(ordered[int(fraction * (len(ordered) - 1))] * 1000, 2)
+    return {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 2),
+        "p50_ms": pick(0.5),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99)
+    }
+
+def time_each(fn: Callable[[str], object], inputs: List[str]) -> List[float]:
+    latencies = []
+    for value in inputs:
+        start = time.perf_counter()
+        fn(value)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def build_queries(csv_files: List[Path], count: int, seed: int) -> List[str]:
+    """Catalog-shaped queries: product names, brand + subcategory, rankings and free text."""
+    rng = random.Random(seed)
+    df = pd.concat([pd.read_csv(file_path) for file_path in csv_files], ignore_index=True)
+    names = df['name'].dropna().astype(str).tolist()
+    subcategories = df['subcategory'].dropna().astype(str).unique().tolist()
+    brands = df['brand'].dropna().astype(str).unique().tolist()
+    templates = [
+        lambda: rng.choice(names),
+        lambda: f"{rng.choice(brands)} {rng.choice(subcategories)}",
+        lambda: f"cheapest {rng.choice(subcategories)}",
+        lambda: f"most popular {rng.choice(subcategories)} under ${rng.choice([20, 50, 100])}",
+        lambda: f"a gift for someone who likes {rng.choice(subcategories).lower()}",
+    ]
+    return [rng.choice(templates)() for _ in range(count)]
+
+def bench_ingestion(csv_files: List[Path], workdir: Path) -> Dict:
+    """DataProcessor.process_csv rows/sec per file into a fresh store."""
+    embedding_generator = EmbeddingGenerator(use_cache=False)
+    vector_store = VectorStore(embedding_generator, str(workdir / "ingest"))
+    processor = DataProcessor(vector_store, embedding_generator,
+                              job_store=IngestionJobStore(workdir / "ingest_jobs.sqlite3"))
+    results = {}
+    for file_path in csv_files:
+        start = time.perf_counter()
+        result = processor.process_csv(file_path)
+        seconds = time.perf_counter() - start
+        results[file_path.name] = {
+            "rows": result["rows_processed"],
+            "seconds": round(seconds, 3),
+            "rows_per_sec": round(result["rows_processed"] / seconds)
+        }
+    return results
+
+def bench_embeddings(csv_files: List[Path], batch_sizes: List[int]) -> Dict:
+    """EmbeddingGenerator.batch_generate throughput over every product document, without the cache."""
+    embedding_generator = EmbeddingGenerator(use_cache=False)
+    documents = []
+    for file_path in csv_files:
+        documents.extend(DataProcessor.build_documents(pd.read_csv(file_path))[0])
+    results = {"backend": embedding_generator.backend.model_id, "texts": len(documents), "batch_sizes": {}}
+    for batch_size in batch_sizes:
+        start = time.perf_counter()
+        embedding_generator.batch_generate(documents, batch_size=batch_size, show_progress=False)
+        seconds = time.perf_counter() - start
+        results["batch_sizes"][str(batch_size)] = {
+            "seconds": round(seconds, 3),
+            "texts_per_sec": round(len(documents) / seconds)
+        }
+    return results
+
+def bench_retrieval(vector_store: VectorStore, queries: List[str], n_results: int) -> Dict:
+    """VectorStore.query_similar latency, with the lexical index attached as in production."""
+    search = lambda query: vector_store.query_similar(query, n_results=n_results)
+    search(queries[0])
+    return percentiles(time_each(search, queries))
+
+def bench_schema_analysis(csv_files: List[Path], workdir: Path, groq_options: Dict) -> Dict:
+    """SchemaAnalyzer.analyze_csv wall time, cold and then served from the schema cache."""
+    results = {}
+    for file_path in csv_files:
+        # Caches per file, or files sharing a column layout would skip the LLM
+        cache = SchemaCache(workdir / f"schema_cache_{file_path.stem}.sqlite3")
+        groq_client = make_groq_client(
+            **groq_options, cache=LLMResponseCache(workdir / f"llm_cache_{file_path.stem}.sqlite3")
+        )
+        analyzer = SchemaAnalyzer(groq_client, cache=cache)
+        start = time.perf_counter()
+        analysis = analyzer.analyze_csv(file_path)
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        analyzer.analyze_csv(file_path)
+        warm = time.perf_counter() - start
+        results[file_path.name] = {
+            "cold_seconds": round(cold, 4),
+            "cached_seconds": round(warm, 4),
+            "llm_calls": analysis.get("llm_calls")
+        }
+    return results
+
+def bench_queries(vector_store: VectorStore, queries: List[str], workdir: Path, groq_options: Dict) -> Dict:
+    """QueryAgent.process_query latency percentiles end to end, against the Groq stub."""
+    groq_client = make_groq_client(**groq_options, cache=LLMResponseCache(workdir / "llm_cache_queries.sqlite3"))
+    query_agent = QueryAgent(vector_store, groq_client, query_history=QueryHistory(log_path=None))
+    latencies = time_each(query_agent.process_query, queries)
+    errors = sum(1 for record in query_agent.get_query_history() if "error" in record)
+    return {
+        **percentiles(latencies),
+        "errors": errors,
+        "answer_cache": query_agent.get_cache_stats(),
+        "intents": query_agent.get_intent_stats(),
+        "llm_cache": groq_client.get_cache_stats(),
+        "groq": groq_client.async_client.client.get_stats()
+    }
+
+def current_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=Settings.BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(csv_files: List[Path], queries: int = 200, n_results: int = 5, seed: int = 0,
+        groq_options: Optional[Dict] = None, batch_sizes: Optional[List[int]] = None) -> Dict:
+    groq_options = groq_options or {}
+    query_texts = build_queries(csv_files, queries, seed)
+    results = {
+        "commit": current_commit(),
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "files": [file_path.name for file_path in csv_files],
+        "groq_stub": groq_options,
+        "results": {}
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        workdir = Path(workdir)
+        results["results"]["process_csv"] = bench_ingestion(csv_files, workdir)
+        results["results"]["batch_generate"] = bench_embeddings(
+            csv_files, batch_sizes or [Settings.EMBEDDING_BATCH_SIZE]
+        )
+
+        # Retrieval and queries share one store ingested with every file
+        embedding_generator = EmbeddingGenerator(use_cache=False)
+        vector_store = VectorStore(embedding_generator, str(workdir / "query"))
+        vector_store.set_lexical_index(LexicalIndex())
+        processor = DataProcessor(vector_store, embedding_generator,
+                                  job_store=IngestionJobStore(workdir / "query_jobs.sqlite3"))
+        for file_path in csv_files:
+            processor.process_csv(file_path)
+
+        results["results"]["query_similar"] = bench_retrieval(vector_store, query_texts, n_results)
+        results["results"]["analyze_csv"] = bench_schema_analysis(csv_files, workdir, groq_options)
+        results["results"]["process_query"] = bench_queries(vector_store, query_texts, workdir, groq_options)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--csv-dir", default=str(Settings.BASE_DIR / "csv"))
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[Settings.EMBEDDING_BATCH_SIZE])
+    parser.add_argument("--llm-latency", type=float, default=0.05,
+                        help="Stub seconds per request before the first token")
+    parser.add_argument("--llm-tokens-per-second", type=float, default=2000.0,
+                        help="Stub completion rate; 0 returns completions instantly")
+    parser.add_argument("--llm-completion-tokens", type=int, default=150)
+    parser.add_argument("--output", help="Also write the JSON results to this file")
+    args = parser.parse_args()
+
+    groq_options = {
+        "latency": args.llm_latency,
+        "tokens_per_second": args.llm_tokens_per_second,
+        "completion_tokens": args.llm_completion_tokens
+    }
+    csv_files = sorted(Path(args.csv_dir).glob("*.csv"))
+    results = run(csv_files, args.queries, args.k, args.seed, groq_options, args.batch_sizes)
+    payload = json.dumps(results, indent=2)
+    print(payload)
+    if args.output:
+        Path(args.output).write_text(payload + "\n")
+
+if __name__ == "__main__":
+    main()
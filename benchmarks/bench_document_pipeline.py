@@ -0,0 +1,71 @@
+"""Compare the per-row and columnar document pipelines of DataProcessor.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_document_pipeline
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Dict, List
+import pandas as pd
+from agents.data_processor import DataProcessor
+from config.settings import Settings
+
+def per_row_pipeline(processor: DataProcessor, df: pd.DataFrame):
+    """The original iterrows path: one process_row call per row."""
+    documents, metadatas, ids = [], [], []
+    for _, row in df.iterrows():
+        document, metadata = processor.process_row(row)
+        documents.append(document)
+        metadatas.append(metadata)
+        ids.append(processor.build_product_id(row, document))
+    return documents, metadatas, ids
+
+def columnar_pipeline(processor: DataProcessor, df: pd.DataFrame):
+    """The vectorized path used by process_csv."""
+    documents, metadatas = processor.build_documents(df)
+    return documents, metadatas, processor.build_product_ids(df, documents)
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def run(csv_files: List[Path], repeat: int = 3) -> List[Dict]:
+    # Document building does not touch the vector store or embeddings
+    processor = DataProcessor(vector_store=None, embedding_generator=None)
+    results = []
+    for file_path in csv_files:
+        df = pd.read_csv(file_path)
+        if per_row_pipeline(processor, df) != columnar_pipeline(processor, df):
+            raise AssertionError(f"Columnar output differs from per-row output for {file_path.name}")
+
+        per_row = best_of(lambda: per_row_pipeline(processor, df), repeat)
+        columnar = best_of(lambda: columnar_pipeline(processor, df), repeat)
+        results.append({
+            "file": file_path.name,
+            "rows": len(df),
+            "per_row_seconds": round(per_row, 4),
+            "columnar_seconds": round(columnar, 4),
+            "per_row_rows_per_sec": round(len(df) / per_row),
+            "columnar_rows_per_sec": round(len(df) / columnar),
+            "speedup": round(per_row / columnar, 1)
+        })
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--csv-dir", default=str(Settings.BASE_DIR / "csv"))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    csv_files = sorted(Path(args.csv_dir).glob("*.csv"))
+    print(json.dumps(run(csv_files, args.repeat), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Compare vector-only and hybrid (BM25 + vector) retrieval on the bundled catalog.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_lexical_search
+"""
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Set, Tuple
+from agents.data_processor import DataProcessor
+from config.settings import Settings
+from database.embeddings import EmbeddingGenerator
+from database.lexical_index import LexicalIndex
+from database.vector_store import VectorStore
+
+QueryCase = Tuple[str, Set[str]]
+
+def build_store(csv_files: List[Path], persist_directory: str) -> VectorStore:
+    """Ingest the CSV files into a fresh store with an attached lexical index."""
+    embedding_generator = EmbeddingGenerator(use_cache=False)
+    vector_store = VectorStore(embedding_generator, persist_directory)
+    vector_store.set_lexical_index(LexicalIndex())
+    processor = DataProcessor(vector_store, embedding_generator)
+    for file_path in csv_files:
+        processor.process_csv(file_path)
+    return vector_store
+
+def build_cases(vector_store: VectorStore, sample_size: int, seed: int) -> Dict[str, List[QueryCase]]:
+    """Sample queries with their relevant ids: exact SKUs, exact names and brand + subcategory."""
+    records = vector_store.lexical_index.records
+    rng = random.Random(seed)
+    sample = rng.sample(sorted(records), min(sample_size, len(records)))
+
+    by_name: Dict[str, Set[str]] = {}
+    by_brand_subcategory: Dict[Tuple[str, str], Set[str]] = {}
+    for product_id, (_, metadata) in records.items():
+        by_name.setdefault(LexicalIndex.normalize(metadata['name']), set()).add(product_id)
+        if LexicalIndex._is_value(metadata.get('brand')):
+            key = (metadata['brand'], metadata['subcategory'])
+            by_brand_subcategory.setdefault(key, set()).add(product_id)
+
+    cases = {"sku": [], "name": [], "brand_subcategory": []}
+    for product_id in sample:
+        metadata = records[product_id][1]
+        cases["sku"].append((metadata['model'], {product_id}))
+        cases["name"].append((metadata['name'], by_name[LexicalIndex.normalize(metadata['name'])]))
+        if LexicalIndex._is_value(metadata.get('brand')):
+            key = (metadata['brand'], metadata['subcategory'])
+            cases["brand_subcategory"].append((f"{key[0]} {key[1]}", by_brand_subcategory[key]))
+    return cases
+
+def evaluate(search: Callable[[str], List[Dict]], cases: List[QueryCase], n_results: int) -> Dict:
+    """Latency and recall: the share of relevant ids retrieved, out of at most n_results."""
+    latencies, recalls = [], []
+    for query, relevant in cases:
+        start = time.perf_counter()
+        results = search(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+        retrieved = {result['id'] for result in results[:n_results]}
+        recalls.append(len(retrieved & relevant) / min(len(relevant), n_results))
+    latencies.sort()
+    return {
+        "queries": len(cases),
+        "recall_at_k": round(statistics.mean(recalls), 3),
+        "mean_ms": round(statistics.mean(latencies), 2),
+        "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))], 2)
+    }
+
+def run(csv_files: List[Path], sample_size: int = 200, n_results: int = 5, seed: int = 0) -> Dict:
+    with tempfile.TemporaryDirectory() as persist_directory:
+        vector_store = build_store(csv_files, persist_directory)
+        lexical_index = vector_store.lexical_index
+        cases = build_cases(vector_store, sample_size, seed)
+        search = lambda query: vector_store.query_similar(query, n_results=n_results)
+
+        results = {"documents": lexical_index.get_stats()["documents"], "k": n_results, "query_sets": {}}
+        for name, query_cases in cases.items():
+            vector_store.lexical_index = None
+            vector_only = evaluate(search, query_cases, n_results)
+            vector_store.lexical_index = lexical_index
+            lexical_only_before = vector_store.lexical_only_queries
+            hybrid = evaluate(search, query_cases, n_results)
+            hybrid["answered_without_embedding"] = vector_store.lexical_only_queries - lexical_only_before
+            results["query_sets"][name] = {"vector": vector_only, "hybrid": hybrid}
+        return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--csv-dir", default=str(Settings.BASE_DIR / "csv"))
+    parser.add_argument("--sample-size", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    csv_files = sorted(Path(args.csv_dir).glob("*.csv"))
+    print(json.dumps(run(csv_files, args.sample_size, args.k, args.seed), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""A local stand-in for the Groq chat-completions API, for running benchmarks offline.
+
+StubAsyncGroq has the shape AsyncGroqClient uses (client.chat.completions.create,
+with and without stream=True). Each call sleeps for a fixed latency plus the
+time to "generate" its completion at a fixed token rate, then answers by
+prompt kind: intent analysis gets a Python dict, schema profiling a JSON
+description of every profiled column, and anything else filler text.
+"""
+import asyncio
+import json
+import re
+import types
+from typing import Dict, List, Optional
+from api.async_groq_client import AsyncGroqClient, TokenBucketLimiter, estimate_tokens
+from api.groq_client import GroqClient
+from api.llm_cache import LLMResponseCache
+
+INTENT_RESPONSE = "{'type': 'search', 'filters': {'category': None, 'price_range': None, 'brand': None}, 'sort': None}"
+FILLER_WORDS = ("These products match your request and are available now at the listed prices "
+                "with discounts on several items and related accessories worth a look").split()
+
+def _namespace(**fields):
+    return types.SimpleNamespace(**fields)
+
+class _StubStream:
+    def __init__(self, words: List[str], seconds_per_token: float):
+        self.words = words
+        self.seconds_per_token = seconds_per_token
+
+    def __aiter__(self):
+        return self._chunks()
+
+    async def _chunks(self):
+        for word in self.words:
+            await asyncio.sleep(self.seconds_per_token)
+            yield _namespace(choices=[_namespace(delta=_namespace(content=word + " "))])
+
+class _StubCompletions:
+    def __init__(self, stub: "StubAsyncGroq"):
+        self.stub = stub
+
+    async def create(self, model: str, messages: List[Dict], max_tokens: int = 1024,
+                     temperature: float = 0.7, stream: bool = False, **kwargs):
+        return await self.stub.complete(messages, max_tokens, stream)
+
+class StubAsyncGroq:
+    def __init__(self, latency: float = 0.05, tokens_per_second: float = 2000.0,
+                 completion_tokens: int = 150):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.completion_tokens = completion_tokens
+        self.chat = _namespace(completions=_StubCompletions(self))
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.generated_tokens = 0
+
+    def respond(self, prompt: str, max_tokens: int) -> str:
+        if "extract the intent" in prompt:
+            return INTENT_RESPONSE
+        match = re.search(r"rows:\n(\{.*\})\n\nReturn only", prompt, re.DOTALL)
+        if match:
+            columns = json.loads(match.group(1))
+            return json.dumps({
+                "columns": {column: f"The {column} of each product." for column in columns},
+                "schema_description": "A product catalog with one row per product."
+            })
+        count = min(self.completion_tokens, max_tokens)
+        return " ".join(FILLER_WORDS[i % len(FILLER_WORDS)] for i in range(count))
+
+    async def complete(self, messages: List[Dict], max_tokens: int, stream: bool):
+        text = self.respond(messages[-1]["content"], max_tokens)
+        words = text.split(" ")
+        prompt_tokens = estimate_tokens(messages)
+        self.calls += 1
+        self.prompt_tokens += prompt_tokens
+        self.generated_tokens += len(words)
+
+        await asyncio.sleep(self.latency)
+        seconds_per_token = 1.0 / self.tokens_per_second if self.tokens_per_second else 0.0
+        if stream:
+            return _StubStream(words, seconds_per_token)
+        await asyncio.sleep(len(words) * seconds_per_token)
+        return _namespace(
+            choices=[_namespace(message=_namespace(content=text))],
+            usage=_namespace(prompt_tokens=prompt_tokens, completion_tokens=len(words),
+                             total_tokens=prompt_tokens + len(words))
+        )
+
+    async def close(self) -> None:
+        pass
+
+    def get_stats(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.generated_tokens
+        }
+
+def make_groq_client(latency: float = 0.05, tokens_per_second: float = 2000.0,
+                     completion_tokens: int = 150, cache: Optional[LLMResponseCache] = None) -> GroqClient:
+    """A GroqClient backed by the stub (at async_client.client), with client-side rate limits disabled."""
+    stub = StubAsyncGroq(latency, tokens_per_second, completion_tokens)
+    return GroqClient(async_client=AsyncGroqClient(client=stub, limiter=TokenBucketLimiter(0, 0)), cache=cache)
@@ -9,21 +9,33 @@ Please describe:
 4. Potential use cases for this data
 """
 
+SCHEMA_PROFILE_PROMPT = """
+Analyze the following CSV column profiles, computed from a sample of {sample_rows} of {total_rows} rows:
+{profile}
+
+Return only a JSON object of this form:
+{{
+    "columns": {{"<column name>": "<one or two sentence description of the column>"}},
+    "schema_description": "<overview covering the purpose and structure of the dataset, relationships between columns, data quality considerations and potential use cases>"
+}}
+Describe every column listed above.
+"""
+
 QUERY_PROMPTS = {
     'intent_analysis': """
     Analyze the following user query and extract the intent and parameters:
     Query: {query}
     
-    Return a Python dictionary with:
-    {
+    Return only a Python dictionary with:
+    {{
         'type': str,  # 'search', 'compare', 'analyze'
-        'filters': {
+        'filters': {{
             'category': Optional[str],
-            'price_range': Optional[tuple],
+            'price_range': Optional[tuple],  # (min_price, max_price), None for an open end
             'brand': Optional[str]
-        },
-        'sort': Optional[str]
-    }
+        }},
+        'sort': Optional[str]  # 'price_asc', 'price_desc', 'likes_desc', 'discount_desc', 'newest'
+    }}
     """,
     
     'response_generation': """
@@ -6,23 +6,107 @@ class Settings:
     BASE_DIR = Path(__file__).parent.parent
     DATA_DIR = BASE_DIR / "data"
     VECTOR_STORE_DIR = DATA_DIR / "vectorstore"
+    UPLOAD_DIR = DATA_DIR / "uploads"
     
     # API Configuration
     GROQ_API_KEY = os.getenv("GROQ_API_KEY")
     API_HOST = os.getenv("API_HOST", "0.0.0.0")
     API_PORT = int(os.getenv("API_PORT", "8000"))
+    API_QUERY_WORKERS = int(os.getenv("API_QUERY_WORKERS", "8"))
+    API_QUERY_QUEUE_LIMIT = int(os.getenv("API_QUERY_QUEUE_LIMIT", "64"))
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+    JOB_HISTORY_SIZE = int(os.getenv("JOB_HISTORY_SIZE", "200"))
+    # With several API workers, uploads queue here for the one process that owns catalog writes
+    API_WORKERS = int(os.getenv("API_WORKERS", "1"))
+    INGEST_INBOX_DIR = UPLOAD_DIR / "inbox"
+    INGEST_INBOX_POLL_INTERVAL = float(os.getenv("INGEST_INBOX_POLL_INTERVAL", "1.0"))
+    # How often read-only API workers check for catalog changes (0 disables reloading)
+    CATALOG_REFRESH_INTERVAL = float(os.getenv("CATALOG_REFRESH_INTERVAL", "2.0"))
+    # The writer publishes changes when an ingestion run finishes, and at most this often during one
+    CATALOG_PUBLISH_INTERVAL = float(os.getenv("CATALOG_PUBLISH_INTERVAL", "30.0"))
+    METRICS_MULTIPROC_DIR = DATA_DIR / "metrics"
+    
+    # Run mode: "ui" serves Gradio, "api" serves the JSON API headless, "ingest" loads INITIAL_DATA_DIR and exits
+    RUN_MODE = os.getenv("RUN_MODE", "ui").lower()
     
     # Model Configuration
     MODEL_NAME = "llama-3.1-70b-versatile"
     MAX_TOKENS = 4096
     TEMPERATURE = 0.7
     
+    # Groq Client Configuration (limits default to the free tier; 0 disables a limit)
+    GROQ_MAX_CONCURRENCY = int(os.getenv("GROQ_MAX_CONCURRENCY", "8"))
+    GROQ_REQUESTS_PER_MINUTE = int(os.getenv("GROQ_REQUESTS_PER_MINUTE", "30"))
+    GROQ_TOKENS_PER_MINUTE = int(os.getenv("GROQ_TOKENS_PER_MINUTE", "6000"))
+    GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "5"))
+    GROQ_TIMEOUT = float(os.getenv("GROQ_TIMEOUT", "60"))
+    GROQ_BACKOFF_BASE = float(os.getenv("GROQ_BACKOFF_BASE", "1.0"))
+    GROQ_BACKOFF_MAX = float(os.getenv("GROQ_BACKOFF_MAX", "30.0"))
+    
+    # LLM Response Cache (used by temperature-0 call sites that validate replies, or by every prompt with LLM_CACHE_ALL_PROMPTS)
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_ALL_PROMPTS = os.getenv("LLM_CACHE_ALL_PROMPTS", "false").lower() == "true"
+    LLM_CACHE_PATH = DATA_DIR / "llm_cache.sqlite3"
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+    LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+    
     # Processing Configuration
     BATCH_SIZE = 32
     MAX_WORKERS = 4
     CHUNK_SIZE = 512
     OVERLAP_SIZE = 50
+    INGEST_USE_PROCESSES = os.getenv("INGEST_USE_PROCESSES", "true").lower() == "true"
+    INCREMENTAL_INGESTION = os.getenv("INCREMENTAL_INGESTION", "true").lower() == "true"
+    INGEST_CHUNK_SIZE = int(os.getenv("INGEST_CHUNK_SIZE", "5000"))
+    INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "2"))
+    STREAMING_THRESHOLD_BYTES = int(os.getenv("STREAMING_THRESHOLD_BYTES", str(64 * 1024 * 1024)))
+    INGEST_CHECKPOINTS_ENABLED = os.getenv("INGEST_CHECKPOINTS_ENABLED", "true").lower() == "true"
+    INGEST_JOB_STORE_PATH = DATA_DIR / "ingest_jobs.sqlite3"
+    CATALOG_STATS_ENABLED = os.getenv("CATALOG_STATS_ENABLED", "true").lower() == "true"
+    CATALOG_STATS_PATH = DATA_DIR / "catalog_stats.sqlite3"
+    STATS_PAGE_SIZE = int(os.getenv("STATS_PAGE_SIZE", "50"))
+    
+    # Embedding Configuration
+    EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "hashing")
+    EMBEDDING_DIMENSION = int(os.getenv("EMBEDDING_DIMENSION", "384"))
+    EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "1024"))
+    EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+    EMBEDDING_CACHE_PATH = DATA_DIR / "embedding_cache.sqlite3"
+    EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000"))
+    # Seconds before a hit refreshes an entry's recency again; hits in between are read-only
+    EMBEDDING_CACHE_TOUCH_INTERVAL = float(os.getenv("EMBEDDING_CACHE_TOUCH_INTERVAL", "300.0"))
+    
+    # Lexical Search Configuration
+    LEXICAL_INDEX_ENABLED = os.getenv("LEXICAL_INDEX_ENABLED", "true").lower() == "true"
+    BM25_K1 = float(os.getenv("BM25_K1", "1.5"))
+    BM25_B = float(os.getenv("BM25_B", "0.75"))
+    HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "20"))
+    RRF_K = int(os.getenv("RRF_K", "60"))
+    
+    # Schema Analysis Configuration
+    SCHEMA_PROFILING_ENABLED = os.getenv("SCHEMA_PROFILING_ENABLED", "true").lower() == "true"
+    SCHEMA_SAMPLE_ROWS = int(os.getenv("SCHEMA_SAMPLE_ROWS", "10000"))
+    SCHEMA_CACHE_ENABLED = os.getenv("SCHEMA_CACHE_ENABLED", "true").lower() == "true"
+    SCHEMA_CACHE_PATH = DATA_DIR / "schema_cache.sqlite3"
     
+    # Query Configuration
+    QUERY_HISTORY_SIZE = int(os.getenv("QUERY_HISTORY_SIZE", "500"))
+    QUERY_LOG_ENABLED = os.getenv("QUERY_LOG_ENABLED", "true").lower() == "true"
+    QUERY_LOG_PATH = DATA_DIR / "query_log.jsonl"
+    QUERY_LOG_QUEUE_SIZE = int(os.getenv("QUERY_LOG_QUEUE_SIZE", "10000"))
+    QUERY_TOP_CAPACITY = int(os.getenv("QUERY_TOP_CAPACITY", "200"))
+    ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+    ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1000"))
+    ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.75"))
+    INTENT_FAST_PATH_ENABLED = os.getenv("INTENT_FAST_PATH_ENABLED", "true").lower() == "true"
+    INTENT_FAST_PATH_CONFIDENCE = float(os.getenv("INTENT_FAST_PATH_CONFIDENCE", "0.7"))
+    COLUMNAR_INDEX_ENABLED = os.getenv("COLUMNAR_INDEX_ENABLED", "true").lower() == "true"
+    RANKING_LEXICAL_CANDIDATES = int(os.getenv("RANKING_LEXICAL_CANDIDATES", "2000"))
+    SPECULATIVE_RETRIEVAL = os.getenv("SPECULATIVE_RETRIEVAL", "true").lower() == "true"
+    SPECULATIVE_OVERFETCH = int(os.getenv("SPECULATIVE_OVERFETCH", "50"))
+    QUERY_WORKERS = int(os.getenv("QUERY_WORKERS", "8"))
+    QUERY_BATCH_CONCURRENCY = int(os.getenv("QUERY_BATCH_CONCURRENCY", "8"))
+    QUERY_BATCH_MAX_QUERIES = int(os.getenv("QUERY_BATCH_MAX_QUERIES", "5000"))
     
     # Logging Configuration
     LOGGING_CONFIG = {
@@ -70,4 +154,5 @@ class Settings:
     def create_directories(cls) -> None:
         """Create necessary directories."""
         cls.DATA_DIR.mkdir(parents=True, exist_ok=True)
-        cls.VECTOR_STORE_DIR.mkdir(parents=True, exist_ok=True)
\ No newline at end of file
+        cls.VECTOR_STORE_DIR.mkdir(parents=True, exist_ok=True)
+        cls.UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
\ No newline at end of file
@@ -0,0 +1,267 @@
+from typing import Dict, List, Optional, Tuple
+import logging
+import math
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from config.settings import Settings
+from database.vector_store import CatalogListener
+
+class CatalogStats(CatalogListener):
+    """Collection statistics maintained incrementally from catalog changes and persisted in SQLite.
+
+    Every product's source, category, brand and price is kept in a products
+    table so updates and deletes can subtract what they replace. Per-group
+    counters (count, priced count, price sum, embedding failures, last
+    ingest) live in memory and in a groups table, so reading them never
+    touches the vector store. Price minimums and maximums are looked up
+    through indexes on (group, price) and cached until a change could have
+    moved them.
+    """
+
+    DIMENSIONS = ("source", "category", "brand")
+    CATALOG = ("catalog", "")
+
+    def __init__(self, path: Optional[Path] = None):
+        self.logger = logging.getLogger(__name__)
+        self.path = Path(path or Settings.CATALOG_STATS_PATH)
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS products ("
+            "id TEXT PRIMARY KEY, source TEXT, category TEXT, brand TEXT, price REAL, "
+            "failed INTEGER NOT NULL DEFAULT 0)"
+        )
+        for dimension in self.DIMENSIONS:
+            self.conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_products_{dimension}_price ON products({dimension}, price)"
+            )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_products_price ON products(price)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS groups ("
+            "dimension TEXT NOT NULL, value TEXT NOT NULL, count INTEGER NOT NULL, "
+            "priced INTEGER NOT NULL, price_sum REAL NOT NULL, failed INTEGER NOT NULL, "
+            "updated REAL, PRIMARY KEY (dimension, value))"
+        )
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.conn.commit()
+
+        self.groups: Dict[Tuple[str, str], Dict] = {}
+        # (min, max) price per group, filled on demand
+        self._ranges: Dict[Tuple[str, str], Tuple[Optional[float], Optional[float]]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        self.groups = {
+            (row[0], row[1]): {"count": row[2], "priced": row[3], "price_sum": row[4],
+                               "failed": row[5], "updated": row[6]}
+            for row in self.conn.execute("SELECT * FROM groups")
+        }
+        self._ranges = {}
+
+    # Syncing with a collection
+
+    @property
+    def total(self) -> int:
+        return self.groups.get(self.CATALOG, {}).get("count", 0)
+
+    def is_current(self, collection_id: str, count: int) -> bool:
+        """Whether the stored counters describe this collection at this size."""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'collection_id'").fetchone()
+        return row is not None and row[0] == collection_id and self.total == count
+
+    def bind(self, collection_id: str) -> None:
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('collection_id', ?)", (collection_id,)
+            )
+            self.conn.commit()
+
+    # Maintenance
+
+    @staticmethod
+    def _price(metadata: Dict) -> Optional[float]:
+        try:
+            price = float(metadata.get("price"))
+        except (TypeError, ValueError):
+            return None
+        return None if math.isnan(price) else price
+
+    def _fetch(self, ids: List[str]) -> Dict[str, Tuple]:
+        """Stored (source, category, brand, price, failed) of existing products."""
+        rows = {}
+        # Stay below SQLite's bound-parameter limit
+        for i in range(0, len(ids), 900):
+            batch = ids[i:i + 900]
+            placeholders = ",".join("?" * len(batch))
+            for row in self.conn.execute(
+                f"SELECT id, source, category, brand, price, failed FROM products WHERE id IN ({placeholders})",
+                batch
+            ):
+                rows[row[0]] = row[1:]
+        return rows
+
+    def _apply(self, product: Tuple, sign: int, now: Optional[float], touched: set) -> None:
+        """Add (sign 1) or subtract (sign -1) one product from its groups."""
+        source, category, brand, price, failed = product
+        for key in [self.CATALOG, ("source", source), ("category", category), ("brand", brand)]:
+            group = self.groups.setdefault(
+                key, {"count": 0, "priced": 0, "price_sum": 0.0, "failed": 0, "updated": None}
+            )
+            group["count"] += sign
+            group["failed"] += sign * failed
+            if price is not None:
+                group["priced"] += sign
+                group["price_sum"] += sign * price
+                cached = self._ranges.get(key)
+                if cached is None:
+                    pass
+                elif sign > 0:
+                    self._ranges[key] = (price if cached[0] is None else min(cached[0], price),
+                                         price if cached[1] is None else max(cached[1], price))
+                elif price <= cached[0] or price >= cached[1]:
+                    # Removing an extreme price needs a fresh lookup
+                    del self._ranges[key]
+            if now is not None:
+                group["updated"] = now
+            touched.add(key)
+
+    def _save_groups(self, touched: set) -> None:
+        for key in touched:
+            group = self.groups[key]
+            if group["count"] <= 0:
+                del self.groups[key]
+                self._ranges.pop(key, None)
+                self.conn.execute("DELETE FROM groups WHERE dimension = ? AND value = ?", key)
+            else:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO groups VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (*key, group["count"], group["priced"], group["price_sum"], group["failed"], group["updated"])
+                )
+
+    def on_upsert(self, ids: List[str], documents: List[str], metadatas: List[Dict]) -> None:
+        now = time.time()
+        with self._lock:
+            existing = self._fetch(ids)
+            touched = set()
+            rows = []
+            for product_id, metadata in zip(ids, metadatas):
+                if product_id in existing:
+                    self._apply(existing[product_id], -1, None, touched)
+                product = (str(metadata.get("source", "")), str(metadata.get("category", "")),
+                           str(metadata.get("brand", "")), self._price(metadata), 0)
+                self._apply(product, 1, now, touched)
+                rows.append((product_id, *product))
+            self.conn.executemany("INSERT OR REPLACE INTO products VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._save_groups(touched)
+            self.conn.commit()
+
+    def on_embedding_failures(self, ids: List[str]) -> None:
+        with self._lock:
+            touched = set()
+            for product_id, product in self._fetch(ids).items():
+                if product[4]:
+                    continue
+                source, category, brand = product[:3]
+                for key in [self.CATALOG, ("source", source), ("category", category), ("brand", brand)]:
+                    self.groups[key]["failed"] += 1
+                    touched.add(key)
+                self.conn.execute("UPDATE products SET failed = 1 WHERE id = ?", (product_id,))
+            self._save_groups(touched)
+            self.conn.commit()
+
+    def on_delete(self, ids: List[str]) -> None:
+        with self._lock:
+            existing = self._fetch(ids)
+            touched = set()
+            for product in existing.values():
+                self._apply(product, -1, None, touched)
+            self.conn.executemany("DELETE FROM products WHERE id = ?", [(product_id,) for product_id in existing])
+            self._save_groups(touched)
+            self.conn.commit()
+
+    def on_clear(self) -> None:
+        with self._lock:
+            self.conn.execute("DELETE FROM products")
+            self.conn.execute("DELETE FROM groups")
+            self.conn.commit()
+            self.groups.clear()
+            self._ranges.clear()
+
+    def on_changes(self, deleted_ids, records) -> None:
+        """The writing process already counted these changes, so just reread the counters."""
+        with self._lock:
+            self._load()
+
+    def on_refresh(self, records) -> None:
+        """The writing process keeps the stored counters current, so just reread them."""
+        with self._lock:
+            self._load()
+
+    # Queries
+
+    def _price_range(self, key: Tuple[str, str]) -> Tuple[Optional[float], Optional[float]]:
+        price_range = self._ranges.get(key)
+        if price_range is None:
+            dimension, value = key
+            if key == self.CATALOG:
+                row = self.conn.execute("SELECT MIN(price), MAX(price) FROM products").fetchone()
+            else:
+                row = self.conn.execute(
+                    f"SELECT MIN(price), MAX(price) FROM products WHERE {dimension} = ?", (value,)
+                ).fetchone()
+            price_range = self._ranges[key] = (row[0], row[1])
+        return price_range
+
+    def _summary(self, key: Tuple[str, str]) -> Dict:
+        group = self.groups[key]
+        price_min, price_max = self._price_range(key)
+        return {
+            "count": group["count"],
+            "embedding_failures": group["failed"],
+            "price": {
+                "count": group["priced"],
+                "mean": round(group["price_sum"] / group["priced"], 2) if group["priced"] else None,
+                "min": price_min,
+                "max": price_max
+            },
+            "last_ingest": group["updated"]
+        }
+
+    def get_groups(self, dimension: str, offset: int = 0, limit: int = Settings.STATS_PAGE_SIZE) -> Dict:
+        """One page of a dimension's groups, largest first."""
+        if dimension not in self.DIMENSIONS:
+            raise ValueError(f"Unknown stats dimension: {dimension}")
+        with self._lock:
+            keys = sorted((key for key in self.groups if key[0] == dimension),
+                          key=lambda key: (-self.groups[key]["count"], key[1]))
+            return {
+                "dimension": dimension,
+                "total": len(keys),
+                "offset": offset,
+                "limit": limit,
+                "groups": {key[1]: self._summary(key) for key in keys[offset:offset + limit]}
+            }
+
+    def get_stats(self, group_limit: int = Settings.STATS_PAGE_SIZE) -> Dict:
+        """Catalog totals plus the largest groups of each dimension."""
+        with self._lock:
+            if self.CATALOG not in self.groups:
+                return {"total_documents": 0, "embedding_failures": 0, "price": None, "last_ingest": None,
+                        **{f"{dimension}_count": 0 for dimension in self.DIMENSIONS}}
+            summary = self._summary(self.CATALOG)
+        stats = {
+            "total_documents": summary["count"],
+            "embedding_failures": summary["embedding_failures"],
+            "price": summary["price"],
+            "last_ingest": summary["last_ingest"]
+        }
+        for dimension in self.DIMENSIONS:
+            page = self.get_groups(dimension, limit=group_limit)
+            stats[f"{dimension}_count"] = page["total"]
+            stats[dimension] = page["groups"]
+        return stats
@@ -0,0 +1,291 @@
+from typing import Dict, Iterable, List, Optional
+import logging
+import threading
+import numpy as np
+from database.vector_store import CatalogListener
+
+class ColumnarIndex(CatalogListener):
+    """In-memory NumPy columns of product metadata for exact sort, filter and aggregate queries.
+
+    Each product occupies a slot across all column arrays; deleted slots
+    are reused. Category and brand are dictionary-encoded as integer codes.
+    Kept in sync with the vector store through the CatalogListener hooks.
+    """
+
+    NUMERIC_COLUMNS = {
+        'price': np.float64,
+        'raw_price': np.float64,
+        'discount': np.float64,
+        'likes_count': np.int64,
+        'is_new': np.bool_,
+    }
+    CATEGORICAL_COLUMNS = ('category', 'subcategory', 'brand')
+
+    def __init__(self, initial_capacity: int = 1024):
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._initial_capacity = initial_capacity
+        self._reset()
+
+    def _reset(self) -> None:
+        capacity = self._initial_capacity
+        self.columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in self.NUMERIC_COLUMNS.items()}
+        self.codes = {name: np.full(capacity, -1, dtype=np.int32) for name in self.CATEGORICAL_COLUMNS}
+        self.vocab: Dict[str, Dict[str, int]] = {name: {} for name in self.CATEGORICAL_COLUMNS}
+        self.values: Dict[str, List[str]] = {name: [] for name in self.CATEGORICAL_COLUMNS}
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.slot_ids: List[Optional[str]] = [None] * capacity
+        self.slots: Dict[str, int] = {}
+        self.free: List[int] = []
+        self.size = 0
+
+    # Index maintenance
+
+    def _grow(self, needed: int) -> None:
+        capacity = len(self.alive)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name, column in self.columns.items():
+            self.columns[name] = np.resize(column, capacity)
+        for name, codes in self.codes.items():
+            grown = np.full(capacity, -1, dtype=np.int32)
+            grown[:len(codes)] = codes
+            self.codes[name] = grown
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:len(self.alive)] = self.alive
+        self.alive = alive
+        self.slot_ids.extend([None] * (capacity - len(self.slot_ids)))
+
+    def _code(self, column: str, value) -> int:
+        vocab = self.vocab[column]
+        value = str(value)
+        code = vocab.get(value)
+        if code is None:
+            code = vocab[value] = len(self.values[column])
+            self.values[column].append(value)
+        return code
+
+    @staticmethod
+    def _number(value) -> float:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return float('nan')
+
+    def on_upsert(self, ids: List[str], documents: List[str], metadatas: List[Dict]) -> None:
+        with self._lock:
+            slots = []
+            for product_id in ids:
+                slot = self.slots.get(product_id)
+                if slot is None:
+                    if self.free:
+                        slot = self.free.pop()
+                    else:
+                        slot = self.size
+                        self.size += 1
+                        self._grow(self.size)
+                    self.slots[product_id] = slot
+                    self.slot_ids[slot] = product_id
+                slots.append(slot)
+
+            slots = np.asarray(slots, dtype=np.int64)
+            self.columns['price'][slots] = [self._number(m.get('price')) for m in metadatas]
+            self.columns['raw_price'][slots] = [self._number(m.get('raw_price')) for m in metadatas]
+            self.columns['discount'][slots] = [self._number(m.get('discount')) for m in metadatas]
+            self.columns['likes_count'][slots] = [int(m.get('likes_count') or 0) for m in metadatas]
+            self.columns['is_new'][slots] = [bool(m.get('is_new')) for m in metadatas]
+            for column in self.CATEGORICAL_COLUMNS:
+                self.codes[column][slots] = [self._code(column, m.get(column, '')) for m in metadatas]
+            self.alive[slots] = True
+
+    def on_delete(self, ids: List[str]) -> None:
+        with self._lock:
+            for product_id in ids:
+                slot = self.slots.pop(product_id, None)
+                if slot is not None:
+                    self.alive[slot] = False
+                    self.slot_ids[slot] = None
+                    self.free.append(slot)
+
+    def on_clear(self) -> None:
+        with self._lock:
+            self._reset()
+
+    def on_refresh(self, records) -> None:
+        """Fill new columns aside, then swap them in for queries."""
+        fresh = type(self)(self._initial_capacity)
+        for ids, documents, metadatas in records:
+            fresh.on_upsert(ids, documents, metadatas)
+        with self._lock:
+            self.columns = fresh.columns
+            self.codes = fresh.codes
+            self.vocab = fresh.vocab
+            self.values = fresh.values
+            self.alive = fresh.alive
+            self.slot_ids = fresh.slot_ids
+            self.slots = fresh.slots
+            self.free = fresh.free
+            self.size = fresh.size
+
+    # Queries
+
+    def _condition_mask(self, column: str, condition) -> Optional[np.ndarray]:
+        if not isinstance(condition, dict):
+            condition = {'$eq': condition}
+
+        if column in self.CATEGORICAL_COLUMNS:
+            codes = self.codes[column][:self.size]
+            vocab = self.vocab[column]
+            mask = np.ones(self.size, dtype=bool)
+            for operator, operand in condition.items():
+                if operator in ('$eq', '$ne'):
+                    matched = codes == vocab.get(str(operand), -2)
+                elif operator in ('$in', '$nin'):
+                    wanted = [vocab[str(value)] for value in operand if str(value) in vocab]
+                    matched = np.isin(codes, wanted)
+                else:
+                    return None
+                mask &= ~matched if operator in ('$ne', '$nin') else matched
+            return mask
+
+        if column not in self.columns:
+            return None
+        values = self.columns[column][:self.size]
+        mask = np.ones(self.size, dtype=bool)
+        for operator, operand in condition.items():
+            if operator == '$eq':
+                mask &= values == operand
+            elif operator == '$ne':
+                mask &= values != operand
+            elif operator == '$gt':
+                mask &= values > operand
+            elif operator == '$gte':
+                mask &= values >= operand
+            elif operator == '$lt':
+                mask &= values < operand
+            elif operator == '$lte':
+                mask &= values <= operand
+            elif operator == '$in':
+                mask &= np.isin(values, list(operand))
+            elif operator == '$nin':
+                mask &= ~np.isin(values, list(operand))
+            else:
+                return None
+        return mask
+
+    def _where_mask(self, where: Optional[Dict]) -> Optional[np.ndarray]:
+        """Evaluate a Chroma where filter over every slot; None if it uses unindexed fields."""
+        mask = self.alive[:self.size].copy()
+        if not where:
+            return mask
+        for key, condition in where.items():
+            if key in ('$and', '$or'):
+                masks = [self._where_mask(clause) for clause in condition]
+                if any(clause_mask is None for clause_mask in masks):
+                    return None
+                combined = np.logical_and.reduce(masks) if key == '$and' else np.logical_or.reduce(masks)
+                mask &= combined
+            else:
+                condition_mask = self._condition_mask(key, condition)
+                if condition_mask is None:
+                    return None
+                mask &= condition_mask
+        return mask
+
+    def _mask(self, where: Optional[Dict], ids: Optional[Iterable[str]]) -> np.ndarray:
+        """Slots matching the filter and, if given, in the id set."""
+        mask = self._where_mask(where)
+        if mask is None:
+            raise ValueError(f"Filter uses fields that are not indexed: {where}")
+        if ids is not None:
+            allowed = np.zeros(self.size, dtype=bool)
+            allowed[[self.slots[product_id] for product_id in ids if product_id in self.slots]] = True
+            mask &= allowed
+        return mask
+
+    def supports(self, where: Optional[Dict]) -> bool:
+        """Whether every field in the filter is indexed."""
+        with self._lock:
+            return self._where_mask(where) is not None
+
+    def count(self, where: Optional[Dict] = None, ids: Optional[Iterable[str]] = None) -> int:
+        with self._lock:
+            return int(self._mask(where, ids).sum())
+
+    def top_k(self, column: str, k: int, descending: bool = False,
+              where: Optional[Dict] = None, ids: Optional[Iterable[str]] = None) -> List[str]:
+        """Exact top-k product ids by a numeric column, optionally within a filter and id set.
+
+        Ties are broken by likes_count, highest first.
+        """
+        with self._lock:
+            mask = self._mask(where, ids)
+            values = self.columns[column][:self.size].astype(np.float64)
+            mask &= ~np.isnan(values)
+            slots = np.flatnonzero(mask)
+            if not len(slots):
+                return []
+            keys = -values[slots] if descending else values[slots]
+            if len(slots) > k:
+                # Partition first so only the k best are fully sorted
+                best = np.argpartition(keys, k - 1)[:k]
+                slots, keys = slots[best], keys[best]
+            likes = self.columns['likes_count'][slots]
+            order = np.lexsort((-likes, keys))
+            return [self.slot_ids[slot] for slot in slots[order]]
+
+    @staticmethod
+    def _summary(values: np.ndarray) -> Dict:
+        if not len(values):
+            return {"count": 0}
+        return {
+            "count": int(len(values)),
+            "mean": round(float(values.mean()), 2),
+            "median": round(float(np.median(values)), 2),
+            "min": round(float(values.min()), 2),
+            "max": round(float(values.max()), 2),
+            "sum": round(float(values.sum()), 2)
+        }
+
+    def aggregate(self, column: str, group_by: Optional[str] = None,
+                  where: Optional[Dict] = None, ids: Optional[Iterable[str]] = None) -> Dict:
+        """Count, mean, median, min, max and sum of a column, overall or per category/brand."""
+        with self._lock:
+            mask = self._mask(where, ids)
+            values = self.columns[column][:self.size].astype(np.float64)
+            mask &= ~np.isnan(values)
+
+            if group_by is None:
+                return self._summary(values[mask])
+
+            codes = self.codes[group_by][:self.size][mask]
+            values = values[mask]
+            names = self.values[group_by]
+            if not len(codes):
+                return {}
+            counts = np.bincount(codes, minlength=len(names))
+            sums = np.bincount(codes, weights=values, minlength=len(names))
+            minimums = np.full(len(names), np.inf)
+            maximums = np.full(len(names), -np.inf)
+            np.minimum.at(minimums, codes, values)
+            np.maximum.at(maximums, codes, values)
+            return {
+                names[code]: {
+                    "count": int(counts[code]),
+                    "mean": round(float(sums[code] / counts[code]), 2),
+                    "min": round(float(minimums[code]), 2),
+                    "max": round(float(maximums[code]), 2),
+                    "sum": round(float(sums[code]), 2)
+                }
+                for code in np.flatnonzero(counts)
+            }
+
+    def get_stats(self) -> Dict:
+        return {
+            "products": len(self.slots),
+            "capacity": len(self.alive),
+            "categories": len(self.values['category']),
+            "brands": len(self.values['brand'])
+        }
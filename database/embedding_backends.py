@@ -0,0 +1,123 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+import logging
+import re
+import zlib
+import numpy as np
+from config.settings import Settings
+
+class EmbeddingBackend(ABC):
+    """Interface for turning a list of texts into fixed-size vectors."""
+
+    name = "base"
+
+    def __init__(self, dimension: int = Settings.EMBEDDING_DIMENSION):
+        self.dimension = dimension
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def model_id(self) -> str:
+        """Identifier of the backend and its configuration."""
+        return f"{self.name}-{self.dimension}"
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embed a list of texts into a (len(texts), dimension) float32 array."""
+
+class HashingEmbeddingBackend(EmbeddingBackend):
+    """In-process CPU embeddings built from hashed word and character n-gram features."""
+
+    name = "hashing-v1"
+    TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+    MAX_FEATURE_CACHE = 500_000
+
+    def __init__(self, dimension: int = Settings.EMBEDDING_DIMENSION, char_ngram: int = 3):
+        super().__init__(dimension)
+        self.char_ngram = char_ngram
+        self._feature_cache: Dict[str, Tuple[int, float]] = {}
+
+    def _hash_feature(self, feature: str) -> Tuple[int, float]:
+        """Map a feature to a (bucket, sign) pair with a process-independent hash."""
+        cached = self._feature_cache.get(feature)
+        if cached is None:
+            digest = zlib.crc32(feature.encode("utf-8"))
+            cached = (digest % self.dimension, 1.0 if (digest >> 31) & 1 else -1.0)
+            if len(self._feature_cache) >= self.MAX_FEATURE_CACHE:
+                self._feature_cache.clear()
+            self._feature_cache[feature] = cached
+        return cached
+
+    def _features(self, text: str) -> List[str]:
+        """Extract word unigrams, word bigrams and character n-grams."""
+        words = self.TOKEN_PATTERN.findall(str(text).lower())
+        features = [f"w:{word}" for word in words]
+        features.extend(f"b:{first} {second}" for first, second in zip(words, words[1:]))
+        n = self.char_ngram
+        for word in words:
+            padded = f"<{word}>"
+            features.extend(f"c:{padded[i:i + n]}" for i in range(len(padded) - n + 1))
+        return features
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embed all texts with a single sparse-to-dense scatter and normalization."""
+        rows: List[int] = []
+        buckets: List[int] = []
+        signs: List[float] = []
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                bucket, sign = self._hash_feature(feature)
+                rows.append(row)
+                buckets.append(bucket)
+                signs.append(sign)
+
+        flat_index = np.asarray(rows, dtype=np.int64) * self.dimension + np.asarray(buckets, dtype=np.int64)
+        counts = np.bincount(
+            flat_index,
+            weights=np.asarray(signs, dtype=np.float64),
+            minlength=len(texts) * self.dimension
+        ).reshape(len(texts), self.dimension)
+
+        # Sublinear term frequency keeps long descriptions from dominating
+        vectors = np.sign(counts) * np.log1p(np.abs(counts))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (vectors / norms).astype(np.float32)
+
+class GroqEmbeddingBackend(EmbeddingBackend):
+    """Legacy backend that asks the chat model to produce vectors, one text at a time."""
+
+    name = "groq-chat"
+
+    def __init__(self, groq_client, dimension: int = Settings.EMBEDDING_DIMENSION):
+        super().__init__(dimension)
+        self.groq_client = groq_client
+
+    @property
+    def model_id(self) -> str:
+        return f"{self.name}-{self.groq_client.model}-{self.dimension}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for i, text in enumerate(texts):
+            embedding = self.groq_client.generate_embedding(text)
+            if len(embedding) == self.dimension:
+                vectors[i] = embedding
+            else:
+                self.logger.warning(f"Discarding embedding of size {len(embedding)}, expected {self.dimension}")
+        return vectors
+
+EMBEDDING_BACKENDS = {
+    "hashing": HashingEmbeddingBackend,
+    "groq": GroqEmbeddingBackend,
+}
+
+def create_embedding_backend(name: Optional[str] = None, groq_client=None) -> EmbeddingBackend:
+    """Create the embedding backend selected by name or by Settings."""
+    name = (name or Settings.EMBEDDING_BACKEND).lower()
+    if name not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {name}")
+    if name == "groq":
+        if groq_client is None:
+            raise ValueError("The groq embedding backend requires a GroqClient")
+        return GroqEmbeddingBackend(groq_client)
+    return EMBEDDING_BACKENDS[name]()
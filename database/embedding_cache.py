@@ -0,0 +1,149 @@
+from typing import Dict, Iterable, List, Optional
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+import numpy as np
+from config.settings import Settings
+
+class EmbeddingCache:
+    """Disk-backed, content-addressed embedding cache with LRU eviction."""
+
+    # SQLite limits the number of bound parameters per statement
+    QUERY_BATCH_SIZE = 500
+
+    def __init__(self,
+                 path: Optional[Path] = None,
+                 max_entries: int = Settings.EMBEDDING_CACHE_MAX_ENTRIES,
+                 touch_interval: float = Settings.EMBEDDING_CACHE_TOUCH_INTERVAL):
+        self.logger = logging.getLogger(__name__)
+        self.path = Path(path or Settings.EMBEDDING_CACHE_PATH)
+        self.max_entries = max_entries
+        self.touch_interval = touch_interval
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_access REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings(last_access)")
+        self.conn.commit()
+        self._size = self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Normalize text so trivially different inputs share a cache entry."""
+        return " ".join(str(text).split())
+
+    @staticmethod
+    def make_key(text: str, model_id: str) -> str:
+        """Hash the normalized text together with the embedding model id."""
+        payload = f"{model_id}\x00{EmbeddingCache.normalize_text(text)}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _batches(self, items: List) -> Iterable[List]:
+        for i in range(0, len(items), self.QUERY_BATCH_SIZE):
+            yield items[i:i + self.QUERY_BATCH_SIZE]
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Look up several keys at once and refresh the recency of entries not touched recently.
+
+        Refreshing every hit would make each lookup, query embeddings
+        included, take the write lock of a file shared by several workers;
+        eviction order only needs recency to within touch_interval.
+        """
+        unique_keys = list(dict.fromkeys(keys))
+        found: Dict[str, np.ndarray] = {}
+        now = time.time()
+        stale = []
+
+        with self._lock:
+            for batch in self._batches(unique_keys):
+                placeholders = ",".join("?" * len(batch))
+                rows = self.conn.execute(
+                    f"SELECT key, vector, last_access FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                for key, blob, last_access in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+                    if now - last_access >= self.touch_interval:
+                        stale.append(key)
+
+            if stale:
+                self.conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                    [(now, key) for key in stale]
+                )
+                self.conn.commit()
+
+            self.hits += len(found)
+            self.misses += len(unique_keys) - len(found)
+
+        return found
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Look up a single key."""
+        return self.get_many([key]).get(key)
+
+    def put_many(self, items: Dict[str, np.ndarray]) -> None:
+        """Store several embeddings and evict the least recently used overflow."""
+        if not items:
+            return
+
+        now = time.time()
+        rows = [
+            (key, np.asarray(vector, dtype=np.float32).tobytes(), now)
+            for key, vector in items.items()
+        ]
+        with self._lock:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (key, vector, last_access) VALUES (?, ?, ?)", rows
+            )
+            self._size += self.conn.total_changes - before
+            if self._size > self.max_entries:
+                self._evict()
+            self.conn.commit()
+
+    def put(self, key: str, vector: np.ndarray) -> None:
+        """Store a single embedding."""
+        self.put_many({key: vector})
+
+    def _evict(self) -> None:
+        """Drop the least recently used entries beyond max_entries."""
+        # Other processes may share the file, so recount before deleting
+        self._size = self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        overflow = self._size - self.max_entries
+        if overflow > 0:
+            self.conn.execute(
+                "DELETE FROM embeddings WHERE key IN "
+                "(SELECT key FROM embeddings ORDER BY last_access ASC LIMIT ?)",
+                (overflow,)
+            )
+            self._size -= overflow
+            self.logger.info(f"Evicted {overflow} embeddings from cache")
+
+    def clear(self) -> None:
+        """Remove every cached embedding."""
+        with self._lock:
+            self.conn.execute("DELETE FROM embeddings")
+            self.conn.commit()
+            self._size = 0
+
+    def get_stats(self) -> Dict:
+        """Return hit/miss counters and occupancy."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "entries": self._size,
+            "max_entries": self.max_entries
+        }
@@ -1,38 +1,85 @@
-from typing import List
+from typing import TYPE_CHECKING, Dict, List, Optional
 import logging
+import numpy as np
 from tqdm import tqdm
 from config.settings import Settings
-from api.groq_client import GroqClient
+from api.metrics import EMBEDDING_FAILURES
+from database.embedding_backends import EmbeddingBackend, create_embedding_backend
+from database.embedding_cache import EmbeddingCache
+
+if TYPE_CHECKING:
+    # Only the groq backend needs the client, so importing the SDK is left to callers
+    from api.groq_client import GroqClient
 
 class EmbeddingGenerator:
-    def __init__(self, groq_client: GroqClient):
+    def __init__(self,
+                 groq_client: Optional["GroqClient"] = None,
+                 backend: Optional[EmbeddingBackend] = None,
+                 cache: Optional[EmbeddingCache] = None,
+                 use_cache: bool = True):
         self.logger = logging.getLogger(__name__)
         self.groq_client = groq_client
+        self.backend = backend or create_embedding_backend(groq_client=groq_client)
+        self.dimension = self.backend.dimension
+        # Without a cache the shared one is used if enabled; use_cache=False disables caching
+        if cache is None and use_cache and Settings.EMBEDDING_CACHE_ENABLED:
+            cache = EmbeddingCache()
+        self.cache = cache if use_cache else None
+        self.logger.info(f"Using embedding backend {self.backend.model_id}")
+
+    def _embed_with_cache(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts, serving repeated content from the cache."""
+        if self.cache is None:
+            return self.backend.embed(texts).tolist()
+
+        model_id = self.backend.model_id
+        keys = [EmbeddingCache.make_key(text, model_id) for text in texts]
+        vectors: Dict[str, np.ndarray] = self.cache.get_many(keys)
+
+        # Embed each distinct missing text once
+        missing = {key: EmbeddingCache.normalize_text(text)
+                   for key, text in zip(keys, texts) if key not in vectors}
+        if missing:
+            computed = self.backend.embed(list(missing.values()))
+            fresh = dict(zip(missing.keys(), computed))
+            vectors.update(fresh)
+            # Zero vectors signal a failed embedding and must not be cached
+            self.cache.put_many({key: vector for key, vector in fresh.items() if np.any(vector)})
+
+        return [vectors[key].tolist() for key in keys]
 
     def generate(self, text: str) -> List[float]:
-        """Generate embedding for a single text using Groq API."""
+        """Generate embedding for a single text."""
         try:
-            embedding = self.groq_client.generate_embedding(text)
-            return embedding
-            
+            return self._embed_with_cache([text])[0]
+
         except Exception as e:
             self.logger.error(f"Error generating embedding: {str(e)}")
+            EMBEDDING_FAILURES.inc()
             # Return zero vector as fallback
-            return [0.0] * 384
+            return [0.0] * self.dimension
 
-    def batch_generate(self, texts: List[str], batch_size: int = Settings.BATCH_SIZE) -> List[List[float]]:
+    def batch_generate(self, texts: List[str], batch_size: int = Settings.EMBEDDING_BATCH_SIZE,
+                       show_progress: bool = True) -> List[List[float]]:
         """Generate embeddings for a batch of texts."""
         embeddings = []
-        
+
         try:
-            for i in tqdm(range(0, len(texts), batch_size), desc="Generating embeddings"):
+            for i in tqdm(range(0, len(texts), batch_size), desc="Generating embeddings",
+                          disable=not show_progress):
                 batch = texts[i:i + batch_size]
-                batch_embeddings = [self.generate(text) for text in batch]
-                embeddings.extend(batch_embeddings)
-            
+                embeddings.extend(self._embed_with_cache(batch))
+
             return embeddings
-            
+
         except Exception as e:
             self.logger.error(f"Error generating batch embeddings: {str(e)}")
+            EMBEDDING_FAILURES.inc(len(texts))
             # Return zero vectors as fallback
-            return [[0.0] * 384 for _ in range(len(texts))]
\ No newline at end of file
+            return [[0.0] * self.dimension for _ in range(len(texts))]
+
+    def get_cache_stats(self) -> Dict:
+        """Return embedding cache statistics."""
+        if self.cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.cache.get_stats()}
@@ -0,0 +1,216 @@
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from config.settings import Settings
+
+class IngestionJobStore:
+    """SQLite record of ingestion runs with per-chunk checkpoints.
+
+    A run covers one file of one source. Each chunk is checkpointed as
+    parsed, embedded and committed; a later run over the same unchanged
+    file with the same chunking resumes the unfinished run and skips the
+    chunks already committed to the vector store.
+    """
+
+    STAGES = ("parsed", "embedded", "committed")
+    UNFINISHED = ("running", "failed")
+
+    def __init__(self, path: Optional[Path] = None):
+        self.logger = logging.getLogger(__name__)
+        self.path = Path(path or Settings.INGEST_JOB_STORE_PATH)
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            "run_id TEXT PRIMARY KEY, source TEXT NOT NULL, file_path TEXT NOT NULL, "
+            "fingerprint TEXT NOT NULL, chunk_size INTEGER NOT NULL, incremental INTEGER NOT NULL, "
+            "status TEXT NOT NULL, pid INTEGER, created REAL NOT NULL, updated REAL NOT NULL, "
+            "result TEXT, error TEXT)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints ("
+            "run_id TEXT NOT NULL, chunk_index INTEGER NOT NULL, "
+            "rows_parsed INTEGER NOT NULL DEFAULT 0, rows_embedded INTEGER NOT NULL DEFAULT 0, "
+            "rows_committed INTEGER NOT NULL DEFAULT 0, counts TEXT, updated REAL NOT NULL, "
+            "PRIMARY KEY (run_id, chunk_index))"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_source ON runs(source, status)")
+        self.conn.commit()
+
+    @staticmethod
+    def file_fingerprint(file_path: Path, head_bytes: int = 1 << 20) -> str:
+        """Identify a file version by size, modification time and a hash of its head."""
+        stat = Path(file_path).stat()
+        digest = hashlib.blake2b(digest_size=16)
+        with open(file_path, "rb") as handle:
+            digest.update(handle.read(head_bytes))
+        return f"{stat.st_size}:{stat.st_mtime_ns}:{digest.hexdigest()}"
+
+    @staticmethod
+    def _owner_alive(pid: Optional[int]) -> bool:
+        """Whether another live process owns a run."""
+        if not pid or pid == os.getpid():
+            return False
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    def begin(self, source: str, file_path: Path, chunk_size: int,
+              incremental: bool) -> Tuple[str, Dict[int, Dict]]:
+        """Start a run, or resume an unfinished one over the same file version.
+
+        Returns the run id and the counts of its committed chunks by index.
+        """
+        fingerprint = self.file_fingerprint(file_path)
+        now = time.time()
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT run_id, fingerprint, chunk_size, incremental, status, pid FROM runs "
+                "WHERE source = ? AND status IN (?, ?) ORDER BY updated DESC",
+                (source, *self.UNFINISHED)
+            ).fetchall()
+
+            resumable = None
+            for row in rows:
+                if row["status"] == "running" and self._owner_alive(row["pid"]):
+                    continue
+                if (resumable is None and row["fingerprint"] == fingerprint
+                        and row["chunk_size"] == chunk_size and bool(row["incremental"]) == incremental):
+                    resumable = row["run_id"]
+                else:
+                    # An older version of the file can no longer be resumed
+                    self.conn.execute(
+                        "UPDATE runs SET status = 'superseded', updated = ? WHERE run_id = ?",
+                        (now, row["run_id"])
+                    )
+
+            if resumable is not None:
+                self.conn.execute(
+                    "UPDATE runs SET status = 'running', pid = ?, file_path = ?, error = NULL, updated = ? "
+                    "WHERE run_id = ?",
+                    (os.getpid(), str(file_path), now, resumable)
+                )
+                committed = {
+                    row["chunk_index"]: json.loads(row["counts"])
+                    for row in self.conn.execute(
+                        "SELECT chunk_index, counts FROM checkpoints "
+                        "WHERE run_id = ? AND rows_committed > 0", (resumable,)
+                    )
+                }
+                self.conn.commit()
+                self.logger.info(f"Resuming ingestion run {resumable} of {source} "
+                                 f"with {len(committed)} committed chunks")
+                return resumable, committed
+
+            run_id = uuid.uuid4().hex
+            self.conn.execute(
+                "INSERT INTO runs (run_id, source, file_path, fingerprint, chunk_size, incremental, "
+                "status, pid, created, updated) VALUES (?, ?, ?, ?, ?, ?, 'running', ?, ?, ?)",
+                (run_id, source, str(file_path), fingerprint, chunk_size, int(incremental),
+                 os.getpid(), now, now)
+            )
+            self.conn.commit()
+            return run_id, {}
+
+    def checkpoint(self, run_id: str, chunk_index: int, stage: str, rows: int,
+                   counts: Optional[Dict] = None) -> None:
+        """Record that a chunk reached a stage; committed checkpoints carry the chunk's counts."""
+        if stage not in self.STAGES:
+            raise ValueError(f"Unknown checkpoint stage: {stage}")
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                f"INSERT INTO checkpoints (run_id, chunk_index, rows_{stage}, counts, updated) "
+                f"VALUES (?, ?, ?, ?, ?) ON CONFLICT(run_id, chunk_index) DO UPDATE SET "
+                f"rows_{stage} = excluded.rows_{stage}, counts = COALESCE(excluded.counts, counts), "
+                f"updated = excluded.updated",
+                (run_id, chunk_index, rows, json.dumps(counts) if counts is not None else None, now)
+            )
+            self.conn.execute("UPDATE runs SET updated = ? WHERE run_id = ?", (now, run_id))
+            self.conn.commit()
+
+    def finish(self, run_id: str, result: Dict) -> None:
+        with self._lock:
+            self.conn.execute(
+                "UPDATE runs SET status = 'succeeded', result = ?, updated = ? WHERE run_id = ?",
+                (json.dumps(result, default=str), time.time(), run_id)
+            )
+            self.conn.commit()
+
+    def fail(self, run_id: str, error: str, status: str = "failed") -> None:
+        with self._lock:
+            self.conn.execute(
+                "UPDATE runs SET status = ?, error = ?, updated = ? WHERE run_id = ?",
+                (status, error, time.time(), run_id)
+            )
+            self.conn.commit()
+
+    def _run_dict(self, row: sqlite3.Row) -> Dict:
+        run = dict(row)
+        run["incremental"] = bool(run["incremental"])
+        run["result"] = json.loads(run["result"]) if run["result"] else None
+        totals = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(rows_parsed), 0), COALESCE(SUM(rows_embedded), 0), "
+            "COALESCE(SUM(CASE WHEN rows_committed > 0 THEN 1 ELSE 0 END), 0) "
+            "FROM checkpoints WHERE run_id = ?", (run["run_id"],)
+        ).fetchone()
+        run["checkpoints"] = {
+            "chunks": totals[0],
+            "rows_parsed": totals[1],
+            "rows_embedded": totals[2],
+            "chunks_committed": totals[3]
+        }
+        return run
+
+    def get_run(self, run_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self.conn.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+            return self._run_dict(row) if row is not None else None
+
+    def unfinished_runs(self) -> List[Dict]:
+        """Runs that crashed or failed and are not owned by a live process."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT * FROM runs WHERE status IN (?, ?) ORDER BY created", self.UNFINISHED
+            ).fetchall()
+            return [self._run_dict(row) for row in rows
+                    if not (row["status"] == "running" and self._owner_alive(row["pid"]))]
+
+    def has_unfinished_run(self, file_path: Path) -> bool:
+        """Whether a crashed or failed run still needs this file to resume."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT 1 FROM runs WHERE file_path = ? AND status IN (?, ?) LIMIT 1",
+                (str(file_path), *self.UNFINISHED)
+            ).fetchone()
+            return row is not None
+
+    def latest_run(self, file_path: Path) -> Optional[Dict]:
+        """The most recently started run over this file, if any."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT * FROM runs WHERE file_path = ? ORDER BY created DESC LIMIT 1", (str(file_path),)
+            ).fetchone()
+            return self._run_dict(row) if row is not None else None
+
+    def list_runs(self, limit: int = 50) -> List[Dict]:
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT * FROM runs ORDER BY created DESC LIMIT ?", (limit,)
+            ).fetchall()
+            return [self._run_dict(row) for row in rows]
@@ -0,0 +1,181 @@
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+import heapq
+import logging
+import math
+import re
+import threading
+from config.settings import Settings
+from database.vector_store import CatalogListener, matches_where
+
+class LexicalIndex(CatalogListener):
+    """In-memory BM25 inverted index over product names, subcategories, brands and models.
+
+    Kept in sync with the vector store through the CatalogListener hooks.
+    Besides ranked BM25 search it keeps exact lookups of whole model and
+    name strings, so queries naming a specific product can be answered
+    without embedding the query.
+    """
+
+    FIELDS = ('name', 'subcategory', 'brand', 'model')
+    EXACT_FIELDS = ('model', 'name')
+    TOKEN = re.compile(r"[^\W_]+")
+
+    def __init__(self, k1: float = Settings.BM25_K1, b: float = Settings.BM25_B):
+        self.k1 = k1
+        self.b = b
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+        self.postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self.doc_lengths: Dict[str, int] = {}
+        self.total_length = 0
+        self.records: Dict[str, Tuple[str, Dict]] = {}
+        self.exact: Dict[str, Set[str]] = defaultdict(set)
+        # Per-document BM25 length normalization, rebuilt lazily after writes
+        self._norms: Optional[Dict[str, float]] = None
+
+    @classmethod
+    def tokenize(cls, text: str) -> List[str]:
+        return cls.TOKEN.findall(str(text).lower())
+
+    @classmethod
+    def normalize(cls, text: str) -> str:
+        """Collapse a string to its tokens so 'ABC-123' and 'abc 123' match."""
+        return " ".join(cls.tokenize(text))
+
+    @staticmethod
+    def _is_value(value) -> bool:
+        return value is not None and str(value).strip().lower() not in ("", "nan", "none")
+
+    # Index maintenance
+
+    def on_upsert(self, ids: List[str], documents: List[str], metadatas: List[Dict]) -> None:
+        with self._lock:
+            for product_id, document, metadata in zip(ids, documents, metadatas):
+                self._remove(product_id)
+                terms = Counter()
+                for field in self.FIELDS:
+                    if self._is_value(metadata.get(field)):
+                        terms.update(self.tokenize(metadata[field]))
+                for term, frequency in terms.items():
+                    self.postings[term][product_id] = frequency
+                length = sum(terms.values())
+                self.doc_lengths[product_id] = length
+                self.total_length += length
+                self.records[product_id] = (document, metadata)
+                for key in self._exact_keys(metadata):
+                    self.exact[key].add(product_id)
+            self._norms = None
+
+    def on_delete(self, ids: List[str]) -> None:
+        with self._lock:
+            for product_id in ids:
+                self._remove(product_id)
+            self._norms = None
+
+    def on_clear(self) -> None:
+        with self._lock:
+            self.postings.clear()
+            self.doc_lengths.clear()
+            self.total_length = 0
+            self.records.clear()
+            self.exact.clear()
+            self._norms = None
+
+    def on_refresh(self, records) -> None:
+        """Index every record aside, then swap the new index in for searches."""
+        fresh = type(self)(self.k1, self.b)
+        for ids, documents, metadatas in records:
+            fresh.on_upsert(ids, documents, metadatas)
+        with self._lock:
+            self.postings = fresh.postings
+            self.doc_lengths = fresh.doc_lengths
+            self.total_length = fresh.total_length
+            self.records = fresh.records
+            self.exact = fresh.exact
+            self._norms = None
+
+    def _exact_keys(self, metadata: Dict) -> Set[str]:
+        keys = set()
+        for field in self.EXACT_FIELDS:
+            if self._is_value(metadata.get(field)):
+                key = self.normalize(metadata[field])
+                if key:
+                    keys.add(key)
+        return keys
+
+    def _remove(self, product_id: str) -> None:
+        record = self.records.pop(product_id, None)
+        if record is None:
+            return
+        metadata = record[1]
+        for field in self.FIELDS:
+            if self._is_value(metadata.get(field)):
+                for term in set(self.tokenize(metadata[field])):
+                    postings = self.postings.get(term)
+                    if postings is not None:
+                        postings.pop(product_id, None)
+                        if not postings:
+                            del self.postings[term]
+        for key in self._exact_keys(metadata):
+            matches = self.exact.get(key)
+            if matches is not None:
+                matches.discard(product_id)
+                if not matches:
+                    del self.exact[key]
+        self.total_length -= self.doc_lengths.pop(product_id, 0)
+
+    # Search
+
+    def exact_matches(self, query: str, where: Optional[Dict] = None) -> List[str]:
+        """Ids whose whole model or name equals the query, most liked first."""
+        key = self.normalize(query)
+        with self._lock:
+            ids = [product_id for product_id in self.exact.get(key, ())
+                   if matches_where(self.records[product_id][1], where)]
+            return sorted(ids, key=lambda product_id: -int(self.records[product_id][1].get('likes_count') or 0))
+
+    def search(self, query: str, n_results: int = 5, where: Optional[Dict] = None) -> List[Tuple[str, float]]:
+        """Rank products by BM25 score, returning (id, score) pairs."""
+        terms = set(self.tokenize(query))
+        with self._lock:
+            count = len(self.doc_lengths)
+            if not count or not terms:
+                return []
+            if self._norms is None:
+                average_length = self.total_length / count or 1.0
+                self._norms = {
+                    product_id: self.k1 * (1 - self.b + self.b * length / average_length)
+                    for product_id, length in self.doc_lengths.items()
+                }
+            norms = self._norms
+
+            scores: Dict[str, float] = defaultdict(float)
+            for term in terms:
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                weight = (self.k1 + 1) * math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for product_id, frequency in postings.items():
+                    scores[product_id] += weight * frequency / (frequency + norms[product_id])
+
+            if where:
+                scores = {product_id: score for product_id, score in scores.items()
+                          if matches_where(self.records[product_id][1], where)}
+            return heapq.nlargest(n_results, scores.items(), key=lambda item: item[1])
+
+    def get_record(self, product_id: str) -> Optional[Dict]:
+        """Return a result dict shaped like VectorStore.query_similar results."""
+        with self._lock:
+            record = self.records.get(product_id)
+        if record is None:
+            return None
+        return {'id': product_id, 'document': record[0], 'metadata': record[1], 'distance': None}
+
+    def get_stats(self) -> Dict:
+        return {
+            "documents": len(self.doc_lengths),
+            "terms": len(self.postings),
+            "exact_keys": len(self.exact)
+        }
@@ -1,35 +1,418 @@
 import chromadb
+from chromadb.api.shared_system_client import SharedSystemClient
 from chromadb.config import Settings as ChromaSettings
-from typing import Dict, List, Optional
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import json
 import logging
+import os
+import threading
+import time
 from pathlib import Path
+from api.metrics import EMBEDDING_ZERO_VECTORS, QUERY_STAGE_SECONDS
+from config.settings import Settings
 from database.embeddings import EmbeddingGenerator
 
+if TYPE_CHECKING:
+    from database.catalog_stats import CatalogStats
+    from database.lexical_index import LexicalIndex
+
+def matches_where(metadata: Dict, where: Optional[Dict]) -> bool:
+    """Evaluate a Chroma where filter against one metadata dict in memory."""
+    if not where:
+        return True
+    for key, condition in where.items():
+        if key == '$and':
+            if not all(matches_where(metadata, clause) for clause in condition):
+                return False
+        elif key == '$or':
+            if not any(matches_where(metadata, clause) for clause in condition):
+                return False
+        else:
+            value = metadata.get(key)
+            if not isinstance(condition, dict):
+                condition = {'$eq': condition}
+            for operator, operand in condition.items():
+                if operator == '$eq':
+                    ok = value == operand
+                elif operator == '$ne':
+                    ok = value != operand
+                elif operator == '$in':
+                    ok = value in operand
+                elif operator == '$nin':
+                    ok = value not in operand
+                elif value is None:
+                    ok = False
+                elif operator == '$gt':
+                    ok = value > operand
+                elif operator == '$gte':
+                    ok = value >= operand
+                elif operator == '$lt':
+                    ok = value < operand
+                elif operator == '$lte':
+                    ok = value <= operand
+                else:
+                    raise ValueError(f"Unsupported where operator: {operator}")
+                if not ok:
+                    return False
+    return True
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = Settings.RRF_K) -> List[Tuple[str, float]]:
+    """Fuse several ranked id lists, scoring each id by the sum of 1 / (k + rank)."""
+    scores: Dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, product_id in enumerate(ranking, start=1):
+            scores[product_id] += 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+class CatalogListener:
+    """Receives every change written to the vector store.
+
+    In-memory indexes derived from the catalog subclass this and register
+    with VectorStore.add_listener to stay in sync with ingestion.
+    """
+
+    def on_upsert(self, ids: List[str], documents: List[str], metadatas: List[Dict]) -> None:
+        pass
+
+    def on_delete(self, ids: List[str]) -> None:
+        pass
+
+    def on_clear(self) -> None:
+        pass
+
+    def on_embedding_failures(self, ids: List[str]) -> None:
+        """Products just upserted with a zero vector because embedding them failed."""
+        pass
+
+    def on_changes(self, deleted_ids: List[str],
+                   records: Iterable[Tuple[List[str], List[str], List[Dict]]]) -> None:
+        """Another process deleted deleted_ids and upserted records since the last sync."""
+        self.on_delete(deleted_ids)
+        for ids, documents, metadatas in records:
+            self.on_upsert(ids, documents, metadatas)
+
+    def on_refresh(self, records: Iterable[Tuple[List[str], List[str], List[Dict]]]) -> None:
+        """Another process rewrote the catalog: resynchronize from all of its current records.
+
+        Listeners answering queries meanwhile should build the new state
+        aside and swap it in, so no query sees a half-built index.
+        """
+        self.on_clear()
+        for ids, documents, metadatas in records:
+            self.on_upsert(ids, documents, metadatas)
+
 class VectorStore:
-    def __init__(self, embedding_generator: EmbeddingGenerator, persist_directory: str = "./data/vectorstore"):
+    """Product embeddings in a Chroma collection, with listeners kept in sync on every write.
+
+    Chroma is not safe for several writers on one directory, so only one
+    process opens it writable. The writer publishes its changes after each
+    write, or once per publish_batch: the changed ids are appended to a
+    catalog_changes log next to the collection and a new token is written
+    to catalog_version. read_only stores (the API query workers) poll that
+    token, reopen the collection and pass just the logged changes to their
+    listeners. The writer starts a new log when it opens or clears the
+    collection, and read_only stores then reload every record instead.
+    """
+
+    VERSION_FILE = "catalog_version"
+    CHANGES_FILE = "catalog_changes"
+    # A longer change log is started anew, at the cost of one full reload per reader
+    MAX_CHANGES_BYTES = 16 * 1024 * 1024
+
+    def __init__(self, embedding_generator: EmbeddingGenerator, persist_directory: str = "./data/vectorstore",
+                 read_only: bool = False):
         self.embedding_generator = embedding_generator
         self.logger = logging.getLogger(__name__)
+        self.persist_directory = persist_directory
+        self.read_only = read_only
+        self.version_path = Path(persist_directory) / self.VERSION_FILE
+        self.changes_path = Path(persist_directory) / self.CHANGES_FILE
+        # Bumped on every write so caches of query results can tell they are stale
+        self.catalog_version = 0
+        self.listeners: List[CatalogListener] = []
+        self.lexical_index: Optional["LexicalIndex"] = None
+        self.catalog_stats: Optional["CatalogStats"] = None
+        self.lexical_only_queries = 0
+        self.hybrid_queries = 0
         
+        # Writes not yet published to read-only stores
+        self._publish_lock = threading.Lock()
+        self._batch_depth = 0
+        self._pending_upserts: Set[str] = set()
+        self._pending_deletes: Set[str] = set()
+        self._restart_changes = False
+        self._last_publish = time.monotonic()
+        self._sequence = 0
+        self.changes_epoch: Optional[str] = None
+        self.changes_offset = 0
+
         # Initialize ChromaDB with new configuration
         try:
-            self.client = chromadb.PersistentClient(
-                path=persist_directory
-            )
+            self.loaded_version = self._read_version()
+            if read_only:
+                self.changes_epoch, _, self.changes_offset = self._read_changes()
+            self._open()
+            if not read_only:
+                # A previous writer may have stopped before publishing, so readers must reload everything
+                self._restart_changes = True
+                self._publish()
+            self.logger.info("Vector store initialized successfully" + (" (read-only)" if read_only else ""))
             
+        except Exception as e:
+            self.logger.error(f"Error initializing vector store: {str(e)}")
+            raise
+
+        self._refresh_lock = threading.Lock()
+        self._follower: Optional[threading.Thread] = None
+        if read_only and Settings.CATALOG_REFRESH_INTERVAL > 0:
+            self._follower = threading.Thread(target=self._follow_writer, name="catalog-refresh", daemon=True)
+            self._follower.start()
+
+    def _open(self) -> None:
+        """Open the Chroma client and collection; a read-only store never creates the collection."""
+        self.client = chromadb.PersistentClient(
+            path=self.persist_directory
+        )
+        if self.read_only:
+            self.collection = self.client.get_collection(name="product_catalog")
+        else:
             # Create or get collection
             self.collection = self.client.get_or_create_collection(
                 name="product_catalog",
                 metadata={"description": "Product catalog embeddings"}
             )
-            
-            self.logger.info("Vector store initialized successfully")
-            
-        except Exception as e:
-            self.logger.error(f"Error initializing vector store: {str(e)}")
-            raise
+
+    def _check_writable(self) -> None:
+        if self.read_only:
+            raise RuntimeError("Vector store is open read-only; writes belong to the ingestion process")
+
+    def _read_version(self) -> Optional[str]:
+        try:
+            return self.version_path.read_text().strip() or None
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _write_atomic(path: Path, text: str) -> None:
+        temp_path = path.with_name(f".{path.name}.{os.getpid()}")
+        temp_path.write_text(text)
+        os.replace(temp_path, path)
+
+    def _record_change(self, upserted: Iterable[str] = (), deleted: Iterable[str] = (),
+                       cleared: bool = False) -> None:
+        """Invalidate in-process caches and queue the change for read-only stores in other processes."""
+        self.catalog_version += 1
+        with self._publish_lock:
+            if cleared:
+                self._pending_upserts.clear()
+                self._pending_deletes.clear()
+                self._restart_changes = True
+            deleted = set(deleted)
+            self._pending_upserts -= deleted
+            self._pending_deletes |= deleted
+            upserted = set(upserted)
+            self._pending_deletes -= upserted
+            self._pending_upserts |= upserted
+            publish = (self._batch_depth == 0
+                       or time.monotonic() - self._last_publish >= Settings.CATALOG_PUBLISH_INTERVAL)
+        if publish:
+            self._publish()
+
+    def _publish(self) -> None:
+        """Log the changes made since the last publish and tell read-only stores to apply them."""
+        with self._publish_lock:
+            self._last_publish = time.monotonic()
+            if not (self._pending_upserts or self._pending_deletes or self._restart_changes):
+                return
+            self._sequence += 1
+            try:
+                if (self._restart_changes or not self.changes_path.exists()
+                        or self.changes_path.stat().st_size >= self.MAX_CHANGES_BYTES):
+                    # Readers reload everything from a new log, so it needs no entries yet
+                    self.changes_epoch = f"{os.getpid()}-{time.time_ns()}"
+                    self._write_atomic(self.changes_path, json.dumps({"epoch": self.changes_epoch}) + "\n")
+                else:
+                    entry = {
+                        "sequence": self._sequence,
+                        "upserted": sorted(self._pending_upserts),
+                        "deleted": sorted(self._pending_deletes)
+                    }
+                    with open(self.changes_path, "a") as changes:
+                        changes.write(json.dumps(entry) + "\n")
+                # The token goes last: readers that see it find the entries it covers
+                version = f"{self.changes_epoch}:{self._sequence}"
+                self._write_atomic(self.version_path, version)
+                self.loaded_version = version
+                self._pending_upserts.clear()
+                self._pending_deletes.clear()
+                self._restart_changes = False
+            except OSError as e:
+                self.logger.error(f"Error publishing catalog changes: {str(e)}")
+                # The log may now be incomplete, so make readers reload everything next time
+                self._restart_changes = True
+
+    @contextmanager
+    def publish_batch(self) -> Iterator[None]:
+        """Publish the writes made inside once, when the outermost batch ends, rather than after each.
+
+        During a batch longer than CATALOG_PUBLISH_INTERVAL, changes are
+        also published at that interval.
+        """
+        with self._publish_lock:
+            self._batch_depth += 1
+        try:
+            yield
+        finally:
+            with self._publish_lock:
+                self._batch_depth -= 1
+                publish = self._batch_depth == 0
+            if publish:
+                self._publish()
+
+    def _read_changes(self) -> Tuple[Optional[str], Optional[List[Dict]], int]:
+        """Read the writer's change log past this store's offset.
+
+        Returns the log's epoch, its new entries and the offset after them.
+        Entries are None when the log was started anew since this store last
+        read it, or is missing or unreadable, and everything must be reloaded.
+        """
+        try:
+            with open(self.changes_path, "rb") as changes:
+                epoch = json.loads(changes.readline())["epoch"]
+                same_log = epoch == self.changes_epoch
+                if same_log:
+                    changes.seek(self.changes_offset)
+                start = changes.tell()
+                data = changes.read()
+        except (OSError, ValueError, KeyError):
+            return None, None, 0
+        # The writer may be appending the last line right now
+        complete = data[:data.rfind(b"\n") + 1]
+        offset = start + len(complete)
+        if not same_log:
+            return epoch, None, offset
+        try:
+            return epoch, [json.loads(line) for line in complete.splitlines()], offset
+        except ValueError:
+            return None, None, 0
+
+    def refresh(self) -> bool:
+        """Bring a read-only store up to date with the changes the writer published since it last looked.
+
+        Listeners get just the logged changes; they reload every record only
+        when the writer started a new log.
+        """
+        with self._refresh_lock:
+            version = self._read_version()
+            if version == self.loaded_version:
+                return False
+            # Read the log before reopening, so the collection is at least as new as its entries
+            epoch, entries, offset = self._read_changes()
+            if entries == []:
+                # An earlier refresh already applied the entries this version covers
+                self.loaded_version = version
+                return False
+
+            # The client caches its index in memory, so only a new client sees other processes' writes
+            SharedSystemClient.clear_system_cache()
+            self._open()
+            if entries is None:
+                records = list(self.iter_records())
+                self._notify("on_refresh", records)
+                summary = f"{self.collection.count()} documents"
+            else:
+                upserted: Set[str] = set()
+                deleted: Set[str] = set()
+                for entry in entries:
+                    upserted.difference_update(entry["deleted"])
+                    deleted.update(entry["deleted"])
+                    deleted.difference_update(entry["upserted"])
+                    upserted.update(entry["upserted"])
+                records = list(self.iter_records(ids=sorted(upserted)))
+                # Products deleted again after the log was read are no longer in the collection
+                found = {product_id for ids, _, _ in records for product_id in ids}
+                deleted |= upserted - found
+                self._notify("on_changes", sorted(deleted), records)
+                summary = f"{len(found)} upserted, {len(deleted)} deleted"
+            self.changes_epoch, self.changes_offset, self.loaded_version = epoch, offset, version
+            self.catalog_version += 1
+            self.logger.info(f"Reloaded catalog version {version} ({summary})")
+            return True
+
+    def _follow_writer(self) -> None:
+        while True:
+            time.sleep(Settings.CATALOG_REFRESH_INTERVAL)
+            try:
+                self.refresh()
+            except Exception as e:
+                self.logger.error(f"Error reloading vector store: {str(e)}")
+
+    def add_listener(self, listener: CatalogListener, replay: bool = True) -> None:
+        """Register a listener, first replaying the current catalog into it."""
+        if replay:
+            for ids, documents, metadatas in self.iter_records():
+                listener.on_upsert(ids, documents, metadatas)
+        self.listeners.append(listener)
+
+    def set_lexical_index(self, lexical_index: "LexicalIndex") -> None:
+        """Attach a lexical index that query_similar fuses with vector search."""
+        self.add_listener(lexical_index)
+        self.lexical_index = lexical_index
+
+    def set_catalog_stats(self, catalog_stats: "CatalogStats") -> None:
+        """Attach persisted collection statistics, rebuilding them only if they are out of date.
+
+        A read-only store uses the statistics as its writer maintains them.
+        """
+        if self.read_only or catalog_stats.is_current(str(self.collection.id), self.collection.count()):
+            self.add_listener(catalog_stats, replay=False)
+        else:
+            self.logger.info("Rebuilding collection statistics from the vector store")
+            catalog_stats.on_clear()
+            self.add_listener(catalog_stats)
+            catalog_stats.bind(str(self.collection.id))
+        self.catalog_stats = catalog_stats
+
+    def _notify_written(self, ids: List[str], documents: List[str], metadatas: List[Dict],
+                        embeddings: List[List[float]]) -> None:
+        self._notify("on_upsert", ids, documents, metadatas)
+        failed = [product_id for product_id, embedding in zip(ids, embeddings) if not any(embedding)]
+        if failed:
+            EMBEDDING_ZERO_VECTORS.inc(len(failed))
+            self.logger.warning(f"Stored {len(failed)} documents with failed (zero) embeddings")
+            self._notify("on_embedding_failures", failed)
+
+    def _notify(self, event: str, *args) -> None:
+        for listener in self.listeners:
+            try:
+                getattr(listener, event)(*args)
+            except Exception as e:
+                self.logger.error(f"Error notifying {type(listener).__name__}.{event}: {str(e)}")
+
+    def iter_records(self, page_size: int = 1000,
+                     ids: Optional[List[str]] = None) -> Iterator[Tuple[List[str], List[str], List[Dict]]]:
+        """Yield (ids, documents, metadatas) pages of the whole collection, or of the stored ones of ids."""
+        if ids is not None:
+            for i in range(0, len(ids), page_size):
+                page = self.collection.get(ids=ids[i:i + page_size], include=["documents", "metadatas"])
+                if page['ids']:
+                    yield page['ids'], page['documents'], page['metadatas']
+            return
+
+        offset = 0
+        while True:
+            page = self.collection.get(include=["documents", "metadatas"], limit=page_size, offset=offset)
+            if page['ids']:
+                yield page['ids'], page['documents'], page['metadatas']
+            if len(page['ids']) < page_size:
+                return
+            offset += page_size
 
     def add_documents(self, documents: List[str], metadatas: List[Dict], ids: List[str]) -> None:
         """Add documents to the vector store."""
+        self._check_writable()
         try:
             # Generate embeddings in batches
             embeddings = self.embedding_generator.batch_generate(documents)
@@ -42,56 +425,261 @@ class VectorStore:
                 ids=ids
             )
             
+            self._record_change(upserted=ids)
+            self._notify_written(ids, documents, metadatas, embeddings)
             self.logger.info(f"Added {len(documents)} documents to vector store")
             
         except Exception as e:
             self.logger.error(f"Error adding documents to vector store: {str(e)}")
             raise
 
+    def upsert_documents(self, documents: List[str], metadatas: List[Dict], ids: List[str],
+                         embeddings: Optional[List[List[float]]] = None) -> None:
+        """Insert new documents or replace existing ones with the same ids."""
+        self._check_writable()
+        try:
+            if embeddings is None:
+                embeddings = self.embedding_generator.batch_generate(documents)
+
+            # Chroma rejects writes larger than its maximum batch size
+            batch_size = self.client.get_max_batch_size()
+            for i in range(0, len(ids), batch_size):
+                self.collection.upsert(
+                    embeddings=embeddings[i:i + batch_size],
+                    documents=documents[i:i + batch_size],
+                    metadatas=metadatas[i:i + batch_size],
+                    ids=ids[i:i + batch_size]
+                )
+
+            self._record_change(upserted=ids)
+            self._notify_written(ids, documents, metadatas, embeddings)
+            self.logger.info(f"Upserted {len(documents)} documents into vector store")
+
+        except Exception as e:
+            self.logger.error(f"Error upserting documents into vector store: {str(e)}")
+            raise
+
+    def delete_documents(self, ids: List[str]) -> None:
+        """Delete documents by id."""
+        self._check_writable()
+        try:
+            if ids:
+                batch_size = self.client.get_max_batch_size()
+                for i in range(0, len(ids), batch_size):
+                    self.collection.delete(ids=ids[i:i + batch_size])
+                self._record_change(deleted=ids)
+                self._notify("on_delete", ids)
+                self.logger.info(f"Deleted {len(ids)} documents from vector store")
+        except Exception as e:
+            self.logger.error(f"Error deleting documents from vector store: {str(e)}")
+            raise
+
+    def get_metadatas(self, ids: Optional[List[str]] = None, where: Optional[Dict] = None,
+                      page_size: int = 1000) -> Dict[str, Dict]:
+        """Fetch id -> metadata for the given ids or filter, one page at a time."""
+        try:
+            metadatas = {}
+            if ids is not None:
+                for i in range(0, len(ids), page_size):
+                    page = self.collection.get(ids=ids[i:i + page_size], include=["metadatas"])
+                    metadatas.update(zip(page['ids'], page['metadatas']))
+                return metadatas
+
+            offset = 0
+            while True:
+                page = self.collection.get(
+                    where=where,
+                    include=["metadatas"],
+                    limit=page_size,
+                    offset=offset
+                )
+                metadatas.update(zip(page['ids'], page['metadatas']))
+                if len(page['ids']) < page_size:
+                    return metadatas
+                offset += page_size
+        except Exception as e:
+            self.logger.error(f"Error fetching metadata from vector store: {str(e)}")
+            raise
+
+    def get_records(self, ids: List[str]) -> List[Dict]:
+        """Fetch documents by id, in the given order, shaped like query_similar results."""
+        try:
+            if not ids:
+                return []
+            page = self.collection.get(ids=list(ids), include=["documents", "metadatas"])
+            by_id = {
+                product_id: {'id': product_id, 'document': document, 'metadata': metadata, 'distance': None}
+                for product_id, document, metadata in zip(page['ids'], page['documents'], page['metadatas'])
+            }
+            return [by_id[product_id] for product_id in ids if product_id in by_id]
+        except Exception as e:
+            self.logger.error(f"Error fetching records from vector store: {str(e)}")
+            raise
+
+    def get_ids(self, where: Optional[Dict] = None, page_size: int = 5000) -> List[str]:
+        """List ids of matching documents without loading documents or metadata."""
+        try:
+            ids = []
+            offset = 0
+            while True:
+                page = self.collection.get(where=where, include=[], limit=page_size, offset=offset)
+                ids.extend(page['ids'])
+                if len(page['ids']) < page_size:
+                    return ids
+                offset += page_size
+        except Exception as e:
+            self.logger.error(f"Error listing ids from vector store: {str(e)}")
+            raise
+
     def query_similar(self, query_text: str, filters: Optional[Dict] = None, n_results: int = 5) -> List[Dict]:
-        """Query similar documents from the vector store."""
+        """Query similar documents from the vector store.
+
+        With a lexical index attached, queries naming a product's exact model
+        or name are answered from the index alone; otherwise BM25 and vector
+        rankings are combined with reciprocal-rank fusion.
+        """
+        return self.query_similar_batch([query_text], [filters], n_results)[0]
+
+    def query_similar_batch(self, query_texts: List[str], filters: Optional[List[Optional[Dict]]] = None,
+                            n_results: int = 5) -> List[List[Dict]]:
+        """Query several texts at once, returning one result list per text.
+
+        Queries are embedded in a single batch and sent as one multi-embedding
+        collection.query per distinct filter.
+        """
         try:
-            # Generate query embedding
-            query_embedding = self.embedding_generator.generate(query_text)
-            
-            # Perform search
-            results = self.collection.query(
-                query_embeddings=[query_embedding],
-                where=filters,
-                n_results=n_results
+            start = time.perf_counter()
+            filters = filters or [None] * len(query_texts)
+            results: List[List[Dict]] = [[] for _ in query_texts]
+
+            pending = []
+            for i, (query_text, where) in enumerate(zip(query_texts, filters)):
+                if self.lexical_index is not None:
+                    lexical_results = self._query_exact(query_text, where, n_results)
+                    if lexical_results:
+                        self.lexical_only_queries += 1
+                        results[i] = lexical_results
+                        continue
+                pending.append(i)
+            if not pending:
+                QUERY_STAGE_SECONDS.labels("retrieve").observe(time.perf_counter() - start)
+                return results
+
+            depth = n_results
+            if self.lexical_index is not None:
+                depth = max(n_results, Settings.HYBRID_CANDIDATES)
+
+            # Generate query embeddings
+            embed_start = time.perf_counter()
+            embeddings = self.embedding_generator.batch_generate(
+                [query_texts[i] for i in pending], show_progress=False
             )
-            
-            # Format results
-            formatted_results = []
-            for i in range(len(results['ids'][0])):
-                formatted_results.append({
-                    'id': results['ids'][0][i],
-                    'document': results['documents'][0][i],
-                    'metadata': results['metadatas'][0][i],
-                    'distance': results['distances'][0][i]
-                })
-            
-            return formatted_results
+            embed_seconds = time.perf_counter() - embed_start
+            QUERY_STAGE_SECONDS.labels("embed").observe(embed_seconds)
+
+            # Perform one search per distinct filter
+            groups: Dict[str, List[int]] = defaultdict(list)
+            for position, i in enumerate(pending):
+                groups[json.dumps(filters[i] or None, sort_keys=True)].append(position)
+
+            for positions in groups.values():
+                where = filters[pending[positions[0]]] or None
+                response = self.collection.query(
+                    query_embeddings=[embeddings[position] for position in positions],
+                    where=where,
+                    n_results=depth
+                )
+                for row, position in enumerate(positions):
+                    i = pending[position]
+                    # Format results
+                    formatted_results = []
+                    for j in range(len(response['ids'][row])):
+                        formatted_results.append({
+                            'id': response['ids'][row][j],
+                            'document': response['documents'][row][j],
+                            'metadata': response['metadatas'][row][j],
+                            'distance': response['distances'][row][j]
+                        })
+                    results[i] = self._fuse(query_texts[i], where, formatted_results, n_results)
+
+            QUERY_STAGE_SECONDS.labels("retrieve").observe(time.perf_counter() - start - embed_seconds)
+            return results
             
         except Exception as e:
             self.logger.error(f"Error querying vector store: {str(e)}")
             raise
 
-    def get_collection_stats(self) -> Dict:
-        """Get statistics about the vector store collection."""
+    def _fuse(self, query_text: str, filters: Optional[Dict], vector_results: List[Dict],
+              n_results: int) -> List[Dict]:
+        """Combine vector results with the lexical ranking, if a lexical index is attached."""
+        if self.lexical_index is None:
+            return vector_results
+
+        self.hybrid_queries += 1
+        depth = max(n_results, Settings.HYBRID_CANDIDATES)
+        lexical_ids = [product_id for product_id, _ in self.lexical_index.search(query_text, depth, filters)]
+        by_id = {result['id']: result for result in vector_results}
+        fused = reciprocal_rank_fusion([list(by_id), lexical_ids])
+        fused_results = [by_id.get(product_id) or self.lexical_index.get_record(product_id)
+                         for product_id, _ in fused[:n_results]]
+        return [result for result in fused_results if result is not None]
+
+    def _query_exact(self, query_text: str, filters: Optional[Dict], n_results: int) -> List[Dict]:
+        """Answer from the lexical index when the query is a product's model or name.
+
+        Exact matches come first, topped up with the best BM25 hits.
+        """
+        exact = self.lexical_index.exact_matches(query_text, filters)
+        if not exact:
+            return []
+        ids = exact[:n_results]
+        if len(ids) < n_results:
+            for product_id, _ in self.lexical_index.search(query_text, n_results + len(ids), filters):
+                if product_id not in ids:
+                    ids.append(product_id)
+                if len(ids) == n_results:
+                    break
+        records = [self.lexical_index.get_record(product_id) for product_id in ids]
+        return [record for record in records if record is not None]
+
+    def get_collection_stats(self, group_limit: int = Settings.STATS_PAGE_SIZE) -> Dict:
+        """Get statistics about the vector store collection.
+
+        With catalog stats attached these are served from incrementally
+        maintained counters; use list_documents to page through the products.
+        """
+        try:
+            if self.catalog_stats is not None:
+                return self.catalog_stats.get_stats(group_limit=group_limit)
+            return {'total_documents': self.collection.count()}
+        except Exception as e:
+            self.logger.error(f"Error getting collection stats: {str(e)}")
+            raise
+
+    def list_documents(self, offset: int = 0, limit: int = Settings.STATS_PAGE_SIZE,
+                       where: Optional[Dict] = None) -> Dict:
+        """One page of stored products with their metadata."""
         try:
+            page = self.collection.get(where=where or None, include=["metadatas"], limit=limit, offset=offset)
             return {
-                'total_documents': self.collection.count(),
-                'metadata': self.collection.get(),
+                'offset': offset,
+                'limit': limit,
+                'products': [
+                    {'id': product_id, 'metadata': metadata}
+                    for product_id, metadata in zip(page['ids'], page['metadatas'])
+                ]
             }
         except Exception as e:
-            self.logger.error(f"Error getting collection stats: {str(e)}")
+            self.logger.error(f"Error listing documents: {str(e)}")
             raise
 
     def delete_collection(self) -> None:
         """Delete the entire collection."""
+        self._check_writable()
         try:
             self.client.delete_collection("product_catalog")
+            self._record_change(cleared=True)
+            self._notify("on_clear")
             self.logger.info("Collection deleted successfully")
         except Exception as e:
             self.logger.error(f"Error deleting collection: {str(e)}")
@@ -1,27 +1,42 @@
 import os
+import atexit
+import importlib
 import logging
 import logging.config
+import shutil
+import sys
+import threading
+import time
 from pathlib import Path
 from typing import Dict, Optional
 
-from database.embeddings import EmbeddingGenerator
-from database.vector_store import VectorStore
-from api.groq_client import GroqClient
-from agents.schema_analyzer import SchemaAnalyzer
-from agents.data_processor import DataProcessor
-from agents.query_agent import QueryAgent
-from ui.gradio_app import ProductCatalogUI
 from config.settings import Settings
 from dotenv import load_dotenv
 
+RUN_MODES = ("ui", "api", "ingest")
+
 class ProductCatalogSystem:
-    def __init__(self):
+    """The product catalog application, with components imported and built on first use.
+
+    Nothing heavy is imported at startup: the ingest mode never creates a
+    Groq client (unless embeddings come from Groq) and the headless modes
+    never import gradio. Import and construction times are collected in
+    get_startup_report().
+
+    With API_WORKERS above 1 the api mode runs several uvicorn worker
+    processes, each a read_only system built by create_worker_app, while
+    this process owns every catalog write and ingests their uploads.
+    """
+
+    def __init__(self, mode: Optional[str] = None, read_only: bool = False):
+        self._started = time.perf_counter()
+
         # Load environment variables
         load_dotenv()
-        
+
         # Create necessary directories
         Settings.create_directories()
-        
+
         # Initialize basic logging
         logging.basicConfig(
             level=logging.INFO,
@@ -29,46 +44,160 @@ class ProductCatalogSystem:
             datefmt='%Y-%m-%d %H:%M:%S'
         )
         self.logger = logging.getLogger(__name__)
-        
+
+        self.mode = (mode or Settings.RUN_MODE).lower()
+        if self.mode not in RUN_MODES:
+            raise ValueError(f"Unknown run mode: {self.mode} (expected one of {', '.join(RUN_MODES)})")
+        self.read_only = read_only
+        if self.mode == "api" and Settings.API_WORKERS > 1 and not read_only:
+            self._prepare_worker_metrics()
+
+        self._components: Dict[str, object] = {}
+        # Components build one another, so the lock is re-entrant
+        self._components_lock = threading.RLock()
+        self._import_seconds: Dict[str, float] = {}
+        self._build_seconds: Dict[str, float] = {}
+        # Queued query log records would be lost with the log writer's daemon thread
+        atexit.register(self.close)
+        self.logger.info(f"System created in {self.mode} mode" + (" (read-only)" if read_only else ""))
+
+    def _prepare_worker_metrics(self) -> None:
+        """Share metrics between worker processes; must run before prometheus_client is imported."""
+        if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+            return
+        shutil.rmtree(Settings.METRICS_MULTIPROC_DIR, ignore_errors=True)
+        Settings.METRICS_MULTIPROC_DIR.mkdir(parents=True)
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = str(Settings.METRICS_MULTIPROC_DIR)
+
+    def _import(self, module: str, name: str):
+        """Import name from module, recording how long a first import takes."""
+        start = time.perf_counter()
+        loaded = importlib.import_module(module)
+        self._import_seconds.setdefault(module, time.perf_counter() - start)
+        return getattr(loaded, name)
+
+    def _component(self, name: str, build):
+        """Return the named component, building it on first use."""
+        with self._components_lock:
+            if name not in self._components:
+                start = time.perf_counter()
+                self._components[name] = build()
+                # Nested builds are included in their parent's time
+                self._build_seconds[name] = time.perf_counter() - start
+            return self._components[name]
+
+    @property
+    def groq_client(self):
+        return self._component("groq_client", lambda: self._import("api.groq_client", "GroqClient")())
+
+    @property
+    def embedding_generator(self):
+        def build():
+            EmbeddingGenerator = self._import("database.embeddings", "EmbeddingGenerator")
+            # Only Groq embeddings need the Groq client
+            groq_client = self.groq_client if Settings.EMBEDDING_BACKEND.lower() == "groq" else None
+            return EmbeddingGenerator(groq_client=groq_client)
+        return self._component("embedding_generator", build)
+
+    @property
+    def vector_store(self):
+        def build():
+            VectorStore = self._import("database.vector_store", "VectorStore")
+            vector_store = VectorStore(
+                embedding_generator=self.embedding_generator,
+                persist_directory=str(Settings.VECTOR_STORE_DIR),
+                read_only=self.read_only
+            )
+            if Settings.LEXICAL_INDEX_ENABLED:
+                vector_store.set_lexical_index(self._import("database.lexical_index", "LexicalIndex")())
+            if Settings.CATALOG_STATS_ENABLED:
+                vector_store.set_catalog_stats(self._import("database.catalog_stats", "CatalogStats")())
+            return vector_store
+        return self._component("vector_store", build)
+
+    @property
+    def schema_analyzer(self):
+        return self._component("schema_analyzer", lambda: self._import(
+            "agents.schema_analyzer", "SchemaAnalyzer"
+        )(self.groq_client))
+
+    @property
+    def data_processor(self):
+        return self._component("data_processor", lambda: self._import(
+            "agents.data_processor", "DataProcessor"
+        )(vector_store=self.vector_store, embedding_generator=self.embedding_generator))
+
+    @property
+    def query_agent(self):
+        return self._component("query_agent", lambda: self._import(
+            "agents.query_agent", "QueryAgent"
+        )(vector_store=self.vector_store, groq_client=self.groq_client))
+
+    @property
+    def ui(self):
+        return self._component("ui", lambda: self._import("ui.gradio_app", "ProductCatalogUI")(
+            schema_analyzer=self.schema_analyzer,
+            data_processor=self.data_processor,
+            query_agent=self.query_agent
+        ))
+
+    @property
+    def api(self):
+        def build():
+            ProductCatalogAPI = self._import("api.routes", "ProductCatalogAPI")
+            # Read-only workers hand uploads to the writing process
+            inbox = self._import("api.jobs", "UploadInbox")() if self.read_only else None
+            return ProductCatalogAPI(
+                schema_analyzer=self.schema_analyzer,
+                data_processor=self.data_processor,
+                query_agent=self.query_agent,
+                inbox=inbox
+            )
+        return self._component("api", build)
+
+    def close(self) -> None:
+        """Flush the query log, if queries were served."""
+        with self._components_lock:
+            query_agent = self._components.get("query_agent")
+        if query_agent is not None:
+            query_agent.close()
+
+    def create_app(self):
+        """The FastAPI app serving this system's JSON API."""
+        return self._import("api.routes", "create_routes")(self.api)
+
+    def initialize_components(self):
+        """Build every component the current mode serves with, up front, so misconfiguration fails fast."""
         try:
-            # Initialize components
-            self.initialize_components()
+            self.data_processor
+            if self.mode != "ingest":
+                self.schema_analyzer
+            if self.mode == "ui":
+                self.ui
+            elif self.mode == "api" and Settings.API_WORKERS <= 1:
+                self.api
+            # With several API workers this process only ingests; each worker builds its own API
             self.logger.info("System initialized successfully")
-            
         except Exception as e:
             self.logger.error(f"Error initializing system: {str(e)}")
             raise
 
-    def initialize_components(self):
-        """Initialize all system components."""
-        # Initialize Groq client first
-        self.groq_client = GroqClient()
-        
-        # Initialize embedding generator with Groq client
-        self.embedding_generator = EmbeddingGenerator(groq_client=self.groq_client)
-        
-        # Initialize vector store
-        self.vector_store = VectorStore(
-            embedding_generator=self.embedding_generator,
-            persist_directory=str(Settings.VECTOR_STORE_DIR)
-        )
-        
-        # Initialize agents
-        self.schema_analyzer = SchemaAnalyzer(self.groq_client)
-        self.data_processor = DataProcessor(
-            vector_store=self.vector_store,
-            embedding_generator=self.embedding_generator
-        )
-        self.query_agent = QueryAgent(
-            vector_store=self.vector_store,
-            groq_client=self.groq_client
-        )
-        
-        # Initialize UI
-        self.ui = ProductCatalogUI(
-            schema_analyzer=self.schema_analyzer,
-            data_processor=self.data_processor,
-            query_agent=self.query_agent
+    def get_startup_report(self) -> Dict:
+        """Seconds spent importing modules and building components so far."""
+        return {
+            "mode": self.mode,
+            "read_only": self.read_only,
+            "elapsed_seconds": round(time.perf_counter() - self._started, 3),
+            "imports": {module: round(seconds, 3) for module, seconds in self._import_seconds.items()},
+            "components": {name: round(seconds, 3) for name, seconds in self._build_seconds.items()},
+            "gradio_imported": "gradio" in sys.modules
+        }
+
+    def log_startup_report(self) -> None:
+        report = self.get_startup_report()
+        self.logger.info(
+            f"Started in {report['elapsed_seconds']}s ({report['mode']} mode); "
+            f"imports: {report['imports']}; components: {report['components']}"
         )
 
     def process_initial_data(self, directory_path: Optional[str] = None) -> None:
@@ -87,6 +216,7 @@ class ProductCatalogSystem:
         try:
             self.logger.info("Starting Gradio interface")
             interface = self.ui.create_interface()
+            self.log_startup_report()
             interface.launch(
                 server_name=Settings.API_HOST,
                 server_port=Settings.API_PORT,
@@ -96,37 +226,92 @@ class ProductCatalogSystem:
             self.logger.error(f"Error starting UI: {str(e)}")
             raise
 
+    def start_api(self, workers: int = Settings.API_WORKERS) -> None:
+        """Serve the JSON API without the Gradio interface, in one process or several workers."""
+        try:
+            import uvicorn
+            if workers <= 1:
+                self.logger.info("Starting JSON API")
+                app = self.create_app()
+                self.log_startup_report()
+                uvicorn.run(app, host=Settings.API_HOST, port=Settings.API_PORT)
+                return
+
+            # This process keeps the only writable store and ingests what the workers receive
+            self.logger.info(f"Starting JSON API with {workers} workers")
+            upload_pipeline = self._import("agents.upload_pipeline", "UploadPipeline")(
+                self.schema_analyzer, self.data_processor
+            )
+            inbox = self._import("api.jobs", "UploadInbox")()
+            inbox.serve(
+                lambda progress, file_path, source: upload_pipeline.process(
+                    file_path, source=source, progress=progress
+                ),
+                discard=self.data_processor.discard_upload,
+                last_run=self.data_processor.last_run
+            )
+            self.log_startup_report()
+            uvicorn.run(
+                "main:create_worker_app",
+                factory=True,
+                workers=workers,
+                host=Settings.API_HOST,
+                port=Settings.API_PORT,
+                app_dir=str(Path(__file__).parent)
+            )
+        except Exception as e:
+            self.logger.error(f"Error starting API: {str(e)}")
+            raise
+
     def run(self, initial_data_dir: Optional[str] = None, share_ui: bool = False) -> None:
-        """Run the complete system."""
+        """Run the system in its mode."""
         try:
+            self.initialize_components()
+
+            # Finish ingestion runs an earlier crash left incomplete
+            resumed = self.data_processor.resume_pending_runs()
+            if resumed:
+                self.logger.info(f"Resumed {len(resumed)} interrupted ingestion runs")
+
             # Process initial data if provided
             if initial_data_dir:
                 self.process_initial_data(initial_data_dir)
-            
-            # Start the UI
-            self.start_ui(share=share_ui)
-            
+
+            if self.mode == "ui":
+                self.start_ui(share=share_ui)
+            elif self.mode == "api":
+                self.start_api()
+            else:
+                self.log_startup_report()
+
         except Exception as e:
             self.logger.error(f"Error running system: {str(e)}")
             raise
 
+def create_worker_app():
+    """App factory run in each API worker process: queries on a read-only catalog."""
+    system = ProductCatalogSystem(mode="api", read_only=True)
+    app = system.create_app()
+    system.log_startup_report()
+    return app
+
 def main():
     try:
         # Initialize system
         system = ProductCatalogSystem()
-        
+
         # Get initial data directory from environment
         initial_data_dir = os.getenv("INITIAL_DATA_DIR")
-        
+
         # Run system
         system.run(
             initial_data_dir=initial_data_dir,
             share_ui=True
         )
-        
+
     except Exception as e:
         logging.error(f"Application failed to start: {str(e)}")
         raise
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
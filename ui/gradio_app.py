@@ -1,11 +1,12 @@
 import gradio as gr
-from typing import Dict, List
+from typing import Dict, Iterator, List
 from pathlib import Path
 import pandas as pd
 import logging
 from agents.schema_analyzer import SchemaAnalyzer
 from agents.data_processor import DataProcessor
 from agents.query_agent import QueryAgent
+from agents.upload_pipeline import UploadPipeline
 
 class ProductCatalogUI:
     def __init__(self, schema_analyzer: SchemaAnalyzer, 
@@ -14,6 +15,7 @@ class ProductCatalogUI:
         self.schema_analyzer = schema_analyzer
         self.data_processor = data_processor
         self.query_agent = query_agent
+        self.upload_pipeline = UploadPipeline(schema_analyzer, data_processor)
         self.logger = logging.getLogger(__name__)
 
     def process_upload(self, files: List[str]) -> str:
@@ -21,16 +23,13 @@ class ProductCatalogUI:
         try:
             results = []
             for file_path in files:
-                # Analyze schema
-                schema_analysis = self.schema_analyzer.analyze_csv(Path(file_path))
-                
-                # Process data
-                processing_result = self.data_processor.process_csv(Path(file_path))
+                # Parse once, analyzing the schema and ingesting concurrently
+                upload = self.upload_pipeline.process(Path(file_path))
                 
                 results.append({
                     "file": Path(file_path).name,
-                    "schema": schema_analysis,
-                    "processing": processing_result
+                    "schema": upload["schema_analysis"],
+                    "processing": upload["processing_result"]
                 })
             
             # Format results for display
@@ -56,18 +55,54 @@ class ProductCatalogUI:
             self.logger.error(f"Error processing query: {str(e)}")
             return f"Error processing query: {str(e)}"
 
+    def process_query_stream(self, query: str) -> Iterator[str]:
+        """Process user query, updating the response as tokens arrive."""
+        response = ""
+        try:
+            for fragment in self.query_agent.process_query_stream(query):
+                response += fragment
+                yield response
+        except Exception as e:
+            self.logger.error(f"Error processing query: {str(e)}")
+            yield f"Error processing query: {str(e)}"
+
     def show_stats(self) -> str:
         """Display current system statistics."""
         try:
-            query_history = self.query_agent.get_query_history()
+            stats = self.query_agent.get_query_stats()
+            stats["recent_queries"] = self.query_agent.get_query_history(limit=5)
             
-            stats = {
-                "total_queries": len(query_history),
-                "recent_queries": query_history[-5:] if query_history else []
-            }
+            cache_stats = self.query_agent.get_cache_stats()
+            intent_stats = self.query_agent.get_intent_stats()
+            speculation_stats = self.query_agent.get_speculation_stats()
+            llm_cache_stats = self.query_agent.groq_client.get_cache_stats()
             
             output = "System Statistics:\n\n"
-            output += f"Total Queries Processed: {stats['total_queries']}\n\n"
+            output += f"Total Queries Processed: {stats['total_queries']}\n"
+            if stats['total_queries']:
+                latency = stats['latency']
+                output += f"Latency p50 / p90 / p99: {latency['p50']}s / {latency['p90']}s / {latency['p99']}s\n"
+            if stats['top_queries']:
+                output += "Top Queries: " + ", ".join(
+                    f"{top['query']} ({top['count']})" for top in stats['top_queries'][:5]
+                ) + "\n"
+            if cache_stats['enabled']:
+                output += f"Answer Cache Hit Ratio: {cache_stats['hit_ratio']:.1%}\n"
+            if intent_stats['enabled']:
+                output += f"Intents Served Without LLM: {intent_stats['fast_path_ratio']:.1%}\n"
+            if speculation_stats['enabled']:
+                output += f"Speculative Retrieval Sufficient: {speculation_stats['sufficient_ratio']:.1%}\n"
+            if llm_cache_stats['enabled']:
+                output += f"LLM Response Cache Hit Ratio: {llm_cache_stats['hit_ratio']:.1%}\n"
+            collection_stats = self.data_processor.vector_store.get_collection_stats(group_limit=5)
+            output += f"Products in Catalog: {collection_stats['total_documents']}\n"
+            if collection_stats.get('embedding_failures'):
+                output += f"Products With Failed Embeddings: {collection_stats['embedding_failures']}\n"
+            if collection_stats.get('source'):
+                output += "Largest Sources: " + ", ".join(
+                    f"{source} ({group['count']})" for source, group in collection_stats['source'].items()
+                ) + "\n"
+            output += "\n"
             output += "Recent Queries:\n"
             for query in stats['recent_queries']:
                 output += f"Q: {query['query']}\n"
@@ -120,7 +155,7 @@ class ProductCatalogUI:
                 )
                 
                 query_button.click(
-                    fn=self.process_query,
+                    fn=self.process_query_stream,
                     inputs=[query_input],
                     outputs=[response_output]
                 )